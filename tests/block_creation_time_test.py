@@ -1,9 +1,9 @@
 import unittest
 
-from substrateinterface import SubstrateInterface
 from tools.utils import WS_URL
+from tools.connection_pool import get_substrate
 from peaq.utils import wait_for_n_blocks, get_block_height
-from tools.block_creation_utils import get_block_creation_times
+from tools.block_creation_utils import get_block_intervals, get_block_interval_stats
 
 BLOCK_TRAVERSE = 10
 BLOCK_CREATION_MS = 12000
@@ -18,10 +18,11 @@ class TestBlockCreationTime(unittest.TestCase):
         wait_for_n_blocks(substrate, block_number - now_block + 1)
 
     def test_block_creation_time(self):
-        substrate = SubstrateInterface(url=WS_URL)
+        substrate = get_substrate(WS_URL)
 
         self.wait_block(substrate, BLOCK_TRAVERSE)
 
-        ave_time = get_block_creation_times(substrate, BLOCK_TRAVERSE)
-        self.assertLess(abs(ave_time - BLOCK_CREATION_MS) / float(BLOCK_CREATION_MS) * 100.,
+        stats = get_block_interval_stats(get_block_intervals(substrate, BLOCK_TRAVERSE))
+        print(f'Block creation time (ms): {stats}')
+        self.assertLess(abs(stats['mean'] - BLOCK_CREATION_MS) / float(BLOCK_CREATION_MS) * 100.,
                         BLOCK_TOLERATE_PERCENTAGE)
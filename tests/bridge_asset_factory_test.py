@@ -1,7 +1,7 @@
 import unittest
-from substrateinterface import SubstrateInterface
 from tools.asset import get_valid_asset_id
 from tools.utils import WS_URL, ETH_URL
+from tools.connection_pool import get_substrate
 from peaq.utils import ExtrinsicBatch
 from tools.peaq_eth_utils import get_contract
 from tools.peaq_eth_utils import get_eth_chain_id
@@ -22,7 +22,7 @@ IERC20PLUS_ABI_FILE = 'ETH/erc20/plus.abi'
 
 class bridge_asset_factory_test(unittest.TestCase):
     def setUp(self):
-        self._substrate = SubstrateInterface(url=WS_URL)
+        self._substrate = get_substrate(WS_URL)
         self._w3 = Web3(Web3.HTTPProvider(ETH_URL))
         self._kp_creator = get_eth_info()
         self._kp_admin = get_eth_info()
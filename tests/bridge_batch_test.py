@@ -1,11 +1,11 @@
 import unittest
 
 from tools.utils import WS_URL, ETH_URL
+from tools.connection_pool import get_substrate
 # from tools.runtime_upgrade import wait_until_block_height
 from tools.peaq_eth_utils import get_contract
 from tools.peaq_eth_utils import GAS_LIMIT, get_eth_info
 from tools.peaq_eth_utils import get_eth_chain_id
-from substrateinterface import SubstrateInterface
 from peaq.utils import ExtrinsicBatch
 from web3 import Web3
 from tools.utils import KP_GLOBAL_SUDO
@@ -29,7 +29,7 @@ STORAGE_ADDRESS = '0x0000000000000000000000000000000000000801'
 
 class TestBridgeBatch(unittest.TestCase):
     def setUp(self):
-        self.si_peaq = SubstrateInterface(url=WS_URL)
+        self.si_peaq = get_substrate(WS_URL)
         self.w3 = Web3(Web3.HTTPProvider(ETH_URL))
         self.kp_eth = get_eth_info()
 
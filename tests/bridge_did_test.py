@@ -1,15 +1,17 @@
 import unittest
 
-from substrateinterface import SubstrateInterface, Keypair, KeypairType
+from substrateinterface import Keypair, KeypairType
 from peaq.eth import calculate_evm_account, calculate_evm_addr
 from peaq.extrinsic import transfer
 from tools.peaq_eth_utils import call_eth_transfer_a_lot, get_contract, generate_random_hex
 from tools.utils import WS_URL, ETH_URL
+from tools.connection_pool import get_substrate
 from tools.peaq_eth_utils import get_eth_chain_id
 from web3 import Web3
 
 
 import pprint
+from tools.keyring import keypair_from_uri
 pp = pprint.PrettyPrinter(indent=4)
 GAS_LIMIT = 4294967
 
@@ -17,7 +19,7 @@ GAS_LIMIT = 4294967
 KEY = generate_random_hex()
 VALUE = '0x01'
 NEW_VALUE = '0x10'
-KP_SRC = Keypair.create_from_uri('//Alice')
+KP_SRC = keypair_from_uri('//Alice')
 DID_ADDRESS = '0x0000000000000000000000000000000000000800'
 ETH_PRIVATE_KEY = '0xa2899b053679427c8c446dc990c8990c75052fd3009e563c6a613d982d6842fe'
 VALIDITY = 1000
@@ -82,7 +84,7 @@ class TestBridgeDid(unittest.TestCase):
 
     def setUp(self):
         self.w3 = Web3(Web3.HTTPProvider(ETH_URL))
-        self.substrate = SubstrateInterface(url=WS_URL)
+        self.substrate = get_substrate(WS_URL)
         self.eth_chain_id = get_eth_chain_id(self.substrate)
 
     def test_bridge_did(self):
@@ -1,13 +1,14 @@
 import unittest
-from substrateinterface import SubstrateInterface, Keypair
 from tools.asset import batch_create_asset, get_valid_asset_id, batch_set_metadata, batch_mint
 from tools.utils import WS_URL, ETH_URL
+from tools.connection_pool import get_substrate
 from peaq.utils import ExtrinsicBatch
 from tools.peaq_eth_utils import get_contract
 from tools.peaq_eth_utils import get_eth_chain_id
 from tools.peaq_eth_utils import calculate_asset_to_evm_address
 from tools.peaq_eth_utils import GAS_LIMIT, get_eth_info
 from web3 import Web3
+from tools.keyring import keypair_from_uri
 
 
 ABI_FILE = 'ETH/erc20/abi'
@@ -32,10 +33,10 @@ def batch_transfer(batch, addr_dst, token_num):
 
 class erc20_asset_test(unittest.TestCase):
     def setUp(self):
-        self._substrate = SubstrateInterface(url=WS_URL)
+        self._substrate = get_substrate(WS_URL)
         self._w3 = Web3(Web3.HTTPProvider(ETH_URL))
-        self._kp_creator = Keypair.create_from_uri('//Alice')
-        self._kp_admin = Keypair.create_from_uri('//Bob')
+        self._kp_creator = keypair_from_uri('//Alice')
+        self._kp_admin = keypair_from_uri('//Bob')
         self._eth_kp_src = get_eth_info()
         self._eth_kp_dst = get_eth_info()
         self._eth_chain_id = get_eth_chain_id(self._substrate)
@@ -1,8 +1,8 @@
 import unittest
 from tests.utils_func import restart_parachain_and_runtime_upgrade
 from tools.runtime_upgrade import wait_until_block_height
-from substrateinterface import SubstrateInterface
 from tools.utils import WS_URL, ETH_URL
+from tools.connection_pool import get_substrate
 from peaq.utils import ExtrinsicBatch
 from tools.peaq_eth_utils import get_contract
 from tools.peaq_eth_utils import get_eth_chain_id
@@ -21,9 +21,9 @@ PARACHAIN_STAKING_ADDR = '0x0000000000000000000000000000000000000807'
 class bridge_parachain_staking_test(unittest.TestCase):
     def setUp(self):
         restart_parachain_and_runtime_upgrade()
-        wait_until_block_height(SubstrateInterface(url=WS_URL), 1)
+        wait_until_block_height(get_substrate(WS_URL), 1)
 
-        self._substrate = SubstrateInterface(url=WS_URL)
+        self._substrate = get_substrate(WS_URL)
         self._w3 = Web3(Web3.HTTPProvider(ETH_URL))
         self._kp_moon = get_eth_info()
         self._kp_mars = get_eth_info()
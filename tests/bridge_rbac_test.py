@@ -1,5 +1,6 @@
-from substrateinterface import SubstrateInterface, Keypair, KeypairType
+from substrateinterface import Keypair, KeypairType
 from tools.utils import calculate_evm_addr
+from tools.connection_pool import get_substrate
 from tools.utils import WS_URL, ETH_URL
 from peaq.eth import calculate_evm_account
 from tools.peaq_eth_utils import get_eth_chain_id
@@ -10,11 +11,12 @@ import unittest
 from peaq.extrinsic import transfer
 
 import pprint
+from tools.keyring import keypair_from_uri
 pp = pprint.PrettyPrinter(indent=4)
 
 
 # Keypair to use for dispatches
-KP_SRC = Keypair.create_from_uri('//Alice')
+KP_SRC = keypair_from_uri('//Alice')
 # Address of RBAC precompile contract
 RBAC_ADDRESS = '0x0000000000000000000000000000000000000802'
 # H160 Address to use for EVM transactions
@@ -499,7 +501,7 @@ class TestBridgeRbac(unittest.TestCase):
     def setUp(self):
         self._eth_src = calculate_evm_addr(KP_SRC.ss58_address)
         self._w3 = Web3(Web3.HTTPProvider(ETH_URL))
-        self._substrate = SubstrateInterface(url=WS_URL)
+        self._substrate = get_substrate(WS_URL)
         self._eth_kp_src = Keypair.create_from_private_key(ETH_PRIVATE_KEY, crypto_type=KeypairType.ECDSA)
         self._contract = get_contract(self._w3, RBAC_ADDRESS, ABI_FILE)
 
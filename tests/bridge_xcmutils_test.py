@@ -1,15 +1,16 @@
 import unittest
 from tools.utils import WS_URL, ETH_URL, ACA_WS_URL
+from tools.connection_pool import get_substrate
 from tools.utils import ACA_PD_CHAIN_ID
 from tools.peaq_eth_utils import get_contract
 from tools.peaq_eth_utils import GAS_LIMIT, get_eth_info
 from tools.peaq_eth_utils import get_eth_chain_id
-from substrateinterface import SubstrateInterface, Keypair
+from tools.keypair_pool import new_keypair
 from peaq.utils import ExtrinsicBatch
 from web3 import Web3
 from tools.utils import KP_GLOBAL_SUDO
 from peaq.utils import get_account_balance
-from tests import utils_func as TestUtils
+from tests import utils_func as TestUtils  # noqa: F401, used by the skipif condition
 from tools.asset import setup_aca_asset_if_not_exist
 from tools.asset import PEAQ_ASSET_LOCATION, PEAQ_METADATA
 from tools.asset import wait_for_account_asset_change_wrap
@@ -23,7 +24,7 @@ XCMUTILS_ADDRESS = '0x0000000000000000000000000000000000000804'
 
 class TestBridgeXCMUtils(unittest.TestCase):
     def setUp(self):
-        self.si_peaq = SubstrateInterface(url=WS_URL)
+        self.si_peaq = get_substrate(WS_URL)
         self.w3 = Web3(Web3.HTTPProvider(ETH_URL))
         self.kp_eth = get_eth_info()
         self.eth_chain_id = get_eth_chain_id(self.si_peaq)
@@ -151,11 +152,12 @@ class TestBridgeXCMUtils(unittest.TestCase):
         return wait_for_account_asset_change_wrap(
             self.si_aca, addr, asset_id, prev_token, get_tokens_account_from_pallet_tokens)
 
-    @pytest.mark.skipif(TestUtils.is_not_dev_chain() is True, reason='Note enable xcm_execute on non-dev chain')
+    # A string condition is evaluated at setup, so collection doesn't connect
+    @pytest.mark.skipif('TestUtils.is_not_dev_chain() is True', reason='Note enable xcm_execute on non-dev chain')
     def test_xcm_execute(self):
         self._fund_eth_account()
 
-        kp_dst = Keypair.create_from_mnemonic(Keypair.generate_mnemonic())
+        kp_dst = new_keypair()
         encoded_calldata = self._compose_xcm_execute_message(kp_dst).encode().data
 
         kp_sign = self.kp_eth['kp']
@@ -181,8 +183,8 @@ class TestBridgeXCMUtils(unittest.TestCase):
         self.assertNotEqual(balance, 0, f'Error: {balance}')
 
     def test_xcm_send(self):
-        self.si_peaq = SubstrateInterface(url=WS_URL)
-        self.si_aca = SubstrateInterface(url=ACA_WS_URL)
+        self.si_peaq = get_substrate(WS_URL)
+        self.si_aca = get_substrate(ACA_WS_URL)
 
         receipt = setup_aca_asset_if_not_exist(
             self.si_aca, KP_GLOBAL_SUDO, PEAQ_ASSET_LOCATION['para'], PEAQ_METADATA)
@@ -190,7 +192,7 @@ class TestBridgeXCMUtils(unittest.TestCase):
 
         self._fund_eth_account()
         # compose the message
-        kp_dst = Keypair.create_from_mnemonic(Keypair.generate_mnemonic())
+        kp_dst = new_keypair()
         encoded_calldata = self._compose_xcm_send_message(kp_dst).encode().data
 
         # Use the pallet send to send it
@@ -221,7 +223,7 @@ class TestBridgeXCMUtils(unittest.TestCase):
 
     def test_weight_message(self):
         contract = get_contract(self.w3, XCMUTILS_ADDRESS, ABI_FILE)
-        kp_dst = Keypair.create_from_mnemonic(Keypair.generate_mnemonic())
+        kp_dst = new_keypair()
         encoded_calldata = self._compose_xcm_execute_message(kp_dst).encode().data
 
         data = contract.functions.weightMessage(encoded_calldata).call()
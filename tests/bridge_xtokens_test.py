@@ -4,8 +4,9 @@ sys.path.append('./')
 import unittest
 from tests.utils_func import restart_parachain_and_runtime_upgrade
 from tools.runtime_upgrade import wait_until_block_height
-from substrateinterface import SubstrateInterface, Keypair
+from tools.keypair_pool import new_keypair
 from tools.utils import ETH_URL
+from tools.connection_pool import get_substrate
 from tools.utils import WS_URL, ACA_WS_URL, PARACHAIN_WS_URL
 from peaq.utils import get_account_balance
 from peaq.utils import ExtrinsicBatch
@@ -15,7 +16,7 @@ from tools.asset import setup_aca_asset_if_not_exist
 from tools.asset import UNITS_PER_SECOND
 from tools.asset import PEAQ_ASSET_LOCATION
 from tools.asset import PEAQ_METADATA, PEAQ_ASSET_ID
-from tools.utils import get_peaq_chain_id
+from tools.chain_params import PEAQ_PARAMS, LazyDict
 from tools.asset import batch_create_asset, batch_mint, batch_set_metadata, batch_force_create_asset
 from tools.peaq_eth_utils import calculate_asset_to_evm_address
 from web3 import Web3
@@ -24,11 +25,10 @@ from tools.peaq_eth_utils import GAS_LIMIT, get_eth_info
 from tools.peaq_eth_utils import get_eth_chain_id
 from tools.asset import wait_for_account_asset_change_wrap
 from tools.asset import get_tokens_account_from_pallet_tokens
+from tools.keyring import keypair_from_uri
 # import pytest
 
 
-PEAQ_PD_CHAIN_ID = get_peaq_chain_id()
-
 ABI_FILE = 'ETH/xtokens/abi'
 XTOKENS_ADDRESS = '0x0000000000000000000000000000000000000803'
 
@@ -54,7 +54,7 @@ TEST_ASSET_ID = {
     }
 }
 
-TEST_ASSET_TOKEN = {
+TEST_ASSET_TOKEN = LazyDict(lambda: {
     'peaq': {
         XCM_VER: {
             'parents': '0',
@@ -72,7 +72,7 @@ TEST_ASSET_TOKEN = {
         XCM_VER: {
             'parents': '1',
             'interior': {
-                'X2': [{'Parachain': PEAQ_PD_CHAIN_ID}, {
+                'X2': [{'Parachain': PEAQ_PARAMS.para_id}, {
                     'GeneralKey': {
                         'length': 2,
                         'data': [0, TEST_ASSET_IDX] + [0] * 30,
@@ -81,7 +81,7 @@ TEST_ASSET_TOKEN = {
             }
         }
     }
-}
+})
 
 
 def aca_fund(substrate, kp_sudo, kp_dst, new_free):
@@ -201,12 +201,12 @@ class TestBridgeXTokens(unittest.TestCase):
 
     def setUp(self):
         restart_parachain_and_runtime_upgrade()
-        wait_until_block_height(SubstrateInterface(url=PARACHAIN_WS_URL), 1)
-        wait_until_block_height(SubstrateInterface(url=ACA_WS_URL), 1)
+        wait_until_block_height(get_substrate(PARACHAIN_WS_URL), 1)
+        wait_until_block_height(get_substrate(ACA_WS_URL), 1)
 
-        self.si_peaq = SubstrateInterface(url=WS_URL,)
-        self.si_aca = SubstrateInterface(url=ACA_WS_URL)
-        self.alice = Keypair.create_from_uri('//Alice')
+        self.si_peaq = get_substrate(WS_URL)
+        self.si_aca = get_substrate(ACA_WS_URL)
+        self.alice = keypair_from_uri('//Alice')
         self.kp_eth = get_eth_info()
         self._w3 = Web3(Web3.HTTPProvider(ETH_URL))
         self.eth_chain_id = get_eth_chain_id(self.si_peaq)
@@ -263,7 +263,7 @@ class TestBridgeXTokens(unittest.TestCase):
             self.si_aca, KP_GLOBAL_SUDO, PEAQ_ASSET_LOCATION['para'], PEAQ_METADATA)
         self.assertTrue(receipt.is_success, f'Failed to register foreign asset: {receipt.error_message}')
 
-        kp_para_dst = Keypair.create_from_mnemonic(Keypair.generate_mnemonic())
+        kp_para_dst = new_keypair()
         receipt = aca_fund(self.si_aca, KP_GLOBAL_SUDO, kp_para_dst, INIT_TOKEN_NUM)
         self.assertTrue(receipt.is_success, f'Failed to fund tokens to aca: {receipt.error_message}')
 
@@ -282,7 +282,7 @@ class TestBridgeXTokens(unittest.TestCase):
         asset_id = TEST_ASSET_ID['peaq']
         self._set_up_peaq_asset_on_peaq(asset_id, self.kp_eth['substrate'], True)
 
-        kp_para_src = Keypair.create_from_mnemonic(Keypair.generate_mnemonic())
+        kp_para_src = new_keypair()
         # register on aca
         receipt = setup_aca_asset_if_not_exist(
             self.si_aca, KP_GLOBAL_SUDO, TEST_ASSET_TOKEN['para'], TEST_ASSET_METADATA)
@@ -305,7 +305,7 @@ class TestBridgeXTokens(unittest.TestCase):
             self.si_aca, KP_GLOBAL_SUDO, PEAQ_ASSET_LOCATION['para'], PEAQ_METADATA)
         self.assertTrue(receipt.is_success, f'Failed to register foreign asset: {receipt.error_message}')
 
-        kp_para_dst = Keypair.create_from_mnemonic(Keypair.generate_mnemonic())
+        kp_para_dst = new_keypair()
         receipt = aca_fund(self.si_aca, KP_GLOBAL_SUDO, kp_para_dst, INIT_TOKEN_NUM)
         self.assertTrue(receipt.is_success, f'Failed to fund tokens to aca: {receipt.error_message}')
 
@@ -322,7 +322,7 @@ class TestBridgeXTokens(unittest.TestCase):
         asset_id = TEST_ASSET_ID['peaq']
         self._set_up_peaq_asset_on_peaq(asset_id, self.kp_eth['substrate'], True)
 
-        kp_para_src = Keypair.create_from_mnemonic(Keypair.generate_mnemonic())
+        kp_para_src = new_keypair()
         # register on aca
         receipt = setup_aca_asset_if_not_exist(
             self.si_aca, KP_GLOBAL_SUDO, TEST_ASSET_TOKEN['para'], TEST_ASSET_METADATA)
@@ -350,7 +350,7 @@ class TestBridgeXTokens(unittest.TestCase):
         asset_id = TEST_ASSET_ID['peaq']
         self._set_up_peaq_asset_on_peaq(asset_id, self.kp_eth['substrate'], True)
 
-        kp_para_src = Keypair.create_from_mnemonic(Keypair.generate_mnemonic())
+        kp_para_src = new_keypair()
         # register on aca
         receipt = setup_aca_asset_if_not_exist(
             self.si_aca, KP_GLOBAL_SUDO, TEST_ASSET_TOKEN['para'], TEST_ASSET_METADATA)
@@ -0,0 +1,79 @@
+import sys
+sys.path.append('.')
+
+import os
+import pytest
+from tools.instrumentation import PROFILER, install_instrumentation, write_report
+from substrateinterface import KeypairType
+from tools.connection_pool import POOL
+from tools.block_subscription import stop_all_subscriptions
+from tools.funding_service import FUNDING_SERVICE, DEFAULT_FUND_AMOUNT
+
+PROFILE_KEY = pytest.StashKey()
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        '--profile-dir', default=os.environ.get('TEST_PROFILE_DIR'),
+        help='Write a JSON report per test with the time by phase and the RPC calls by method')
+
+
+def pytest_configure(config):
+    if config.getoption('--profile-dir'):
+        # Before the test modules are collected and import the wrapped functions by name
+        install_instrumentation()
+    config.addinivalue_line(
+        'markers',
+        'accounts(number, crypto_type=KeypairType.SR25519, amount=DEFAULT_FUND_AMOUNT): '
+        'funded accounts the test takes from FUNDING_SERVICE')
+
+
+def pytest_collection_modifyitems(session, config, items):
+    """
+    Declares the accounts of all the collected tests, so the first take()
+    funds them all together in a few batches
+    """
+    for item in items:
+        for marker in item.iter_markers(name='accounts'):
+            number = marker.args[0] if marker.args else marker.kwargs.get('number', 1)
+            crypto_type = marker.kwargs.get('crypto_type', KeypairType.SR25519)
+            amount = marker.kwargs.get('amount', DEFAULT_FUND_AMOUNT)
+            FUNDING_SERVICE.require(number, crypto_type, amount)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_protocol(item, nextitem):
+    profile_dir = item.config.getoption('--profile-dir')
+    if not profile_dir:
+        yield
+        return
+    PROFILER.start(item.nodeid)
+    yield
+    report = PROFILER.stop()
+    write_report(report, profile_dir)
+    item.config.stash.setdefault(PROFILE_KEY, []).append(report)
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    reports = config.stash.get(PROFILE_KEY, [])
+    if not reports:
+        return
+    terminalreporter.section('slowest tests by phase')
+    for report in sorted(reports, key=lambda r: r['duration'], reverse=True)[:10]:
+        phases = ', '.join(
+            f'{name} {seconds:.1f}s'
+            for name, seconds in sorted(report['phases'].items(), key=lambda p: p[1], reverse=True))
+        terminalreporter.write_line(
+            f'{report["duration"]:.1f}s {report["test"]}: {phases}; {report["rpc_total"]} rpc calls')
+
+
+@pytest.fixture(scope='session', autouse=True)
+def substrate_pool():
+    yield POOL
+    stop_all_subscriptions()
+    POOL.close_all()
+
+
+@pytest.fixture(scope='session')
+def funding_service():
+    return FUNDING_SERVICE
@@ -1,10 +1,11 @@
 import unittest
-import time
+from tools.block_wait import wait_for_blocks, wait_until
 
-from substrateinterface import SubstrateInterface, Keypair
+from tools.keypair_pool import new_keypair
 from tools.utils import WS_URL, get_collators, batch_fund
+from tools.connection_pool import get_substrate
 from tools.utils import KP_GLOBAL_SUDO, exist_pallet, KP_COLLATOR
-from tools.payload import sudo_call_compose, sudo_extrinsic_send, user_extrinsic_send
+from tools.payload import sudo_call_compose, sudo_extrinsic_send, user_extrinsic_send, pipelined
 from peaq.utils import get_block_height, get_block_hash, get_chain
 from peaq.utils import ExtrinsicBatch, get_account_balance
 from tests.utils_func import restart_parachain_and_runtime_upgrade
@@ -71,14 +72,12 @@ def set_reward_rate(substrate, collator, delegator):
 
 class TestDelegator(unittest.TestCase):
     def setUp(self):
-        self.substrate = SubstrateInterface(
-            url=WS_URL,
-        )
+        self.substrate = get_substrate(WS_URL)
         self.chain_name = get_chain(self.substrate)
         self.collator = [KP_COLLATOR]
         self.delegators = [
-            Keypair.create_from_mnemonic(Keypair.generate_mnemonic()),
-            Keypair.create_from_mnemonic(Keypair.generate_mnemonic())
+            new_keypair(),
+            new_keypair()
         ]
 
     def tearDown(self):
@@ -102,17 +101,10 @@ class TestDelegator(unittest.TestCase):
         return None
 
     def wait_get_reward(self, addr):
-        time.sleep(12 * 2)
-        count_down = 0
-        wait_time = 120
+        wait_for_blocks(self.substrate, 2)
         prev_balance = get_account_balance(self.substrate, addr)
-        while count_down < wait_time:
-            if prev_balance != get_account_balance(self.substrate, addr):
-                return True
-            print(f'already wait about {count_down} seconds')
-            count_down += 12
-            time.sleep(12)
-        return False
+        changed = wait_until(self.substrate, lambda: prev_balance != get_account_balance(self.substrate, addr), max_blocks=10)
+        return bool(changed)
 
     def test_issue_fixed_precentage(self):
         if not exist_pallet(self.substrate, 'StakingFixedRewardCalculator'):
@@ -140,10 +132,11 @@ class TestDelegator(unittest.TestCase):
         self.assertNotEqual(collator, None)
 
         # Add the delegator
-        receipt = add_delegator(self.substrate, self.delegators[0], str(collator['id']), int(str(collator['stake'])))
-        self.assertTrue(receipt.is_success, 'Add delegator failed')
-        receipt = add_delegator(self.substrate, self.delegators[1], str(collator['id']), int(str(collator['stake'])))
-        self.assertTrue(receipt.is_success, 'Add delegator failed')
+        with pipelined() as pipe:
+            for kp in self.delegators:
+                add_delegator(self.substrate, kp, str(collator['id']), int(str(collator['stake'])))
+        for receipt in pipe.wait():
+            self.assertTrue(receipt.is_success, 'Add delegator failed')
 
         print('Wait for delegator get reward')
         self.assertTrue(self.wait_get_reward(self.delegators[0].ss58_address))
@@ -190,10 +183,11 @@ class TestDelegator(unittest.TestCase):
         self.assertNotEqual(collator, None)
 
         # Add the delegator
-        receipt = add_delegator(self.substrate, self.delegators[0], str(collator['id']), int(str(collator['stake'])))
-        self.assertTrue(receipt.is_success, 'Add delegator failed')
-        receipt = add_delegator(self.substrate, self.delegators[1], str(collator['id']), int(str(collator['stake'])))
-        self.assertTrue(receipt.is_success, 'Add delegator failed')
+        with pipelined() as pipe:
+            for kp in self.delegators:
+                add_delegator(self.substrate, kp, str(collator['id']), int(str(collator['stake'])))
+        for receipt in pipe.wait():
+            self.assertTrue(receipt.is_success, 'Add delegator failed')
 
         print('Wait for delegator get reward')
         self.assertTrue(self.wait_get_reward(self.delegators[0].ss58_address))
@@ -1,7 +1,8 @@
-from substrateinterface import SubstrateInterface, Keypair, KeypairType
+from substrateinterface import Keypair, KeypairType
 from peaq.eth import calculate_evm_account, calculate_evm_addr
 from peaq.extrinsic import transfer
 from tools.utils import WS_URL, ETH_URL
+from tools.connection_pool import get_substrate
 from tools.peaq_eth_utils import get_eth_chain_id
 from tools.peaq_eth_utils import deploy_contract
 from tools.peaq_eth_utils import call_eth_transfer_a_lot
@@ -11,6 +12,7 @@ from web3 import Web3
 import unittest
 
 import pprint
+from tools.keyring import keypair_from_uri
 pp = pprint.PrettyPrinter(indent=4)
 
 ERC_TOKEN_TRANSFER = 34
@@ -75,9 +77,9 @@ def call_copy(w3, address, kp_src, eth_chain_id, file_name, data):
 
 class TestEVMEthRPC(unittest.TestCase):
     def setUp(self):
-        self._conn = SubstrateInterface(url=WS_URL)
+        self._conn = get_substrate(WS_URL)
         self._eth_chain_id = get_eth_chain_id(self._conn)
-        self._kp_src = Keypair.create_from_uri('//Alice')
+        self._kp_src = keypair_from_uri('//Alice')
         self._eth_src = calculate_evm_addr(self._kp_src.ss58_address)
         self._kp_eth_src = Keypair.create_from_mnemonic(MNEMONIC[0], crypto_type=KeypairType.ECDSA)
         self._kp_eth_dst = Keypair.create_from_mnemonic(MNEMONIC[1], crypto_type=KeypairType.ECDSA)
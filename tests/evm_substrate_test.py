@@ -1,5 +1,5 @@
-from substrateinterface import SubstrateInterface, Keypair
 from tools.utils import WS_URL, KP_GLOBAL_SUDO
+from tools.connection_pool import get_substrate
 from peaq.eth import calculate_evm_account, calculate_evm_addr
 from peaq.sudo_extrinsic import funds
 from tools.peaq_eth_utils import get_eth_balance
@@ -7,6 +7,7 @@ from tools.payload import user_extrinsic_send
 import unittest
 
 import pprint
+from tools.keyring import keypair_from_uri
 pp = pprint.PrettyPrinter(indent=4)
 
 ERC_TOKEN_TRANSFER = 34
@@ -96,8 +97,8 @@ def get_eth_contract_code(conn, contract_addr):
 
 class TestEVMSubstrateExtrinsic(unittest.TestCase):
     def setUp(self):
-        self._conn = SubstrateInterface(url=WS_URL)
-        self._kp_src = Keypair.create_from_uri('//Alice')
+        self._conn = get_substrate(WS_URL)
+        self._kp_src = keypair_from_uri('//Alice')
         self._eth_src = calculate_evm_addr(self._kp_src.ss58_address)
         self._eth_deposited_src = calculate_evm_account(self._eth_src)
 
@@ -1,7 +1,9 @@
 import unittest
-from substrateinterface import SubstrateInterface, Keypair
+from tools.keypair_pool import new_keypair
 from tools.utils import WS_URL
+from tools.connection_pool import get_substrate
 from peaq.extrinsic import transfer
+from tools.keyring import keypair_from_uri
 
 
 class TestExitentialDeposits(unittest.TestCase):
@@ -13,9 +15,9 @@ class TestExitentialDeposits(unittest.TestCase):
         return result.value
 
     def setUp(self):
-        self.substrate = SubstrateInterface(url=WS_URL,)
-        self.alice = Keypair.create_from_uri('//Alice')
-        self.kp = Keypair.create_from_mnemonic(Keypair.generate_mnemonic())
+        self.substrate = get_substrate(WS_URL)
+        self.alice = keypair_from_uri('//Alice')
+        self.kp = new_keypair()
 
     def test_local_token(self):
         token = self.get_existential_deposit()
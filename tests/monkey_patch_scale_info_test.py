@@ -0,0 +1,58 @@
+import unittest
+
+from scalecodec.base import RuntimeConfigurationObject
+from scalecodec.type_registry import load_type_registry_preset
+from tools.monkey_patch_scale_info import ORIGINAL_PROCESS_ENCODE, process_encode
+
+
+ELEMENT_COUNT = 64
+
+
+class TestMonkeyPatchScaleInfo(unittest.TestCase):
+    """Offline, the packed integer arrays against the library's element by element encoding"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.runtime_config = RuntimeConfigurationObject()
+        cls.runtime_config.update_type_registry(load_type_registry_preset('core'))
+
+    def array(self, sub_type, element_count=ELEMENT_COUNT):
+        return self.runtime_config.create_scale_object(f'[{sub_type}; {element_count}]')
+
+    def test_int_arrays_byte_identical(self):
+        for width in [2, 4, 8, 16, 32]:
+            sub_type = f'u{width * 8}'
+            max_value = (1 << (width * 8)) - 1
+            values = [
+                [0] * ELEMENT_COUNT,
+                [max_value] * ELEMENT_COUNT,
+                [(i * 0x9E3779B97F4A7C15) & max_value for i in range(ELEMENT_COUNT)],
+                [str(i) for i in range(ELEMENT_COUNT)],
+            ]
+            for value in values:
+                with self.subTest(sub_type=sub_type, value=value[:2]):
+                    self.assertEqual(
+                        process_encode(self.array(sub_type), value).data,
+                        ORIGINAL_PROCESS_ENCODE(self.array(sub_type), value).data)
+
+    def test_out_of_range(self):
+        for width in [2, 4, 8, 16, 32]:
+            sub_type = f'u{width * 8}'
+            value = [0] * (ELEMENT_COUNT - 1) + [1 << (width * 8)]
+            with self.subTest(sub_type=sub_type):
+                with self.assertRaises(ValueError) as context:
+                    process_encode(self.array(sub_type), value)
+                self.assertEqual(str(context.exception), f'{1 << (width * 8)} out of range for {sub_type}')
+
+    def test_empty_value(self):
+        # Encoded as before the packing, as nothing
+        for sub_type in ['u16', 'u32', 'u128']:
+            with self.subTest(sub_type=sub_type):
+                self.assertEqual(process_encode(self.array(sub_type), None).data, bytearray())
+                self.assertEqual(process_encode(self.array(sub_type), []).data, bytearray())
+
+    def test_u8_array(self):
+        value = bytes(range(32))
+        self.assertEqual(
+            process_encode(self.array('u8', 32), value).data,
+            ORIGINAL_PROCESS_ENCODE(self.array('u8', 32), value).data)
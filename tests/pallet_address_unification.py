@@ -1,6 +1,8 @@
 import unittest
-from substrateinterface import SubstrateInterface, Keypair, KeypairType
+from substrateinterface import KeypairType
+from tools.keypair_pool import new_keypair
 from tools.utils import WS_URL, ETH_URL
+from tools.connection_pool import get_substrate
 from tools.utils import KP_GLOBAL_SUDO
 from tools.asset import batch_create_asset, batch_mint, get_valid_asset_id
 from tools.asset import get_asset_balance
@@ -73,12 +75,12 @@ def get_eth_account_balance(eth_addr):
 
 class TestPalletEvmAccounts(unittest.TestCase):
     def setUp(self):
-        self._substrate = SubstrateInterface(url=WS_URL)
+        self._substrate = get_substrate(WS_URL)
         self._eth_chain_id = get_eth_chain_id(self._substrate)
 
     def test_remove_account(self):
-        kp_sub = Keypair.create_from_mnemonic(Keypair.generate_mnemonic())
-        kp_eth = Keypair.create_from_mnemonic(Keypair.generate_mnemonic(), crypto_type=KeypairType.ECDSA)
+        kp_sub = new_keypair()
+        kp_eth = new_keypair(KeypairType.ECDSA)
         receipt = fund(self._substrate, KP_GLOBAL_SUDO, kp_sub, FUND_NUMBER)
         self.assertTrue(receipt.is_success, f'Failed to fund {kp_sub.ss58_address}, {receipt.error_message}')
         signature = calculate_claim_signature(
@@ -109,8 +111,8 @@ class TestPalletEvmAccounts(unittest.TestCase):
         self.assertEqual(out.value, None, f'Account {kp_sub.ss58_address} is not removed')
 
     def test_claim_account_native(self):
-        kp_sub = Keypair.create_from_mnemonic(Keypair.generate_mnemonic())
-        kp_eth = Keypair.create_from_mnemonic(Keypair.generate_mnemonic(), crypto_type=KeypairType.ECDSA)
+        kp_sub = new_keypair()
+        kp_eth = new_keypair(KeypairType.ECDSA)
         origin_evm_sub_addr = calculate_evm_account(kp_eth.ss58_address)
         batch = ExtrinsicBatch(self._substrate, KP_GLOBAL_SUDO)
         batch_fund(batch, kp_sub.ss58_address, FUND_NUMBER)
@@ -144,12 +146,12 @@ class TestPalletEvmAccounts(unittest.TestCase):
         # Check the sub wallet have the asset
         transfer_number = 7 * 10 ** 16
         kp_sub_src, kp_sub_dst = [
-            Keypair.create_from_mnemonic(Keypair.generate_mnemonic()),
-            Keypair.create_from_mnemonic(Keypair.generate_mnemonic())
+            new_keypair(),
+            new_keypair()
         ]
         kp_eth_src, kp_eth_dst = [
-            Keypair.create_from_mnemonic(Keypair.generate_mnemonic(), crypto_type=KeypairType.ECDSA),
-            Keypair.create_from_mnemonic(Keypair.generate_mnemonic(), crypto_type=KeypairType.ECDSA)
+            new_keypair(KeypairType.ECDSA),
+            new_keypair(KeypairType.ECDSA)
         ]
         receipt = funds(
             self._substrate, KP_GLOBAL_SUDO,
@@ -194,8 +196,8 @@ class TestPalletEvmAccounts(unittest.TestCase):
             f'Balance is not correct, {balance} != {transfer_number}')
 
     def test_claim_account_withdraw(self):
-        kp_sub = Keypair.create_from_mnemonic(Keypair.generate_mnemonic())
-        kp_eth = Keypair.create_from_mnemonic(Keypair.generate_mnemonic(), crypto_type=KeypairType.ECDSA)
+        kp_sub = new_keypair()
+        kp_eth = new_keypair(KeypairType.ECDSA)
         origin_evm_sub_addr = calculate_evm_account(calculate_evm_addr(kp_sub.ss58_address))
         batch = ExtrinsicBatch(self._substrate, KP_GLOBAL_SUDO)
         batch_fund(batch, origin_evm_sub_addr, FUND_NUMBER)
@@ -232,7 +234,7 @@ class TestPalletEvmAccounts(unittest.TestCase):
         self.assertEqual(now_value, 0, f'The balance is the same, {now_value} != 0')
 
     def test_claim_default_account(self):
-        kp_sub = Keypair.create_from_mnemonic(Keypair.generate_mnemonic())
+        kp_sub = new_keypair()
 
         receipt = fund(self._substrate, KP_GLOBAL_SUDO, kp_sub, FUND_NUMBER)
         self.assertTrue(receipt.is_success, f'Failed to fund {kp_sub.ss58_address}, {receipt.error_message}')
@@ -251,7 +253,7 @@ class TestPalletEvmAccounts(unittest.TestCase):
         self.assertNotEqual(balance, 0, f'The balance is not correct, {balance} == 0')
 
     def test_transfer_to_evm_directly(self):
-        kp_sub = Keypair.create_from_mnemonic(Keypair.generate_mnemonic())
+        kp_sub = new_keypair()
 
         batch = ExtrinsicBatch(self._substrate, KP_GLOBAL_SUDO)
         batch_fund(batch, kp_sub.ss58_address, FUND_NUMBER)
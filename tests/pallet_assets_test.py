@@ -1,12 +1,13 @@
 import unittest
 import sys
 sys.path.append('./')
-from substrateinterface import SubstrateInterface, Keypair
 from tools.utils import WS_URL, KP_GLOBAL_SUDO
+from tools.connection_pool import get_substrate
 from tools.asset import batch_create_asset, batch_set_metadata, batch_mint, get_valid_asset_id
 from tools.asset import get_asset_balance, convert_enum_to_asset_id
 from peaq.utils import ExtrinsicBatch
 from peaq.sudo_extrinsic import fund
+from tools.keyring import keypair_from_uri
 
 
 def set_metadata(conn, kp_admin, asset_id, name, symbol, decimals):
@@ -132,9 +133,9 @@ def batch_thaw(batch, kp_src, asset_id):
 # Only for partial testing
 class pallet_assets_test(unittest.TestCase):
     def setUp(self):
-        self._substrate = SubstrateInterface(url=WS_URL)
-        self._kp_creator = Keypair.create_from_uri('//Alice')
-        self._kp_admin = Keypair.create_from_uri('//Bob')
+        self._substrate = get_substrate(WS_URL)
+        self._kp_creator = keypair_from_uri('//Alice')
+        self._kp_admin = keypair_from_uri('//Bob')
         fund(self._substrate, KP_GLOBAL_SUDO, self._kp_admin, 100000 * 10 ** 18)
 
     def test_create_asset(self):
@@ -167,7 +168,7 @@ class pallet_assets_test(unittest.TestCase):
         batch = ExtrinsicBatch(conn, self._kp_creator)
         receipt = create_asset(conn, self._kp_creator, kp_admin, asset_id)
         self.assertTrue(receipt.is_success, f'Extrinsic Failed: {receipt.error_message}')
-        kp_src = Keypair.create_from_uri('//Alice//stash')
+        kp_src = keypair_from_uri('//Alice//stash')
 
         # Execute
         batch = ExtrinsicBatch(conn, kp_admin)
@@ -191,7 +192,7 @@ class pallet_assets_test(unittest.TestCase):
         batch = ExtrinsicBatch(conn, self._kp_creator)
         receipt = create_asset(conn, self._kp_creator, kp_admin, asset_id)
         self.assertTrue(receipt.is_success, f'Extrinsic Failed: {receipt.error_message}')
-        kp_dst = Keypair.create_from_uri('//Alice//stash')
+        kp_dst = keypair_from_uri('//Alice//stash')
 
         # Execute
         batch = ExtrinsicBatch(conn, kp_admin)
@@ -233,13 +234,13 @@ class pallet_assets_test(unittest.TestCase):
         conn = self._substrate
         asset_id = get_valid_asset_id(conn)
 
-        kp_creator = Keypair.create_from_uri('//Alice')
-        kp_admin = Keypair.create_from_uri('//Bob')
+        kp_creator = keypair_from_uri('//Alice')
+        kp_admin = keypair_from_uri('//Bob')
         # Done
         receipt = create_asset(conn, kp_creator, kp_admin, asset_id)
         self.assertTrue(receipt.is_success, f'Extrinsic Failed: {receipt.error_message}')
 
-        kp_src = Keypair.create_from_uri('//Alice//stash')
+        kp_src = keypair_from_uri('//Alice//stash')
         mint_number = 10000
         # Done
         receipt = mint(conn, kp_admin, kp_src.ss58_address, asset_id, mint_number)
@@ -259,7 +260,7 @@ class pallet_assets_test(unittest.TestCase):
             f'Balance is not correct: {get_asset_balance(conn, kp_src.ss58_address, asset_id).value["balance"]}')
 
         transfer_number = 500
-        kp_dst = Keypair.create_from_uri('//Bob//stash')
+        kp_dst = keypair_from_uri('//Bob//stash')
         # Done
         receipt = transfer(conn, kp_src, kp_dst, asset_id, transfer_number)
         self.assertTrue(receipt.is_success, f'Extrinsic Failed: {receipt.error_message}')
@@ -373,7 +374,7 @@ class pallet_assets_test(unittest.TestCase):
         batch = ExtrinsicBatch(conn, self._kp_creator)
         receipt = create_asset(conn, self._kp_creator, kp_admin, asset_id)
         self.assertTrue(receipt.is_success, f'Extrinsic Failed: {receipt.error_message}')
-        kp_dst = Keypair.create_from_uri('//Alice//stash')
+        kp_dst = keypair_from_uri('//Alice//stash')
 
         # Execute
         batch = ExtrinsicBatch(conn, kp_admin)
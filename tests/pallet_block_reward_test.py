@@ -1,9 +1,10 @@
 import time
 
-from substrateinterface import SubstrateInterface, Keypair
 from tools.utils import WS_URL
+from tools.connection_pool import get_substrate
 from tools.utils import set_max_currency_supply, set_block_reward_configuration
 import unittest
+from tools.keyring import keypair_from_uri
 
 COLLATOR_REWARD_RATE = 0.1
 WAIT_TIME_PERIOD = 12 * 3
@@ -12,8 +13,8 @@ WAIT_TIME_PERIOD = 12 * 3
 class TestPalletBlockReward(unittest.TestCase):
 
     def setUp(self):
-        self.substrate = SubstrateInterface(url=WS_URL)
-        self.kp_src = Keypair.create_from_uri('//Alice')
+        self.substrate = get_substrate(WS_URL)
+        self.kp_src = keypair_from_uri('//Alice')
 
     def test_config(self):
         set_value = {
@@ -1,16 +1,17 @@
 import unittest
 import time
 
-from substrateinterface import SubstrateInterface, Keypair
 from tools.utils import WS_URL
+from tools.connection_pool import get_substrate
 from peaq.utils import ExtrinsicBatch
 from peaq.did import did_add_payload, did_update_payload, did_remove_payload, did_rpc_read
+from tools.keyring import keypair_from_uri
 
 
 class TestPalletDid(unittest.TestCase):
     def setUp(self):
-        self.substrate = SubstrateInterface(url=WS_URL)
-        self.kp_src = Keypair.create_from_uri('//Alice')
+        self.substrate = get_substrate(WS_URL)
+        self.kp_src = keypair_from_uri('//Alice')
 
     def test_did_add(self):
         name = int(time.time())
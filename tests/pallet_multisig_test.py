@@ -1,18 +1,19 @@
 import unittest
-from substrateinterface import SubstrateInterface, Keypair
 from tools.utils import TOKEN_NUM_BASE, WS_URL
+from tools.connection_pool import get_substrate
 from tools.utils import show_account, send_approval, send_proposal, get_as_multi_extrinsic_id
 from peaq.extrinsic import transfer
 from peaq.utils import calculate_multi_sig
 import random
+from tools.keyring import keypair_from_uri
 
 
 class PalletMultisig(unittest.TestCase):
 
     def setUp(self):
-        self.substrate = SubstrateInterface(url=WS_URL,)
-        self.kp_src = Keypair.create_from_uri('//Alice')
-        self.kp_dst = Keypair.create_from_uri('//Bob//stash')
+        self.substrate = get_substrate(WS_URL)
+        self.kp_src = keypair_from_uri('//Alice')
+        self.kp_dst = keypair_from_uri('//Bob//stash')
 
     def test_multisig(self):
         threshold = 2
@@ -1,8 +1,10 @@
 import traceback
+import secrets
 import sys
 
-from substrateinterface import SubstrateInterface, Keypair
+from tools.keyring import lazy_new_keypair
 from tools.utils import WS_URL
+from tools.connection_pool import get_substrate
 from peaq.sudo_extrinsic import fund
 from peaq.utils import ExtrinsicBatch
 from peaq.rbac import rbac_add_role_payload, rbac_add_group_payload, rbac_add_permission_payload
@@ -20,8 +22,9 @@ from tools.utils import KP_GLOBAL_SUDO
 import unittest
 
 
-KP_TEST = Keypair.create_from_mnemonic(Keypair.generate_mnemonic())
-RANDOM_PREFIX = KP_TEST.public_key.hex()[2:26]
+KP_TEST = lazy_new_keypair()
+# Only has to be unique per run, so the test account isn't derived at import for it
+RANDOM_PREFIX = secrets.token_hex(12)
 
 ##############################################################################
 # Constants for global test-setup defaults
@@ -376,7 +379,7 @@ class TestPalletRBAC(unittest.TestCase):
         show_success_msg('verify_rpc_fail_disabled_id')
 
     def setUp(self):
-        self.substrate = SubstrateInterface(url=WS_URL)
+        self.substrate = get_substrate(WS_URL)
 
     def test_pallet_rbac(self):
         print('---- pallet_rbac_test!! ----')
@@ -1,19 +1,20 @@
 import time
 from tools.utils import WS_URL
-from substrateinterface import SubstrateInterface, Keypair
+from tools.connection_pool import get_substrate
 from peaq.utils import ExtrinsicBatch
 from peaq.storage import storage_add_payload, storage_update_payload, storage_rpc_read
 
 import unittest
+from tools.keyring import keypair_from_uri
 
 
 class TestPalletStorage(unittest.TestCase):
 
     def setUp(self):
-        self._substrate = SubstrateInterface(url=WS_URL)
+        self._substrate = get_substrate(WS_URL)
 
     def test_storage(self):
-        kp_src = Keypair.create_from_uri('//Alice')
+        kp_src = keypair_from_uri('//Alice')
         batch = ExtrinsicBatch(self._substrate, kp_src)
         item_type = f'0x{int(time.time())}'
         item = '0x032132'
@@ -27,7 +28,7 @@ class TestPalletStorage(unittest.TestCase):
             item)
 
     def test_storage_update(self):
-        kp_src = Keypair.create_from_uri('//Alice')
+        kp_src = keypair_from_uri('//Alice')
         batch = ExtrinsicBatch(self._substrate, kp_src)
         item_type = f'0x{int(time.time())}'
         item = '0x032132'
@@ -1,7 +1,8 @@
 import unittest
-from substrateinterface import SubstrateInterface, Keypair
 from tools.utils import WS_URL
+from tools.connection_pool import get_substrate
 from tools.payload import user_extrinsic_send
+from tools.keyring import keypair_from_uri
 
 
 def get_service_request_call(substrate, kp_dst, token_num):
@@ -47,9 +48,9 @@ def service_deliver(substrate, kp_src, kp_dst, receipt, call):
 
 class TestPalletTransaction(unittest.TestCase):
     def setUp(self):
-        self.substrate = SubstrateInterface(url=WS_URL)
-        self.kp_src = Keypair.create_from_uri('//Alice')
-        self.kp_dst = Keypair.create_from_uri('//Bob//stash')
+        self.substrate = get_substrate(WS_URL)
+        self.kp_src = keypair_from_uri('//Alice')
+        self.kp_dst = keypair_from_uri('//Bob//stash')
 
     def test_transaction(self):
         # fund(substrate, kp_src, 500)
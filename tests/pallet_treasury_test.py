@@ -1,10 +1,11 @@
-from substrateinterface import SubstrateInterface, Keypair
 from tools.utils import WS_URL, TOKEN_NUM_BASE_DEV, KP_GLOBAL_SUDO
+from tools.connection_pool import get_substrate
 from peaq.utils import show_extrinsic
 from peaq.utils import ExtrinsicBatch
 from tools.utils import batch_fund
 from tools.payload import sudo_call_compose, sudo_extrinsic_send, user_extrinsic_send
 import unittest
+from tools.keyring import keypair_from_uri
 
 # Assumptions
 # 1. Treasury address is:'5EYCAe5ijiYfyeZ2JJCGq56LmPyNRAKzpG4QkoQkkQNB5e6Z'
@@ -12,10 +13,10 @@ import unittest
 # Global Constants
 
 # accounts to carty out diffirent transactions
-KP_USER = Keypair.create_from_uri('//Alice')
-KP_COUNCIL_FIRST_MEMBER = Keypair.create_from_uri('//Bob')
-KP_COUNCIL_SECOND_MEMBER = Keypair.create_from_uri('//Eve')
-KP_BENEFICIARY = Keypair.create_from_uri('//Dave')
+KP_USER = keypair_from_uri('//Alice')
+KP_COUNCIL_FIRST_MEMBER = keypair_from_uri('//Bob')
+KP_COUNCIL_SECOND_MEMBER = keypair_from_uri('//Eve')
+KP_BENEFICIARY = keypair_from_uri('//Dave')
 KP_TREASURY = '5EYCAe5ijiYfyeZ2JJCGq56LmPyNRAKzpG4QkoQkkQNB5e6Z'
 
 WEIGHT_BOND = {
@@ -81,7 +82,7 @@ def spend(substrate, value, beneficiary):
 
 class TestTreasury(unittest.TestCase):
     def setUp(self):
-        self.substrate = SubstrateInterface(url=WS_URL)
+        self.substrate = get_substrate(WS_URL)
 
     # To submit a spend proposal
     def propose_spend(self, value, beneficiary, kp_member):
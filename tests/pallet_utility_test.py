@@ -1,8 +1,9 @@
-from substrateinterface import SubstrateInterface, Keypair
 from tools.utils import WS_URL, TOKEN_NUM_BASE
+from tools.connection_pool import get_substrate
 from peaq.utils import show_extrinsic
 from tools.utils import show_account
 import unittest
+from tools.keyring import keypair_from_uri
 
 # An arbitrary amount to be transfered from source to destination
 AMOUNT_TO_BE_TRANSFERED = 1
@@ -14,15 +15,13 @@ AMOUNT_TO_BE_TRANSFERED = 1
 class TestPalletUtility(unittest.TestCase):
 
     # source account
-    kp_src = Keypair.create_from_uri('//Alice')
+    kp_src = keypair_from_uri('//Alice')
     # destination account
-    kp_dst = Keypair.create_from_uri('//Eve')
+    kp_dst = keypair_from_uri('//Eve')
 
     def setUp(self):
         # deinfe a conneciton with a peaq-network node
-        self.substrate = SubstrateInterface(
-                url=WS_URL
-            )
+        self.substrate = get_substrate(WS_URL)
 
     def test_all_valid_extrinsics_bath(self):
         substrate = self.substrate
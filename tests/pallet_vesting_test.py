@@ -1,9 +1,10 @@
 import math
-from substrateinterface import SubstrateInterface, Keypair
+import pytest
+from tools.funding_service import FUNDING_SERVICE
 from tools.utils import WS_URL, TOKEN_NUM_BASE_DEV, KP_GLOBAL_SUDO
+from tools.connection_pool import get_substrate
 from tools.utils import get_account_balance_locked
 from peaq.utils import get_account_balance
-from peaq.sudo_extrinsic import funds
 from peaq.utils import wait_for_n_blocks
 from tools.payload import sudo_call_compose, sudo_extrinsic_send, user_extrinsic_send
 import unittest
@@ -18,6 +19,7 @@ import unittest
 TRANSFER_AMOUNT = 100 * TOKEN_NUM_BASE_DEV
 PER_BLOCK_AMOUNT = 20 * TOKEN_NUM_BASE_DEV
 NO_OF_BLOCKS_TO_WAIT = math.ceil(TRANSFER_AMOUNT / PER_BLOCK_AMOUNT) + 2
+FUND_AMOUNT = 1000 * TOKEN_NUM_BASE_DEV
 
 
 # Schedule transfer of some amount from a souce to target account
@@ -89,13 +91,12 @@ def get_schedule_index(substrate, kp_target):
     return len((result.value)) - 1
 
 
+@pytest.mark.accounts(4, amount=FUND_AMOUNT)
 class TestPalletVesting(unittest.TestCase):
     def setUp(self):
-        self._substrate = SubstrateInterface(url=WS_URL)
-        self._kp_user = Keypair.create_from_mnemonic(Keypair.generate_mnemonic())
-        self._kp_source = Keypair.create_from_mnemonic(Keypair.generate_mnemonic())
-        self._kp_target = Keypair.create_from_mnemonic(Keypair.generate_mnemonic())
-        self._kp_target_second = Keypair.create_from_mnemonic(Keypair.generate_mnemonic())
+        self._substrate = get_substrate(WS_URL)
+        self._kp_user, self._kp_source, self._kp_target, self._kp_target_second = \
+            FUNDING_SERVICE.take_many(4, amount=FUND_AMOUNT)
 
     def vested_transfer_test(self, substrate, kp_user, kp_target):
 
@@ -291,12 +292,6 @@ class TestPalletVesting(unittest.TestCase):
         # there may be no such dependencies and each test is
         # performed independend of others
 
-        # To fund accounts, if sufficient  funds are not available
-        funds(substrate,
-              KP_GLOBAL_SUDO,
-              [kp_user.ss58_address, kp_source.ss58_address, kp_target.ss58_address, kp_target_second.ss58_address],
-              1000 * TOKEN_NUM_BASE_DEV)
-
         self.vested_transfer_test(substrate, kp_user, kp_target)
         self.forced_vested_transfer_test(substrate, kp_user, kp_source, kp_target)
         self.merge_schedule_test(substrate, kp_source, kp_target_second)
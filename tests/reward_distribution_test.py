@@ -1,21 +1,22 @@
-import time
 import pytest
 
-from substrateinterface import SubstrateInterface, Keypair
 from tools.utils import WS_URL, TOKEN_NUM_BASE
+from tools.connection_pool import get_substrate
+from tools.block_cache import BLOCK_CACHE
+from tools.block_wait import wait_for_blocks, wait_until
 from peaq.extrinsic import transfer, transfer_with_tip
 from peaq.utils import get_account_balance
-from tools.utils import KP_COLLATOR, KP_GLOBAL_SUDO
-from tools.utils import setup_block_reward
-from peaq.utils import ExtrinsicBatch
+from tools.utils import KP_COLLATOR
+from tools.utils import setup_block_reward, set_max_currency_supply, set_block_reward_configuration
+from tools.payload import batched
 import unittest
 from tests.utils_func import restart_parachain_and_runtime_upgrade
 from tests import utils_func as TestUtils
+from tools.keyring import keypair_from_uri
 
 WAIT_BLOCK_NUMBER = 10
 COLLATOR_REWARD_RATE = 0.1
-WAIT_ONLY_ONE_BLOCK_PERIOD = 12
-WAIT_TIME_PERIOD = WAIT_ONLY_ONE_BLOCK_PERIOD * 3
+WAIT_BLOCKS = 3
 REWARD_PERCENTAGE = 0.5
 REWARD_ERROR = 0.0001
 TIP = 10 ** 20
@@ -23,53 +24,36 @@ FEE_MIN_LIMIT = 30 * 10**9  # 30nPEAQ
 FEE_MAX_LIMIT = 90 * 10**9  # 90nPEAQ
 
 
-def batch_compose_block_reward(batch, block_reward):
-    batch.compose_sudo_call(
-        'BlockReward',
-        'set_block_issue_reward',
-        {
-            'block_reward': block_reward
-        }
-    )
-
-
-def batch_compose_reward_distribution(batch, collator_reward_rate):
-    batch.compose_sudo_call(
-        'BlockReward',
-        'set_configuration',
-        {
-            'reward_distro_params': {
-                'treasury_percent': 0,
-                'depin_incentivization_percent': 0,
-                'collators_delegators_percent': 1000000000 * collator_reward_rate,
-                'depin_staking_percent': 0,
-                'coretime_percent': 0,
-                'subsidization_pool_percent': 1000000000 * (1 - collator_reward_rate),
-            }
-        }
-    )
-
-
-def batch_extend_max_supply(substrate, batch):
+def setup_reward(substrate, block_reward, collator_reward_rate):
+    """Extends the max supply and sets the block reward and its distribution, in one sudo extrinsic"""
     total_issuance = substrate.query(
         module='Balances',
         storage_function='TotalIssuance',
     )
-    batch.compose_sudo_call('BlockReward', 'set_max_currency_supply', {
-        'limit': int(str(total_issuance)) * 3
-    })
+    with batched(substrate) as batch:
+        set_max_currency_supply(substrate, int(str(total_issuance)) * 3)
+        setup_block_reward(substrate, block_reward)
+        set_block_reward_configuration(substrate, {
+            'treasury_percent': 0,
+            'depin_incentivization_percent': 0,
+            'collators_delegators_percent': 1000000000 * collator_reward_rate,
+            'depin_staking_percent': 0,
+            'coretime_percent': 0,
+            'subsidization_pool_percent': 1000000000 * (1 - collator_reward_rate),
+        })
+    return batch.receipt
 
 
 class TestRewardDistribution(unittest.TestCase):
-    _kp_bob = Keypair.create_from_uri('//Bob')
-    _kp_eve = Keypair.create_from_uri('//Eve')
+    _kp_bob = keypair_from_uri('//Bob')
+    _kp_eve = keypair_from_uri('//Eve')
 
     @classmethod
     def setUpClass(cls):
         restart_parachain_and_runtime_upgrade()
 
     def setUp(self):
-        self._substrate = SubstrateInterface(url=WS_URL)
+        self._substrate = get_substrate(WS_URL)
 
     def get_block_issue_reward(self):
         block_reward = self._substrate.query(
@@ -82,24 +66,24 @@ class TestRewardDistribution(unittest.TestCase):
         event = self._get_event(block_hash, 'ParachainStaking', 'Rewarded')
         if not event:
             return None
-        return int(str(event[1][1][1]))
+        return int(str(event['attributes'][1]))
 
     def get_transaction_payment_fee_paid(self, block_hash):
         event = self._get_event(block_hash, 'TransactionPayment', 'TransactionFeePaid')
         if not event:
             return None
-        return int(str(event[1][1]['actual_fee']))
+        return int(str(event['attributes']['actual_fee']))
 
     def get_transaction_fee_distributed(self, block_hash):
         event = self._get_event(block_hash, 'BlockReward', 'TransactionFeesDistributed')
         if not event:
             return None
-        return int(str(event[1][1]))
+        return int(str(event['attributes']))
 
     def _get_event(self, block_hash, pallet, event_name):
-        for event in self._substrate.get_events(block_hash):
-            if event.value['module_id'] != pallet or \
-               event.value['event_id'] != event_name:
+        for event in BLOCK_CACHE.get_events(self._substrate, block_hash):
+            if event['module_id'] != pallet or \
+               event['event_id'] != event_name:
                 continue
             return event['event']
         return None
@@ -125,8 +109,10 @@ class TestRewardDistribution(unittest.TestCase):
         self.assertNotEqual(
             tx_reward, None,
             f'Cannot find the block event for transaction reward {tx_reward}')
-        if self._substrate.get_block()['header']['number'] != block_height + 1:
-            time.sleep(12)
+        wait_until(
+            self._substrate,
+            lambda: self._substrate.get_block_header()['header']['number'] >= block_height + 1,
+            max_blocks=2)
 
         next_block_hash = self._substrate.get_block_hash(block_height + 1)
         next_reward = self.get_parachain_reward(next_block_hash)
@@ -184,12 +170,12 @@ class TestRewardDistribution(unittest.TestCase):
             #   dynamicFee.noteMinGasPriceTarget
             #   parachainSystem.setValidationData)
             if len(self._substrate.get_block(prev_hash)['extrinsics']) != 3:
-                time.sleep(WAIT_ONLY_ONE_BLOCK_PERIOD)
+                wait_for_blocks(self._substrate, 1)
                 continue
             event = self._get_event(now_hash, 'Balances', 'Transfer')
-            if event is None or str(event[1][1]['to']) != kp_src.ss58_address:
+            if event is None or str(event['attributes']['to']) != kp_src.ss58_address:
                 print(f'The event is {event}, or the receiver is not {kp_src.ss58_address}')
-                time.sleep(WAIT_ONLY_ONE_BLOCK_PERIOD)
+                wait_for_blocks(self._substrate, 1)
                 continue
 
             now_balance = get_account_balance(self._substrate, kp_src.ss58_address, block_hash=now_hash)
@@ -202,11 +188,7 @@ class TestRewardDistribution(unittest.TestCase):
 
     def test_block_reward(self):
         # Setup
-        batch = ExtrinsicBatch(self._substrate, KP_GLOBAL_SUDO)
-        batch_compose_block_reward(batch, 10000)
-        batch_extend_max_supply(self._substrate, batch)
-        batch_compose_reward_distribution(batch, COLLATOR_REWARD_RATE)
-        receipt = batch.execute()
+        receipt = setup_reward(self._substrate, 10000, COLLATOR_REWARD_RATE)
         self.assertTrue(receipt.is_success, f'Cannot execute the block reward extrinsic {receipt}')
 
         # Execute
@@ -215,7 +197,7 @@ class TestRewardDistribution(unittest.TestCase):
         block_reward = self.get_block_issue_reward()
         self.assertNotEqual(block_reward, 0, 'block reward should not be zero')
 
-        time.sleep(WAIT_ONLY_ONE_BLOCK_PERIOD)
+        wait_for_blocks(self._substrate, 1)
 
         self.assertTrue(
             self._check_block_reward_in_event(KP_COLLATOR, block_reward), 'Did not find the block reward event')
@@ -226,14 +208,10 @@ class TestRewardDistribution(unittest.TestCase):
 
         # setup
         block_reward = self.get_block_issue_reward()
-        batch = ExtrinsicBatch(self._substrate, KP_GLOBAL_SUDO)
-        batch_extend_max_supply(self._substrate, batch)
-        batch_compose_block_reward(batch, 0)
-        batch_compose_reward_distribution(batch, COLLATOR_REWARD_RATE)
-        receipt = batch.execute()
+        receipt = setup_reward(self._substrate, 0, COLLATOR_REWARD_RATE)
         self.assertTrue(receipt.is_success, f'Cannot execute the block reward extrinsic {receipt}')
 
-        time.sleep(WAIT_TIME_PERIOD)
+        wait_for_blocks(self._substrate, WAIT_BLOCKS)
 
         # Execute
         # Note, the Collator maybe collected by another one
@@ -258,14 +236,10 @@ class TestRewardDistribution(unittest.TestCase):
         block_reward = self.get_block_issue_reward()
         print(f'Current reward: {block_reward}')
 
-        batch = ExtrinsicBatch(self._substrate, KP_GLOBAL_SUDO)
-        batch_extend_max_supply(self._substrate, batch)
-        batch_compose_block_reward(batch, 0)
-        batch_compose_reward_distribution(batch, COLLATOR_REWARD_RATE)
-        receipt = batch.execute()
+        receipt = setup_reward(self._substrate, 0, COLLATOR_REWARD_RATE)
         self.assertTrue(receipt.is_success, f'Cannot execute the block reward extrinsic {receipt}')
 
-        time.sleep(WAIT_TIME_PERIOD)
+        wait_for_blocks(self._substrate, WAIT_BLOCKS)
         prev_balance = get_account_balance(self._substrate, KP_COLLATOR.ss58_address)
 
         # Execute
@@ -277,7 +251,7 @@ class TestRewardDistribution(unittest.TestCase):
 
         # Check
         self._check_transaction_fee_reward_event(receipt.block_hash, TIP)
-        time.sleep(WAIT_TIME_PERIOD)
+        wait_for_blocks(self._substrate, WAIT_BLOCKS)
         self._check_transaction_fee_reward_balance(
             KP_COLLATOR.ss58_address, prev_balance, TIP)
 
@@ -1,7 +1,7 @@
 import unittest
 
-from substrateinterface import SubstrateInterface
 from tools.utils import WS_URL
+from tools.connection_pool import get_substrate
 from peaq.utils import get_block_height, get_block_hash, get_chain
 from tests.utils_func import restart_parachain_and_runtime_upgrade
 from tools.runtime_upgrade import wait_until_block_height
@@ -189,8 +189,8 @@ class TokenEconomyTest(unittest.TestCase):
 
     def setUp(self):
         restart_parachain_and_runtime_upgrade()
-        wait_until_block_height(SubstrateInterface(url=WS_URL), 1)
-        self._substrate = SubstrateInterface(url=WS_URL)
+        wait_until_block_height(get_substrate(WS_URL), 1)
+        self._substrate = get_substrate(WS_URL)
         current_height = get_block_height(self._substrate)
         self._block_hash = get_block_hash(self._substrate, current_height)
         self._chain_spec = get_chain(self._substrate)
@@ -4,7 +4,7 @@ sys.path.append('./')
 import sys
 import time
 import json
-from substrateinterface import SubstrateInterface, Keypair
+from substrateinterface import SubstrateInterface
 from tools.utils import send_service_request, WS_URL
 from peaq.sudo_extrinsic import fund
 from tools.utils import deposit_money_to_multsig_wallet
@@ -12,6 +12,7 @@ from tools.utils import _approve_token
 from threading import Thread
 import requests
 import pytest
+from tools.keyring import keypair_from_uri
 
 
 @pytest.mark.skip(reason="Only test for the charging simulator")
@@ -29,7 +30,7 @@ def user_simulation_test(kp_consumer):
         print("⚠️ No local Substrate node running, try running 'start_local_substrate_node.sh' first")
         sys.exit()
 
-    kp_provider = Keypair.create_from_uri('//Alice')
+    kp_provider = keypair_from_uri('//Alice')
     # Fund first
     fund(substrate, kp_consumer, 500)
 
@@ -79,7 +80,7 @@ class SubstrateMonitor():
 
 
 if __name__ == '__main__':
-    kp_consumer = Keypair.create_from_uri('//Alice/stash')
+    kp_consumer = keypair_from_uri('//Alice/stash')
     monitor = SubstrateMonitor(kp_consumer, 2)
     monitor_thread = Thread(target=monitor.run_substrate_monitor)
     monitor_thread.start()
@@ -1,10 +1,11 @@
 import os
 
 from tools.utils import WS_URL
+from tools.connection_pool import get_substrate
 from peaq.utils import get_chain
-from tools.restart import restart_parachain_launch
+from tools.restart import restart_parachain_launch, SNAPSHOT_ENABLED
+from tools.restart import parachain_snapshot_tag, restore_parachain_snapshot, take_parachain_snapshot
 from tools.runtime_upgrade import do_runtime_upgrade
-from substrateinterface import SubstrateInterface
 
 
 def is_runtime_upgrade_test():
@@ -15,15 +16,35 @@ def get_runtime_upgrade_path():
     return os.environ.get('RUNTIME_UPGRADE_PATH')
 
 
+def _runtime_upgrade_snapshot_key():
+    if not is_runtime_upgrade_test():
+        return ''
+    path = get_runtime_upgrade_path()
+    return f'{os.path.abspath(path)}:{os.path.getmtime(path)}'
+
+
 def restart_parachain_and_runtime_upgrade():
+    """
+    The first call boots the chain (and upgrades the runtime) from scratch and
+    snapshots the node volumes, the following calls only restore the snapshot.
+    """
+    if SNAPSHOT_ENABLED:
+        tag = parachain_snapshot_tag(_runtime_upgrade_snapshot_key())
+        if restore_parachain_snapshot(tag):
+            return
+
     restart_parachain_launch()
     if is_runtime_upgrade_test():
         path = get_runtime_upgrade_path()
         do_runtime_upgrade(path)
 
+    if SNAPSHOT_ENABLED:
+        # Containers are rebuilt by the restart, so the tag can change
+        take_parachain_snapshot(parachain_snapshot_tag(_runtime_upgrade_snapshot_key()))
+
 
 def is_not_dev_chain():
-    ws = SubstrateInterface(url=WS_URL)
+    ws = get_substrate(WS_URL)
     chain_name = get_chain(ws)
     print(f'chain_name: {chain_name}')
     return chain_name not in ['peaq-dev', 'peaq-dev-fork']
@@ -4,8 +4,9 @@ sys.path.append('./')
 import unittest
 from tests.utils_func import restart_parachain_and_runtime_upgrade
 from tools.runtime_upgrade import wait_until_block_height
-from substrateinterface import SubstrateInterface, Keypair
+from tools.keypair_pool import new_keypair
 from tools.utils import WS_URL, RELAYCHAIN_WS_URL, ACA_WS_URL, PARACHAIN_WS_URL
+from tools.connection_pool import get_substrate
 from peaq.utils import get_account_balance
 from peaq.utils import ExtrinsicBatch
 from peaq.sudo_extrinsic import fund
@@ -18,7 +19,7 @@ from tools.asset import ACA_ASSET_LOCATION, ACA_METADATA, PEAQ_ASSET_LOCATION
 from tools.asset import RELAY_ASSET_LOCATION, RELAY_METADATA, RELAY_ASSET_ID
 from tools.asset import PEAQ_METADATA, PEAQ_ASSET_ID
 from tools.asset import ACA_ASSET_ID
-from tools.utils import get_peaq_chain_id
+from tools.chain_params import PEAQ_PARAMS, LazyDict
 from tools.asset import batch_create_asset, batch_mint, batch_set_metadata, batch_force_create_asset
 from tools.asset import convert_enum_to_asset_id
 from tools.zenlink import compose_zdex_create_lppair, compose_zdex_add_liquidity
@@ -26,16 +27,15 @@ from tools.asset import wait_for_account_asset_change_wrap
 from tools.asset import get_balance_account_from_pallet_balance
 from tools.asset import get_tokens_account_from_pallet_assets
 from tools.asset import get_tokens_account_from_pallet_tokens
+from tools.keyring import keypair_from_uri
 # import pytest
 
 
-PEAQ_PD_CHAIN_ID = get_peaq_chain_id()
-
 TEST_TOKEN_NUM = 10 * 10 ** 15
 INIT_TOKEN_NUM = 10 ** 18
 # For avoid exhaust tokens
 REMAIN_TOKEN_NUM = 10000
-KP_CHARLIE = Keypair.create_from_uri('//Charlie')
+KP_CHARLIE = keypair_from_uri('//Charlie')
 
 XCM_VER = 'V3'  # So far not tested with V2!
 
@@ -55,7 +55,7 @@ TEST_ASSET_ID = {
     }
 }
 
-TEST_ASSET_TOKEN = {
+TEST_ASSET_TOKEN = LazyDict(lambda: {
     'peaq': {
         XCM_VER: {
             'parents': '0',
@@ -73,7 +73,7 @@ TEST_ASSET_TOKEN = {
         XCM_VER: {
             'parents': '1',
             'interior': {
-                'X2': [{'Parachain': PEAQ_PD_CHAIN_ID}, {
+                'X2': [{'Parachain': PEAQ_PARAMS.para_id}, {
                     'GeneralKey': {
                         'length': 2,
                         'data': [0, TEST_ASSET_IDX] + [0] * 30,
@@ -82,7 +82,7 @@ TEST_ASSET_TOKEN = {
             }
         }
     }
-}
+})
 
 TEST_LP_ASSET_ID = {
     'peaq': convert_enum_to_asset_id({'LPToken': [0, 1]}),
@@ -91,7 +91,7 @@ TEST_LP_ASSET_ID = {
     }
 }
 
-TEST_LP_ASSET_TOKEN = {
+TEST_LP_ASSET_TOKEN = LazyDict(lambda: {
     'peaq': {
         XCM_VER: {
             'parents': '0',
@@ -109,7 +109,7 @@ TEST_LP_ASSET_TOKEN = {
         XCM_VER: {
             'parents': '1',
             'interior': {
-                'X2': [{'Parachain': PEAQ_PD_CHAIN_ID}, {
+                'X2': [{'Parachain': PEAQ_PARAMS.para_id}, {
                     'GeneralKey': {
                         'length': 2,
                         'data': [0, TEST_ASSET_IDX] + [0] * 30,
@@ -118,7 +118,7 @@ TEST_LP_ASSET_TOKEN = {
             }
         }
     }
-}
+})
 
 
 def aca_fund(substrate, kp_sudo, kp_dst, new_free):
@@ -252,13 +252,13 @@ class TestXCMTransfer(unittest.TestCase):
 
     def setUp(self):
         restart_parachain_and_runtime_upgrade()
-        wait_until_block_height(SubstrateInterface(url=PARACHAIN_WS_URL), 1)
-        wait_until_block_height(SubstrateInterface(url=ACA_WS_URL), 1)
+        wait_until_block_height(get_substrate(PARACHAIN_WS_URL), 1)
+        wait_until_block_height(get_substrate(ACA_WS_URL), 1)
 
-        self.si_peaq = SubstrateInterface(url=WS_URL,)
-        self.si_relay = SubstrateInterface(url=RELAYCHAIN_WS_URL, type_registry_preset='rococo')
-        self.si_aca = SubstrateInterface(url=ACA_WS_URL)
-        self.alice = Keypair.create_from_uri('//Alice')
+        self.si_peaq = get_substrate(WS_URL)
+        self.si_relay = get_substrate(RELAYCHAIN_WS_URL, type_registry_preset='rococo')
+        self.si_aca = get_substrate(ACA_WS_URL)
+        self.alice = keypair_from_uri('//Alice')
 
     def setup_xc_register_if_not_exist(self, asset_id, location, units_per_second):
         resp = self.si_peaq.query("XcAssetConfig", "AssetIdToLocation", [asset_id])
@@ -285,7 +285,7 @@ class TestXCMTransfer(unittest.TestCase):
 
     def wait_for_account_change(self, substrate, kp_dst, prev_token):
         return wait_for_account_asset_change_wrap(
-            self.si_peaq, kp_dst.ss58_address, None, prev_token, get_balance_account_from_pallet_balance)
+            substrate, kp_dst.ss58_address, None, prev_token, get_balance_account_from_pallet_balance)
 
     # @pytest.mark.skip(reason="Success")
     def test_from_relay_to_peaq(self):
@@ -297,7 +297,7 @@ class TestXCMTransfer(unittest.TestCase):
         self.assertTrue(receipt.is_success, f'Failed to setup asset, {receipt.error_message}')
 
         kp_remote_src = KP_CHARLIE
-        kp_self_dst = Keypair.create_from_mnemonic(Keypair.generate_mnemonic())
+        kp_self_dst = new_keypair()
         receipt = fund(self.si_peaq, KP_GLOBAL_SUDO, kp_self_dst, INIT_TOKEN_NUM)
         self.assertTrue(receipt.is_success, f'Failed to fund account, {receipt.error_message}')
 
@@ -333,7 +333,7 @@ class TestXCMTransfer(unittest.TestCase):
         self.assertTrue(receipt.is_success, f'Failed to setup asset, {receipt.error_message}')
 
         kp_remote_src = KP_CHARLIE
-        kp_self_dst = Keypair.create_from_mnemonic(Keypair.generate_mnemonic())
+        kp_self_dst = new_keypair()
 
         # Send foreigner tokens from the relay chain
         receipt = self.send_relay_token_from_relay_to_peaq(kp_remote_src, kp_self_dst, TEST_TOKEN_NUM)
@@ -372,7 +372,7 @@ class TestXCMTransfer(unittest.TestCase):
         self.assertTrue(receipt.is_success, f'Failed to setup asset, {receipt.error_message}')
 
         kp_remote_src = KP_CHARLIE
-        kp_self_dst = Keypair.create_from_mnemonic(Keypair.generate_mnemonic())
+        kp_self_dst = new_keypair()
         receipt = fund(self.si_peaq, KP_GLOBAL_SUDO, kp_self_dst, INIT_TOKEN_NUM)
         self.assertTrue(receipt.is_success, f'Failed to fund tokens to self: {receipt.error_message}')
         parachain_id = self.get_parachain_id(self.si_peaq)
@@ -407,7 +407,7 @@ class TestXCMTransfer(unittest.TestCase):
             self.si_aca, KP_GLOBAL_SUDO, PEAQ_ASSET_LOCATION['para'], PEAQ_METADATA)
         self.assertTrue(receipt.is_success, f'Failed to register foreign asset: {receipt.error_message}')
 
-        kp_para_src = Keypair.create_from_mnemonic(Keypair.generate_mnemonic())
+        kp_para_src = new_keypair()
         kp_self_dst = kp_para_src
         receipt = aca_fund(self.si_aca, KP_GLOBAL_SUDO, kp_para_src, INIT_TOKEN_NUM)
         self.assertTrue(receipt.is_success, f'Failed to fund tokens to aca: {receipt.error_message}')
@@ -428,7 +428,7 @@ class TestXCMTransfer(unittest.TestCase):
         # Send it back to the peaq chain
         receipt = send_token_from_para_to_peaq(
             self.si_aca, kp_para_src, kp_self_dst,
-            PEAQ_PD_CHAIN_ID, PEAQ_ASSET_ID['para'], transfer_back_token)
+            PEAQ_PARAMS.para_id, PEAQ_ASSET_ID['para'], transfer_back_token)
         self.assertTrue(receipt.is_success, f'Failed to send token from para to peaq: {receipt.error_message}')
 
         now_balance = self.wait_for_account_change(self.si_peaq, kp_self_dst, prev_balance)
@@ -437,7 +437,7 @@ class TestXCMTransfer(unittest.TestCase):
     def test_asset_from_peaq_to_aca_with_sufficient(self):
         # Create new asset id and register on peaq
         asset_id = TEST_ASSET_ID['peaq']
-        kp_para_src = Keypair.create_from_mnemonic(Keypair.generate_mnemonic())
+        kp_para_src = new_keypair()
         self._set_up_peaq_asset_on_peaq(asset_id, kp_para_src, True)
 
         # register on aca
@@ -486,7 +486,7 @@ class TestXCMTransfer(unittest.TestCase):
         # Send it back to the peaq chain
         receipt = send_token_from_para_to_peaq(
             self.si_aca, kp_para_src, kp_self_dst,
-            PEAQ_PD_CHAIN_ID, TEST_ASSET_ID['para'], transfer_back_token)
+            PEAQ_PARAMS.para_id, TEST_ASSET_ID['para'], transfer_back_token)
         self.assertTrue(receipt.is_success, f'Failed to send token from para to peaq: {receipt.error_message}')
 
         now_balance = self.wait_for_peaq_account_asset_change(kp_self_dst.ss58_address, TEST_ASSET_ID['peaq'])
@@ -497,7 +497,7 @@ class TestXCMTransfer(unittest.TestCase):
         # From Alice transfer to kp_para_src (other chain) and move to the kp_self_dst
         # Create new asset id and register on peaq
         asset_id = TEST_ASSET_ID['peaq']
-        kp_para_src = Keypair.create_from_mnemonic(Keypair.generate_mnemonic())
+        kp_para_src = new_keypair()
         self._set_up_peaq_asset_on_peaq(asset_id, kp_para_src, False)
 
         batch = ExtrinsicBatch(self.si_peaq, KP_GLOBAL_SUDO)
@@ -519,7 +519,7 @@ class TestXCMTransfer(unittest.TestCase):
     # Note, lp asset should create by zenlink protocol
     def test_lp_asset_from_peaq_to_aca(self):
         # Setup
-        kp_peaq = Keypair.create_from_mnemonic(Keypair.generate_mnemonic())
+        kp_peaq = new_keypair()
         kp_aca = kp_peaq
         batch = ExtrinsicBatch(self.si_peaq, KP_GLOBAL_SUDO)
         batch_fund(batch, kp_peaq, INIT_TOKEN_NUM)
@@ -587,7 +587,7 @@ class TestXCMTransfer(unittest.TestCase):
         # Send it back to the peaq chain
         receipt = send_token_from_para_to_peaq(
             self.si_aca, kp_aca, kp_peaq,
-            PEAQ_PD_CHAIN_ID, TEST_LP_ASSET_ID['para'], transfer_back_token)
+            PEAQ_PARAMS.para_id, TEST_LP_ASSET_ID['para'], transfer_back_token)
         self.assertTrue(receipt.is_success, f'Failed to send token from para to peaq: {receipt.error_message}')
 
         # TODO Need to change because it's in the LPAsset, but not Asset
@@ -4,12 +4,12 @@ import unittest
 
 sys.path.append('./')
 
-from substrateinterface import SubstrateInterface, Keypair
 from tools.utils import RELAYCHAIN_WS_URL, PARACHAIN_WS_URL, ACA_WS_URL, KP_GLOBAL_SUDO, URI_GLOBAL_SUDO
+from tools.connection_pool import get_substrate
 from tools.utils import show_test, show_title, show_subtitle, wait_for_event
 from peaq.utils import ExtrinsicBatch, into_keypair
 from peaq.utils import get_account_balance
-from tools.utils import get_peaq_chain_id
+from tools.chain_params import PEAQ_PARAMS
 from tools.currency import peaq, dot, aca
 from tests.utils_func import restart_parachain_and_runtime_upgrade
 from tools.runtime_upgrade import wait_until_block_height
@@ -20,10 +20,10 @@ from tools.asset import ACA_ASSET_ID
 from tools.asset import RELAY_ASSET_LOCATION, RELAY_ASSET_ID, RELAY_METADATA
 from tools.zenlink import compose_zdex_create_lppair, compose_zdex_lppair_params, compose_zdex_add_liquidity
 from tools.zenlink import calc_deadline
+from tools.keyring import keypair_from_uri
 
 
 # Technical constants
-PARACHAIN_ID = get_peaq_chain_id()
 XCM_VER = 'V3'  # So far not tested with V2!
 XCM_RTA_TO = 45  # timeout for xcm-rta
 DOT_IDX = 1  # u8 value for DOT-token (CurrencyId/TokenSymbol)
@@ -66,7 +66,7 @@ def compose_balances_setbalance(batch, who, amount):
 def compose_xcm_rta_relay2para(batch, kp_beneficiary, amount):
     dest = {XCM_VER: {
         'parents': '0',
-        'interior': {'X1': {'Parachain': f'{PARACHAIN_ID}'}}
+        'interior': {'X1': {'Parachain': f'{PEAQ_PARAMS.para_id}'}}
     }}
     beneficiary = {XCM_VER: {
         'parents': '0',
@@ -92,7 +92,7 @@ def compose_xtokens_transfer(batch, kp_beneficiary, amount):
         'dest': {XCM_VER: {
             'parents': '1',
             'interior': {'X2': [
-                {'Parachain': f'{PARACHAIN_ID}'},
+                {'Parachain': f'{PEAQ_PARAMS.para_id}'},
                 {'AccountId32': (None, kp_beneficiary.public_key)}
                 ]}
             }},
@@ -323,7 +323,7 @@ def bifrost2para_transfer(si_bifrost, si_peaq, sender, tos, amnts):
 
     kp_recipi = list()
     for to in tos:
-        kp_recipi.append(Keypair.create_from_uri(to))
+        kp_recipi.append(keypair_from_uri(to))
 
     bt_sender = ExtrinsicBatch(si_bifrost, sender)
     for i, recipi in enumerate(kp_recipi):
@@ -546,18 +546,18 @@ def zenlink_empty_lp_swap_test(si_relay, si_peaq):
 class TestZenlinkDex(unittest.TestCase):
     def setUp(self):
         restart_parachain_and_runtime_upgrade()
-        wait_until_block_height(SubstrateInterface(url=PARACHAIN_WS_URL), 1)
-        wait_until_block_height(SubstrateInterface(url=ACA_WS_URL), 1)
+        wait_until_block_height(get_substrate(PARACHAIN_WS_URL), 1)
+        wait_until_block_height(get_substrate(ACA_WS_URL), 1)
         show_title('Zenlink-DEX-Protocol Test')
-        self.si_relay = SubstrateInterface(url=RELAYCHAIN_WS_URL)
-        self.si_peaq = SubstrateInterface(url=PARACHAIN_WS_URL)
-        self.si_bifrost = SubstrateInterface(url=ACA_WS_URL)
+        self.si_relay = get_substrate(RELAYCHAIN_WS_URL)
+        self.si_peaq = get_substrate(PARACHAIN_WS_URL)
+        self.si_bifrost = get_substrate(ACA_WS_URL)
 
     def test_create_pair_swap(self):
         show_title('Zenlink-DEX-Protocol create pair swap Test')
         try:
-            si_relay = SubstrateInterface(url=RELAYCHAIN_WS_URL)
-            si_peaq = SubstrateInterface(url=PARACHAIN_WS_URL)
+            si_relay = get_substrate(RELAYCHAIN_WS_URL)
+            si_peaq = get_substrate(PARACHAIN_WS_URL)
             setup_asset_if_not_exist(si_peaq, KP_GLOBAL_SUDO, RELAY_ASSET_ID['peaq'], RELAY_METADATA)
             setup_xc_register_if_not_exist(
                 si_peaq, KP_GLOBAL_SUDO,
@@ -573,8 +573,8 @@ class TestZenlinkDex(unittest.TestCase):
     def test_booststrap(self):
         show_title('Zenlink-DEX-Protocol boostrap Test')
         try:
-            si_peaq = SubstrateInterface(url=PARACHAIN_WS_URL)
-            si_bifrost = SubstrateInterface(url=ACA_WS_URL)
+            si_peaq = get_substrate(PARACHAIN_WS_URL)
+            si_bifrost = get_substrate(ACA_WS_URL)
             setup_asset_if_not_exist(si_peaq, KP_GLOBAL_SUDO, ACA_ASSET_ID['peaq'], ACA_METADATA)
             setup_xc_register_if_not_exist(
                 si_peaq, KP_GLOBAL_SUDO,
@@ -591,8 +591,8 @@ class TestZenlinkDex(unittest.TestCase):
     def test_empty_lp_swap(self):
         show_title('Zenlink-DEX-Protocol empty lp swap Test')
         try:
-            si_relay = SubstrateInterface(url=RELAYCHAIN_WS_URL)
-            si_peaq = SubstrateInterface(url=PARACHAIN_WS_URL)
+            si_relay = get_substrate(RELAYCHAIN_WS_URL)
+            si_peaq = get_substrate(PARACHAIN_WS_URL)
             setup_asset_if_not_exist(si_peaq, KP_GLOBAL_SUDO, RELAY_ASSET_ID['peaq'], RELAY_METADATA, 100)
             setup_xc_register_if_not_exist(
                 si_peaq, KP_GLOBAL_SUDO,
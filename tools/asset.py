@@ -1,12 +1,14 @@
 from peaq.utils import ExtrinsicBatch
-from tools.utils import ACA_PD_CHAIN_ID, get_peaq_chain_id
+from tools.utils import ACA_PD_CHAIN_ID
+from tools.chain_params import PEAQ_PARAMS, LazyDict
 from peaq.utils import get_account_balance
+from tools.instrumentation import timed_phase
+from tools.block_wait import wait_until, block_time
+from tools.storage_watcher import StorageWatcher
+from tools.call_template import batch_compose_call
 import copy
-import time
 
 
-PEAQ_PD_CHAIN_ID = get_peaq_chain_id()
-
 XCM_VER = 'V3'  # So far not tested with V2!
 
 ACA_ASSET_ID = {
@@ -64,7 +66,7 @@ PEAQ_ASSET_ID = {
         'ForeignAsset': '0',
     }
 }
-PEAQ_ASSET_LOCATION = {
+PEAQ_ASSET_LOCATION = LazyDict(lambda: {
     'peaq': {
         XCM_VER: {
             'parents': '0',
@@ -74,10 +76,10 @@ PEAQ_ASSET_LOCATION = {
     'para': {
         XCM_VER: {
             'parents': '1',
-            'interior': {'X1': {'Parachain': PEAQ_PD_CHAIN_ID}}
+            'interior': {'X1': {'Parachain': PEAQ_PARAMS.para_id}}
         }
     },
-}
+})
 PEAQ_METADATA = {
     'name': 'Peaq Token',
     'symbol': 'AGUNG',
@@ -146,7 +148,8 @@ def batch_set_metadata(batch, asset_id, name, symbol, decimals):
 
 
 def batch_mint(batch, addr_src, asset_id, token_amount):
-    batch.compose_call(
+    batch_compose_call(
+        batch,
         'Assets',
         'mint',
         {
@@ -244,17 +247,45 @@ def get_balance_account_from_pallet_balance(substrate, addr, _):
     return get_account_balance(substrate, addr)
 
 
+# The storage behind the balance getters, so the waits can subscribe to it:
+# getter: (module, storage function, params(addr, asset_id), balance(value))
+BALANCE_STORAGE = {
+    get_tokens_account_from_pallet_assets: (
+        'Assets', 'Account', lambda addr, asset_id: [asset_id, addr], lambda v: v['balance'] if v else 0),
+    get_tokens_account_from_pallet_tokens: (
+        'Tokens', 'Accounts', lambda addr, asset_id: [addr, asset_id], lambda v: v['free'] if v else 0),
+    get_balance_account_from_pallet_balance: (
+        'System', 'Account', lambda addr, _: [addr], lambda v: v['data']['free']),
+}
+WAIT_CHANGE_BLOCKS = 10
+
+
+def _watch_balance_change(substrate, addr, asset_id, prev_token, func):
+    module, storage_function, params, balance_of = BALANCE_STORAGE[func]
+    timeout = block_time(substrate) * WAIT_CHANGE_BLOCKS
+    with StorageWatcher() as watcher:
+        watched = watcher.watch(substrate, module, storage_function, params(addr, asset_id))
+        watcher.start()
+        try:
+            if not prev_token:
+                prev_token = balance_of(watched.initial(timeout))
+            value = watched.wait_for(lambda v: balance_of(v) != prev_token, timeout)
+        except TimeoutError as e:
+            raise IOError(f"Account {addr} balance {prev_token} not changed on {substrate.url}, {e}")
+    return balance_of(value)
+
+
+@timed_phase('wait_for_account_asset_change')
 def wait_for_account_asset_change_wrap(substrate, addr, asset_id, prev_token, func):
+    if func in BALANCE_STORAGE:
+        return _watch_balance_change(substrate, addr, asset_id, prev_token, func)
+
     if not prev_token:
         prev_token = func(substrate, addr, asset_id)
-    count = 0
-    while func(substrate, addr, asset_id) == prev_token and count < 10:
-        time.sleep(12)
-        count += 1
-    now_token = func(substrate, addr, asset_id)
-    if now_token == prev_token:
-        raise IOError(f"Account {addr} balance {prev_token} not changed on peaq")
-    return now_token
+    changed = wait_until(substrate, lambda: func(substrate, addr, asset_id) != prev_token, max_blocks=WAIT_CHANGE_BLOCKS)
+    if not changed:
+        raise IOError(f"Account {addr} balance {prev_token} not changed on {substrate.url}")
+    return func(substrate, addr, asset_id)
 
 
 def convert_enum_to_asset_id(enum_info):
@@ -0,0 +1,199 @@
+import os
+import json
+import sqlite3
+import threading
+
+from substrateinterface.utils.hasher import xxh128
+from scalecodec.base import ScaleBytes
+
+
+BLOCK_CACHE_PATH = os.environ.get(
+    'BLOCK_CACHE_PATH',
+    os.path.join(os.path.expanduser('~'), '.cache', 'peaq-bc-test', 'blocks.sqlite'))
+SESSION_VALIDATORS_KEY = '0x' + xxh128(b'Session').hex() + xxh128(b'Validators').hex()
+# Below SQLite's limit of 999 parameters per statement
+SQL_CHUNK_SIZE = 500
+# DigestItem::PreRuntime(*b"aura", slot.encode())
+AURA_PRE_RUNTIME_PREFIX = b'\x06aura\x20'
+
+
+def aura_author(header, validators):
+    """Raises LookupError for a block without an aura slot, e.g. the genesis"""
+    for log in header['digest']['logs']:
+        data = bytes.fromhex(log[2:])
+        if data.startswith(AURA_PRE_RUNTIME_PREFIX):
+            if not validators:
+                raise LookupError(f'No session validators at block {header["number"]}')
+            slot = int.from_bytes(data[len(AURA_PRE_RUNTIME_PREFIX):], 'little')
+            return validators[slot % len(validators)]
+    raise LookupError(f'No aura pre-runtime digest in block {header["number"]}')
+
+
+class BlockCache():
+    """
+    SQLite store of block hash -> header, author, timestamp and decoded events.
+
+    The content of a block never changes for its hash, so the entries never
+    expire and the file is shared by all the tools and test runs. Only the
+    height -> hash lookup goes to the chain, because a local chain can be
+    restarted from genesis; get_block_hashes() does it for a whole range in
+    one chain_getBlockHash call. The events are stored as their `value`, so
+    the cached and the fetched ones look the same to the caller.
+    """
+
+    def __init__(self, path=BLOCK_CACHE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = None
+        self._validators = {}
+
+    def _conn(self):
+        if self._db is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS blocks ('
+                'hash TEXT PRIMARY KEY, number INTEGER, header TEXT, '
+                'author TEXT, timestamp INTEGER, events TEXT)')
+        return self._db
+
+    def _get(self, block_hash, column):
+        with self._lock:
+            row = self._conn().execute(
+                f'SELECT {column} FROM blocks WHERE hash = ?', (block_hash,)).fetchone()
+        return None if row is None else row[0]
+
+    def _get_many(self, block_hashes, column):
+        """{hash: value} of the cached ones, in chunks under the SQLite parameter limit"""
+        found = {}
+        with self._lock:
+            db = self._conn()
+            for i in range(0, len(block_hashes), SQL_CHUNK_SIZE):
+                chunk = block_hashes[i:i + SQL_CHUNK_SIZE]
+                found.update(db.execute(
+                    f'SELECT hash, {column} FROM blocks WHERE {column} IS NOT NULL '
+                    f'AND hash IN ({", ".join("?" * len(chunk))})', chunk).fetchall())
+        return found
+
+    def _set(self, block_hash, **columns):
+        self._set_many(list(columns), [list(columns.values()) + [block_hash]])
+
+    def _set_many(self, columns, rows):
+        """rows of [*values of columns, hash], written with a single commit"""
+        if not rows:
+            return
+        with self._lock:
+            db = self._conn()
+            db.executemany('INSERT OR IGNORE INTO blocks (hash) VALUES (?)', [(row[-1],) for row in rows])
+            db.executemany(f'UPDATE blocks SET {", ".join(f"{k} = ?" for k in columns)} WHERE hash = ?', rows)
+            db.commit()
+
+    def get_block_hashes(self, substrate, heights):
+        heights = list(heights)
+        if not heights:
+            return []
+        return substrate.rpc_request('chain_getBlockHash', [heights])['result']
+
+    def get_header(self, substrate, block_hash):
+        header = self._get(block_hash, 'header')
+        if header is None:
+            header = json.dumps(substrate.rpc_request('chain_getHeader', [block_hash])['result'])
+            self._set(block_hash, header=header)
+        return json.loads(header)
+
+    def _fetch_timestamp(self, substrate, block_hash, storage_key):
+        data = substrate.rpc_request('state_getStorage', [storage_key, block_hash])['result']
+        return int.from_bytes(bytes.fromhex(data[2:]), 'little')
+
+    def get_timestamp(self, substrate, block_hash, storage_key=None):
+        """
+        Reads the raw u64 of Timestamp.Now, nothing in the block is decoded.
+        `storage_key` can be passed by callers which don't have the metadata.
+        """
+        timestamp = self._get(block_hash, 'timestamp')
+        if timestamp is None:
+            if storage_key is None:
+                storage_key = substrate.create_storage_key('Timestamp', 'Now').to_hex()
+            timestamp = self._fetch_timestamp(substrate, block_hash, storage_key)
+            self._set(block_hash, timestamp=timestamp)
+        return timestamp
+
+    def get_timestamps(self, substrate, block_hashes, storage_key=None):
+        """get_timestamp of many blocks, one lookup for the cached ones and one commit for the new ones"""
+        block_hashes = list(block_hashes)
+        timestamps = self._get_many(block_hashes, 'timestamp')
+        missing = [block_hash for block_hash in block_hashes if block_hash not in timestamps]
+        if missing and storage_key is None:
+            storage_key = substrate.create_storage_key('Timestamp', 'Now').to_hex()
+        rows = [[self._fetch_timestamp(substrate, block_hash, storage_key), block_hash] for block_hash in missing]
+        self._set_many(['timestamp'], rows)
+        timestamps.update((block_hash, timestamp) for timestamp, block_hash in rows)
+        return [timestamps[block_hash] for block_hash in block_hashes]
+
+    def get_validators(self, substrate, block_hash):
+        """
+        Session.Validators at the block, the raw value is read and decoded only
+        once per distinct validator set.
+        """
+        data = substrate.rpc_request('state_getStorage', [SESSION_VALIDATORS_KEY, block_hash])['result']
+        key = (substrate.ss58_format, data)
+        with self._lock:
+            if key in self._validators:
+                return self._validators[key]
+        storage_key = substrate.create_storage_key('Session', 'Validators')
+        value = storage_key.decode_scale_value(None if data is None else ScaleBytes(data)).value
+        with self._lock:
+            self._validators[key] = list(value or [])
+            return self._validators[key]
+
+    def get_author(self, substrate, block_hash, header=None, validators=None):
+        """
+        The aura slot of the block's digest modulo the validator count, the
+        same as get_block(include_author=True) without decoding the block.
+        """
+        author = self._get(block_hash, 'author')
+        if author is None:
+            header = header or self.get_header(substrate, block_hash)
+            validators = validators or self.get_validators(substrate, block_hash)
+            author = aura_author(header, validators)
+            self._set(block_hash, number=int(header['number'], 16), author=author)
+        return author
+
+    def get_authors(self, substrate, block_hashes, validators):
+        """
+        get_author of many blocks with their validator sets, the new ones are
+        stored with one commit. None for a block without an author.
+        """
+        block_hashes = list(block_hashes)
+        authors = self._get_many(block_hashes, 'author')
+        rows = []
+        for block_hash, block_validators in zip(block_hashes, validators):
+            if block_hash in authors:
+                continue
+            header = substrate.rpc_request('chain_getHeader', [block_hash])['result']
+            try:
+                author = aura_author(header, block_validators)
+            except LookupError as e:
+                print(f'No author of block {block_hash}, {e}')
+                authors[block_hash] = None
+                continue
+            authors[block_hash] = author
+            rows.append([json.dumps(header), int(header['number'], 16), author, block_hash])
+        self._set_many(['header', 'number', 'author'], rows)
+        return [authors[block_hash] for block_hash in block_hashes]
+
+    def get_events(self, substrate, block_hash):
+        events = self._get(block_hash, 'events')
+        if events is None:
+            events = json.dumps([e.value for e in substrate.get_events(block_hash)], default=str)
+            self._set(block_hash, events=events)
+        return json.loads(events)
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+BLOCK_CACHE = BlockCache()
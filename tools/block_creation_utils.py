@@ -2,21 +2,62 @@ import sys
 sys.path.append('.')
 
 
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from substrateinterface import SubstrateInterface
 from peaq.utils import get_block_height
+from tools.block_cache import BLOCK_CACHE
+
+BLOCK_SCAN_WORKERS = 8
 
 
 def get_block_timestamp(substrate, height):
-    current_block = substrate.get_block(block_number=height)
-    create_time = int(str(current_block['extrinsics'][0]['call']['call_args'][0]['value']))
-    return create_time
+    block_hash = substrate.get_block_hash(height)
+    return BLOCK_CACHE.get_timestamp(substrate, block_hash)
 
 
-def get_block_creation_times(substrate, block_traverse_num):
+def _scan_timestamps(url, storage_key, block_hashes):
+    # Raw storage reads don't need the runtime, so a bare connection is enough
+    substrate = SubstrateInterface(url=url)
+    try:
+        return BLOCK_CACHE.get_timestamps(substrate, block_hashes, storage_key)
+    finally:
+        substrate.close()
+
+
+def scan_block_timestamps(substrate, start, end, workers=BLOCK_SCAN_WORKERS):
+    """
+    Returns the Timestamp.Now of the blocks [start, end) as a numpy array.
+    The heights are split in chunks read concurrently, each over its own
+    websocket connection.
+    """
+    block_hashes = BLOCK_CACHE.get_block_hashes(substrate, range(start, end))
+    storage_key = substrate.create_storage_key('Timestamp', 'Now').to_hex()
+    chunk_size = max(len(block_hashes) // workers, 1)
+    chunks = [block_hashes[i:i + chunk_size] for i in range(0, len(block_hashes), chunk_size)]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(lambda chunk: _scan_timestamps(substrate.url, storage_key, chunk), chunks)
+        return np.array([timestamp for chunk in results for timestamp in chunk], dtype=np.uint64)
+
+
+def get_block_intervals(substrate, block_traverse_num):
     latest_height = get_block_height(substrate)
     if latest_height < block_traverse_num:
         raise IOError(f'Please wait longer, current block height {latest_height} < {block_traverse_num}')
-    create_times = [get_block_timestamp(substrate, height)
-                    for height in range(latest_height - block_traverse_num, latest_height)]
-    diff_times = [x - y for x, y in zip(create_times[1:], create_times)]
-    ave_time = sum(diff_times) / len(diff_times)
-    return ave_time
+    timestamps = scan_block_timestamps(substrate, latest_height - block_traverse_num, latest_height)
+    return np.diff(timestamps.astype(np.int64))
+
+
+def get_block_interval_stats(intervals):
+    return {
+        'mean': float(np.mean(intervals)),
+        'p50': float(np.percentile(intervals, 50)),
+        'p95': float(np.percentile(intervals, 95)),
+        'max': int(np.max(intervals)),
+    }
+
+
+def get_block_creation_times(substrate, block_traverse_num):
+    stats = get_block_interval_stats(get_block_intervals(substrate, block_traverse_num))
+    print(f'Block creation time (ms) over {block_traverse_num} blocks: {stats}')
+    return stats['mean']
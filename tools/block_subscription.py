@@ -0,0 +1,240 @@
+import time
+import threading
+
+from scalecodec.types import CompactU32
+from substrateinterface import SubstrateInterface
+from substrateinterface.utils.hasher import blake2_256
+from websocket import WebSocketException
+from tools.metadata_cache import attach_metadata_cache
+
+
+def header_hash(header):
+    """
+    The hash of a chain_subscribe*Heads header: blake2_256 of the SCALE encoded
+    header, the digest logs already come as encoded DigestItems
+    """
+    logs = header['digest']['logs']
+    data = bytearray(bytes.fromhex(header['parentHash'][2:]))
+    data += CompactU32().encode(int(header['number'], 16)).data
+    data += bytes.fromhex(header['stateRoot'][2:])
+    data += bytes.fromhex(header['extrinsicsRoot'][2:])
+    data += CompactU32().encode(len(logs)).data
+    for log in logs:
+        data += bytes.fromhex(log[2:])
+    return f'0x{blake2_256(bytes(data)).hex()}'
+
+
+class Block():
+    """
+    A new head delivered by BlockSubscription. The events are decoded at most
+    once, on first access, and shared by every listener. The extrinsic hashes
+    are computed from the raw block, without decoding the extrinsics.
+    """
+
+    def __init__(self, substrate, number, block_hash, header):
+        self.number = number
+        self.hash = block_hash
+        self.header = header
+        self._substrate = substrate
+        self._events = None
+        self._extrinsic_hashes = None
+
+    @property
+    def substrate(self):
+        """The subscription's connection, only use it in the listener"""
+        return self._substrate
+
+    @property
+    def events(self):
+        if self._events is None:
+            self._events = self._substrate.get_events(self.hash)
+        return self._events
+
+    @property
+    def extrinsic_hashes(self):
+        if self._extrinsic_hashes is None:
+            response = self._substrate.rpc_request('chain_getBlock', [self.hash])
+            self._extrinsic_hashes = [
+                f'0x{blake2_256(bytes.fromhex(data[2:])).hex()}'
+                for data in response['result']['block']['extrinsics']]
+        return self._extrinsic_hashes
+
+    def is_events_loaded(self):
+        return self._events is not None
+
+    def set_events(self, events):
+        self._events = events
+
+
+class BlockSubscription():
+    """
+    Background chain_subscribeNewHeads (or FinalizedHeads) reader with its
+    own websocket connection. Listeners are called in the subscription thread
+    with a Block for every new head; a listener returning True is removed.
+    Several waiters can share one subscription.
+    """
+
+    def __init__(self, url, finalized=False, **kwargs):
+        self.url = url
+        self._finalized = finalized
+        self._kwargs = kwargs
+        self._lock = threading.Lock()
+        self._listeners = []
+        self._last_block = None
+        self._thread = None
+        self._stopped = False
+
+    def start(self):
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return self
+            self._stopped = False
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped = True
+
+    def add_listener(self, listener):
+        with self._lock:
+            self._listeners.append(listener)
+        self.start()
+
+    def remove_listener(self, listener):
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def last_block(self):
+        return self._last_block
+
+    def _run(self):
+        while not self._stopped:
+            try:
+                substrate = SubstrateInterface(url=self.url, **self._kwargs)
+                attach_metadata_cache(substrate)
+                self._subscribe(substrate)
+                substrate.close()
+            except (WebSocketException, ConnectionError, OSError) as e:
+                print(f'Block subscription on {self.url} lost, {e}')
+                time.sleep(1)
+            except Exception as e:
+                # e.g. a failed RPC in the result handler, the waiters would block until their timeout
+                print(f'Block subscription on {self.url} failed, {e}, resubscribing')
+                time.sleep(1)
+
+    def _subscribe(self, substrate):
+        rpc_method_prefix = 'Finalized' if self._finalized else 'New'
+
+        def result_handler(message, update_nr, subscription_id):
+            header = message['params']['result']
+            number = int(header['number'], 16)
+            # The notified header's own hash, re-querying by number could give another fork's block
+            block = Block(substrate, number, header_hash(header), header)
+            self._last_block = block
+            self._notify(block)
+            if self._stopped:
+                substrate.rpc_request(f'chain_unsubscribe{rpc_method_prefix}Heads', [subscription_id])
+                return True
+
+        substrate.rpc_request(f'chain_subscribe{rpc_method_prefix}Heads', [], result_handler=result_handler)
+
+    def _notify(self, block):
+        with self._lock:
+            listeners = list(self._listeners)
+        for listener in listeners:
+            try:
+                done = listener(block)
+            except Exception as e:
+                print(f'Block listener {listener} failed at block {block.number}, {e}')
+                done = True
+            if done:
+                self.remove_listener(listener)
+
+
+class EventWaiter():
+    """
+    Waits for the first event record for which `matcher(record)` is True.
+    The block that is the chain head at registration time is checked too.
+    An exception raised by the matcher is re-raised in wait().
+    """
+
+    def __init__(self, subscription, matcher):
+        self._subscription = subscription
+        self._matcher = matcher
+        self._done = threading.Event()
+        self._result = None
+        self._error = None
+
+    def register(self, substrate=None):
+        # Listen first, so a head notified while the current one is checked isn't missed
+        self._subscription.add_listener(self._check)
+        block = self._subscription.last_block()
+        if substrate is None:
+            # The head's events can only be decoded with the caller's connection
+            if block is not None and block.is_events_loaded():
+                self._check(block)
+            return self
+        if block is None:
+            block_hash = substrate.get_chain_head()
+            block = Block(substrate, substrate.get_block_number(block_hash), block_hash, None)
+        elif not block.is_events_loaded():
+            block.set_events(substrate.get_events(block.hash))
+        self._check(block)
+        return self
+
+    def wait(self, timeout=None):
+        self._done.wait(timeout)
+        self._subscription.remove_listener(self._check)
+        if self._error:
+            raise self._error
+        return self._result
+
+    def _check(self, block):
+        if self._done.is_set():
+            return True
+        try:
+            for e in block.events:
+                if self._matcher(e):
+                    self._result = e
+                    self._done.set()
+                    return True
+        except Exception as e:
+            self._error = e
+            self._done.set()
+            return True
+        return False
+
+
+_subscriptions = {}
+_subscriptions_lock = threading.Lock()
+
+
+def get_block_subscription(url, finalized=False, **kwargs):
+    key = (url, finalized, tuple(sorted((k, repr(v)) for k, v in kwargs.items())))
+    with _subscriptions_lock:
+        if key not in _subscriptions:
+            _subscriptions[key] = BlockSubscription(url, finalized, **kwargs)
+        return _subscriptions[key]
+
+
+def stop_all_subscriptions():
+    with _subscriptions_lock:
+        for subscription in _subscriptions.values():
+            subscription.stop()
+        _subscriptions.clear()
+
+
+def connection_kwargs(substrate):
+    """The options to open another connection like `substrate`"""
+    kwargs = {}
+    if substrate.type_registry_preset:
+        kwargs['type_registry_preset'] = substrate.type_registry_preset
+    if substrate.type_registry:
+        kwargs['type_registry'] = substrate.type_registry
+    return kwargs
+
+
+def subscription_for(substrate, finalized=False):
+    return get_block_subscription(substrate.url, finalized, **connection_kwargs(substrate))
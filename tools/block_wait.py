@@ -0,0 +1,108 @@
+import queue
+import threading
+
+from tools.block_subscription import subscription_for
+from tools.instrumentation import timed_phase
+
+
+# Used when the runtime has neither Aura.SlotDuration nor Timestamp.MinimumPeriod
+DEFAULT_BLOCK_TIME = 12
+# No new head for this many block times means the chain stalled
+STALL_BLOCK_TIMES = 5
+MIN_STALL_TIMEOUT = 10
+
+_block_times = {}
+_block_times_lock = threading.Lock()
+
+
+def block_time(substrate):
+    """
+    The expected block time in seconds: the Aura slot duration, or twice
+    Timestamp.MinimumPeriod (which Aura requires to be half the slot)
+    """
+    key = (substrate.url, substrate.runtime_version)
+    with _block_times_lock:
+        if key in _block_times:
+            return _block_times[key]
+
+    slot_duration = substrate.get_constant('Aura', 'SlotDuration')
+    if slot_duration is not None:
+        seconds = slot_duration.value / 1000.
+    else:
+        minimum_period = substrate.get_constant('Timestamp', 'MinimumPeriod')
+        seconds = minimum_period.value * 2 / 1000. if minimum_period is not None else DEFAULT_BLOCK_TIME
+    seconds = seconds or DEFAULT_BLOCK_TIME
+
+    with _block_times_lock:
+        _block_times[key] = seconds
+    return seconds
+
+
+class BlockWaiter():
+    """
+    Hands the new heads of the shared block subscription to the calling
+    thread, so conditions are checked with the caller's own connection.
+    next_block() raises TimeoutError when no head arrives in
+    STALL_BLOCK_TIMES block times.
+
+    Example:
+        with BlockWaiter(substrate) as waiter:
+            block = waiter.next_block()
+    """
+
+    def __init__(self, substrate, finalized=False):
+        self._subscription = subscription_for(substrate, finalized)
+        self._stall_timeout = max(block_time(substrate) * STALL_BLOCK_TIMES, MIN_STALL_TIMEOUT)
+        self._blocks = queue.Queue()
+        self._last_number = None
+
+    def _on_block(self, block):
+        self._blocks.put(block)
+        return False
+
+    def __enter__(self):
+        self._subscription.add_listener(self._on_block)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._subscription.remove_listener(self._on_block)
+
+    def next_block(self):
+        while True:
+            try:
+                block = self._blocks.get(timeout=self._stall_timeout)
+            except queue.Empty:
+                raise TimeoutError(f'No new block in {self._stall_timeout}s on {self._subscription.url}')
+            # A reorg can deliver the same height again, it isn't a new block
+            if self._last_number is None or block.number > self._last_number:
+                self._last_number = block.number
+                return block
+
+
+@timed_phase('wait_for_blocks')
+def wait_for_blocks(substrate, n=1):
+    """Waits for n new heads and returns the last one"""
+    block = None
+    with BlockWaiter(substrate) as waiter:
+        for _ in range(n):
+            block = waiter.next_block()
+    return block
+
+
+@timed_phase('wait_until')
+def wait_until(substrate, condition, max_blocks=10):
+    """
+    Checks condition() now and after every new head, up to max_blocks heads.
+    Returns the first truthy result of condition(), or None if there is
+    none within max_blocks blocks.
+    """
+    with BlockWaiter(substrate) as waiter:
+        result = condition()
+        if result:
+            return result
+        for _ in range(max_blocks):
+            waiter.next_block()
+            result = condition()
+            if result:
+                return result
+    return None
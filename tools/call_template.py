@@ -0,0 +1,157 @@
+import threading
+import weakref
+from hashlib import blake2b
+
+from scalecodec.base import ScaleBytes, ScaleType
+
+
+# Encoded values remembered per argument, for the ints/strings/bytes which repeat across calls
+VALUE_CACHE_SIZE = 256
+VALUE_CACHE_TYPES = (int, str, bytes)
+
+
+class CallTemplate():
+    """
+    The resolved layout of one (pallet, function) call: the call index and
+    the decoder class of every argument are looked up once, the fixed
+    params are encoded once, and compose() only encodes the varying ones.
+    The result is the same GenericCall (byte for byte) as compose_call,
+    which can go in an ExtrinsicBatch, a batch_all or a sudo call as is.
+
+    The layout belongs to the metadata it was resolved with and is resolved
+    again once the substrate has switched to another runtime.
+
+    Example:
+        template = CallTemplate(substrate, 'Balances', 'force_set_balance', {'new_reserved': 0})
+        calls = [template.compose({'who': addr, 'new_free': amount}) for addr in addrs]
+    """
+
+    def __init__(self, substrate, call_module, call_function, fixed_params=None):
+        self.substrate = substrate
+        self.call_module = call_module
+        self.call_function = call_function
+        self.fixed_params = fixed_params or {}
+        self._lock = threading.Lock()
+        self.metadata = None
+
+    def _resolve(self):
+        substrate = self.substrate
+        if substrate.metadata is None:
+            substrate.init_runtime()
+        metadata = substrate.metadata
+        runtime_config = substrate.runtime_config
+
+        pallet = metadata.get_metadata_pallet(self.call_module)
+        if not pallet:
+            raise ValueError(f"Pallet '{self.call_module}' not found")
+        call_type = pallet['calls'].value_object.get_type_string()
+        variant = runtime_config.create_scale_object(call_type).scale_info_type['def'][1].get_variant_by_name(self.call_function)
+        if not variant:
+            raise ValueError(f"Call function '{self.call_module}.{self.call_function}' not found")
+
+        # The layout is a list of encoded bytes and (name, decoder class) slots
+        layout = [bytes(pallet['index'].get_used_bytes() + variant['index'].get_used_bytes())]
+        slots = []
+        for arg in variant['fields']:
+            name = arg.value['name']
+            decoder_class = runtime_config.get_decoder_class(arg.get_type_string())
+            if name in self.fixed_params:
+                encoded = bytes(decoder_class(metadata=metadata, runtime_config=runtime_config).encode(self.fixed_params[name]).data)
+                if type(layout[-1]) is bytes:
+                    layout[-1] += encoded
+                else:
+                    layout.append(encoded)
+            else:
+                layout.append((name, decoder_class))
+                slots.append(name)
+
+        self.pallet = pallet
+        self.variant = variant
+        self.call_index = '{:02x}{:02x}'.format(pallet.value['index'], variant.value['index'])
+        self.layout = layout
+        self.slots = slots
+        self._values = {name: {} for name in slots}
+        self.runtime_config = runtime_config
+        self.metadata = metadata
+
+    def _new(self, decoder_class):
+        # The decoder classes are shared by the connections, so the runtime config is given explicitly
+        return decoder_class(metadata=self.metadata, runtime_config=self.runtime_config)
+
+    def _encode_arg(self, name, decoder_class, value):
+        if type(value) not in VALUE_CACHE_TYPES:
+            return self._new(decoder_class).encode(value).data
+        cache = self._values[name]
+        key = (type(value), value)
+        if key not in cache:
+            if len(cache) >= VALUE_CACHE_SIZE:
+                cache.clear()
+            cache[key] = bytes(self._new(decoder_class).encode(value).data)
+        return cache[key]
+
+    def compose(self, params):
+        """A GenericCall from the varying params, the fixed ones are taken from the template"""
+        with self._lock:
+            if self.metadata is not self.substrate.metadata:
+                self._resolve()
+            missing = [name for name in self.slots if name not in params]
+            if missing:
+                raise ValueError(f'Parameter {missing} not specified')
+
+            data = bytearray()
+            for part in self.layout:
+                if type(part) is bytes:
+                    data += part
+                else:
+                    data += self._encode_arg(part[0], part[1], params[part[0]])
+
+            call = self.runtime_config.create_scale_object('Call', metadata=self.metadata)
+            call_args = dict(self.fixed_params)
+            call_args.update({
+                name: value.value if isinstance(value, ScaleType) else value
+                for name, value in params.items()
+            })
+            call.data = ScaleBytes(data)
+            call.value_serialized = {
+                'call_module': self.call_module,
+                'call_function': self.call_function,
+                'call_args': call_args,
+            }
+            call.value_object = {'call_module': self.pallet, 'call_function': self.variant}
+            call.decoded = True
+            call.call_index = self.call_index
+            call.call_module = self.pallet
+            call.call_function = self.variant
+            call.call_args = self.variant['fields']
+            call.call_hash = blake2b(data, digest_size=32).digest()
+            return call
+
+
+TEMPLATES = weakref.WeakKeyDictionary()
+TEMPLATES_LOCK = threading.Lock()
+
+
+def call_template(substrate, call_module, call_function):
+    """The shared template of a (pallet, function) on this substrate connection"""
+    with TEMPLATES_LOCK:
+        templates = TEMPLATES.setdefault(substrate, {})
+        key = (call_module, call_function)
+        if key not in templates:
+            templates[key] = CallTemplate(substrate, call_module, call_function)
+        return templates[key]
+
+
+def compose_call(substrate, call_module, call_function, call_params):
+    """substrate.compose_call through the shared template"""
+    return call_template(substrate, call_module, call_function).compose(call_params)
+
+
+def batch_compose_call(batch, call_module, call_function, call_params):
+    """ExtrinsicBatch.compose_call through the shared template"""
+    batch.batch.append(compose_call(batch.substrate, call_module, call_function, call_params))
+
+
+def batch_compose_sudo_call(batch, call_module, call_function, call_params):
+    """ExtrinsicBatch.compose_sudo_call through the shared template"""
+    call = compose_call(batch.substrate, call_module, call_function, call_params)
+    batch.batch.append(compose_call(batch.substrate, 'Sudo', 'sudo', {'call': call}))
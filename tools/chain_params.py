@@ -0,0 +1,69 @@
+from collections.abc import Mapping
+from functools import cached_property
+
+from tools.utils import PARACHAIN_WS_URL, get_parachain_id
+from tools.connection_pool import get_substrate
+
+
+class ChainParams():
+    """
+    Parameters of one chain, resolved on first use from a pooled connection
+    and memoized, so importing a module which needs them stays offline.
+
+    Example:
+        PEAQ_PARAMS.para_id
+        PEAQ_PARAMS.existential_deposit
+    """
+
+    def __init__(self, url, **kwargs):
+        self.url = url
+        self._kwargs = kwargs
+
+    @property
+    def substrate(self):
+        return get_substrate(self.url, **self._kwargs)
+
+    @cached_property
+    def para_id(self):
+        return get_parachain_id(self.substrate)
+
+    @cached_property
+    def eth_chain_id(self):
+        from tools.peaq_eth_utils import get_eth_chain_id
+        return get_eth_chain_id(self.substrate)
+
+    @cached_property
+    def existential_deposit(self):
+        return self.substrate.get_constant('Balances', 'ExistentialDeposit').value
+
+    @cached_property
+    def token_decimals(self):
+        return self.substrate.token_decimals
+
+
+class LazyDict(Mapping):
+    """A read-only dict built by `factory` on first access"""
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._data = None
+
+    def _get(self):
+        if self._data is None:
+            self._data = self._factory()
+        return self._data
+
+    def __getitem__(self, key):
+        return self._get()[key]
+
+    def __iter__(self):
+        return iter(self._get())
+
+    def __len__(self):
+        return len(self._get())
+
+    def __repr__(self):
+        return repr(self._get()) if self._data is not None else f'LazyDict({self._factory})'
+
+
+PEAQ_PARAMS = ChainParams(PARACHAIN_WS_URL)
@@ -2,8 +2,9 @@ import sys
 sys.path.append('./')
 
 
-from substrateinterface import SubstrateInterface
-from peaq.utils import get_block_height, get_block_hash
+from tools.connection_pool import get_substrate
+from tools.block_cache import BLOCK_CACHE
+from peaq.utils import get_block_height
 import argparse
 from collections import Counter
 import pprint
@@ -12,12 +13,14 @@ pp = pprint.PrettyPrinter(indent=4)
 
 def get_current_collator(substrate, num=80):
     now_block_height = get_block_height(substrate)
+    heights = [now_block_height - i for i in range(num)]
     collators = []
-    for i in range(num):
-        print(f'get author in block height: {now_block_height - i}')
-        block_hash = get_block_hash(substrate, now_block_height - i)
-        block_info = substrate.get_block(block_hash, include_author=True)
-        collators.append(block_info['author'])
+    for height, block_hash in zip(heights, BLOCK_CACHE.get_block_hashes(substrate, heights)):
+        print(f'get author in block height: {height}')
+        try:
+            collators.append(BLOCK_CACHE.get_author(substrate, block_hash))
+        except LookupError as e:
+            print(f'skip block height {height}: {e}')
     return Counter(collators)
 
 
@@ -36,9 +39,7 @@ if __name__ == '__main__':
 
     args = parser.parse_args()
 
-    substrate = SubstrateInterface(
-        url=args.runtime,
-    )
+    substrate = get_substrate(args.runtime)
     validators = get_session_validator(substrate)
     collator_set = get_current_collator(substrate, 16 * 4)
     print(f'Validators who didn\'t produce block: {validators - set(collator_set.keys())}')
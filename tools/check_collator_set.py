@@ -1,6 +1,6 @@
 import sys
 sys.path.append('./')
-from substrateinterface import SubstrateInterface
+from tools.connection_pool import get_substrate
 
 URL = "wss://wss-krest.peaq.network"
 
@@ -73,9 +73,7 @@ def check_in_autorities(substrate, addr):
 
 
 if __name__ == '__main__':
-    substrate = SubstrateInterface(
-        url=URL,
-    )
+    substrate = get_substrate(URL)
     if not check_collator_in_set(substrate, ADDR):
         sys.exit(1)
 
@@ -0,0 +1,213 @@
+import sys
+sys.path.append('./')
+
+import threading
+from collections import Counter, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from substrateinterface import SubstrateInterface
+from peaq.utils import get_block_height
+from tools.block_cache import BLOCK_CACHE
+from tools.block_subscription import subscription_for
+from tools.connection_pool import get_substrate
+import argparse
+
+import pprint
+pp = pprint.PrettyPrinter(indent=4)
+
+DEFAULT_WINDOW = 600
+STATS_WORKERS = 8
+
+BlockRecord = namedtuple('BlockRecord', ['number', 'hash', 'author', 'round', 'validators'])
+RoundInfo = namedtuple('RoundInfo', ['index', 'first', 'length', 'block_hash', 'top_candidates', 'max_selected'])
+
+
+def query_round(substrate, block_hash):
+    """The ParachainStaking round of the block, with the TopCandidates and MaxSelectedCandidates of that block"""
+    round_info = substrate.query('ParachainStaking', 'Round', block_hash=block_hash).value
+    top_candidates = substrate.query('ParachainStaking', 'TopCandidates', block_hash=block_hash).value
+    max_selected = substrate.query('ParachainStaking', 'MaxSelectedCandidates', block_hash=block_hash).value
+    return RoundInfo(
+        round_info['current'], round_info['first'], round_info['length'], block_hash,
+        [(c['owner'], c['amount']) for c in top_candidates], max_selected)
+
+
+class CollatorStats():
+    """
+    Rolling window of block authors and the validator set of every block.
+
+    load() backfills the window concurrently, follow() keeps it updated from
+    the new heads of the chain. stats() gives, per collator, the produced
+    blocks and the expected ones: aura picks one of the session validators
+    per slot, so each block counts 1 / len(validators) for every validator.
+    The round, the top candidates and the selected ones are read once per
+    round, at a block of that round.
+
+    Example:
+        stats = CollatorStats(substrate)
+        stats.load(substrate)
+        stats.follow()
+        stats.stats(round_index=stats.rounds()[-1])
+    """
+
+    def __init__(self, substrate, window=DEFAULT_WINDOW, workers=STATS_WORKERS):
+        self.window = window
+        self.workers = workers
+        self._url = substrate.url
+        self._ss58_format = substrate.ss58_format
+        self._subscription = subscription_for(substrate)
+        self._lock = threading.Lock()
+        self._blocks = {}
+        self._rounds = {}
+        self._following = False
+
+    def _add_round(self, round_info):
+        with self._lock:
+            self._rounds[round_info.index] = round_info
+
+    def _round_of(self, number):
+        with self._lock:
+            rounds = [r for r in self._rounds.values() if r.first <= number]
+        return max(rounds, key=lambda r: r.first).index if rounds else None
+
+    def latest_round(self):
+        with self._lock:
+            return max(self._rounds.values(), key=lambda r: r.first) if self._rounds else None
+
+    def round_info(self, round_index):
+        with self._lock:
+            return self._rounds.get(round_index)
+
+    def _load_rounds(self, substrate, blocks):
+        """Walks back from the newest block, one query per round in the window"""
+        hashes = dict(blocks)
+        number = blocks[-1][0]
+        while number >= blocks[0][0]:
+            round_info = query_round(substrate, hashes[number])
+            self._add_round(round_info)
+            number = min(round_info.first, number) - 1
+
+    def _record(self, substrate, number, block_hash, header=None):
+        validators = BLOCK_CACHE.get_validators(substrate, block_hash)
+        try:
+            author = BLOCK_CACHE.get_author(substrate, block_hash, header, validators)
+        except LookupError as e:
+            print(f'No author of block {number}, {e}')
+            author = None
+        return BlockRecord(number, block_hash, author, self._round_of(number), tuple(validators))
+
+    def _load_chunk(self, chunk):
+        substrate = SubstrateInterface(url=self._url, ss58_format=self._ss58_format)
+        try:
+            block_hashes = [block_hash for _, block_hash in chunk]
+            validators = [BLOCK_CACHE.get_validators(substrate, block_hash) for block_hash in block_hashes]
+            authors = BLOCK_CACHE.get_authors(substrate, block_hashes, validators)
+            return [
+                BlockRecord(number, block_hash, author, self._round_of(number), tuple(block_validators))
+                for (number, block_hash), author, block_validators in zip(chunk, authors, validators)]
+        finally:
+            substrate.close()
+
+    def _add(self, records):
+        with self._lock:
+            for record in records:
+                self._blocks[record.number] = record
+            newest = max(self._blocks)
+            for number in [n for n in self._blocks if n <= newest - self.window]:
+                del self._blocks[number]
+            oldest = min(self._blocks)
+            for index in [i for i, r in self._rounds.items() if r.first + r.length <= oldest]:
+                del self._rounds[index]
+
+    def load(self, substrate, end=None):
+        end = end or get_block_height(substrate)
+        heights = list(range(max(end - self.window + 1, 1), end + 1))
+        blocks = list(zip(heights, BLOCK_CACHE.get_block_hashes(substrate, heights)))
+        self._load_rounds(substrate, blocks)
+        chunk_size = max(len(blocks) // self.workers, 1)
+        chunks = [blocks[i:i + chunk_size] for i in range(0, len(blocks), chunk_size)]
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for records in executor.map(self._load_chunk, chunks):
+                self._add(records)
+        return self
+
+    def follow(self):
+        self._following = True
+        self._subscription.add_listener(self._on_block)
+        return self
+
+    def stop(self):
+        self._following = False
+
+    def _on_block(self, block):
+        if not self._following:
+            return True
+        latest = self.latest_round()
+        if latest is None or block.number >= latest.first + latest.length:
+            self._add_round(query_round(block.substrate, block.hash))
+        self._add([self._record(block.substrate, block.number, block.hash, block.header)])
+        return False
+
+    def blocks(self, round_index=None):
+        with self._lock:
+            records = sorted(self._blocks.values())
+        if round_index is None:
+            return records
+        return [r for r in records if r.round == round_index]
+
+    def rounds(self):
+        return sorted({r.round for r in self.blocks()})
+
+    def stats(self, round_index=None):
+        """
+        {collator: {'produced', 'expected', 'ratio', 'in_session', 'top_candidate_rank', 'selected', 'stake'}}
+        over the blocks of the window, or of one round in the window. The
+        candidates are the ones of that round, or of the latest round.
+        """
+        records = self.blocks(round_index)
+        produced = Counter(r.author for r in records if r.author is not None)
+        expected = Counter()
+        for record in records:
+            for validator in record.validators:
+                expected[validator] += 1 / len(record.validators)
+
+        round_info = self.latest_round() if round_index is None else self.round_info(round_index)
+        top_candidates = round_info.top_candidates if round_info else []
+        max_selected = round_info.max_selected if round_info else 0
+        ranks = {owner: (i, amount) for i, (owner, amount) in enumerate(top_candidates)}
+        session = set(records[-1].validators) if records else set()
+
+        out = {}
+        for collator in set(produced) | set(expected) | set(ranks):
+            rank, stake = ranks.get(collator, (None, None))
+            out[collator] = {
+                'produced': produced[collator],
+                'expected': expected[collator],
+                'ratio': produced[collator] / expected[collator] if expected[collator] else None,
+                'in_session': collator in session,
+                'top_candidate_rank': rank,
+                'selected': rank is not None and rank < max_selected,
+                'stake': stake,
+            }
+        return out
+
+    def stats_by_round(self):
+        return {round_index: self.stats(round_index) for round_index in self.rounds()}
+
+    def underperformers(self, threshold=0.5, round_index=None):
+        return {
+            collator: info for collator, info in self.stats(round_index).items()
+            if info['ratio'] is not None and info['ratio'] < threshold
+        }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Block author statistics of the collators')
+    parser.add_argument('-r', '--runtime', type=str, required=True, help='Your runtime websocket endpoint')
+    parser.add_argument('-w', '--window', type=int, default=DEFAULT_WINDOW, help='Number of blocks')
+
+    args = parser.parse_args()
+
+    substrate = get_substrate(args.runtime)
+    collator_stats = CollatorStats(substrate, args.window).load(substrate)
+    pp.pprint(collator_stats.stats_by_round())
+    print(f'Collators under 50% of their expected blocks: {list(collator_stats.underperformers())}')
@@ -0,0 +1,95 @@
+import threading
+
+from substrateinterface import SubstrateInterface
+from websocket import WebSocketException
+from tools.metadata_cache import attach_metadata_cache
+
+
+class SubstrateConnectionPool():
+    """
+    Hands out live, metadata-initialized SubstrateInterface objects.
+
+    One connection is kept per (url, connection options, thread), so a whole
+    test session talks to each chain over a single websocket, and runtime
+    metadata comes from the on-disk cache in tools.metadata_cache. Before a
+    connection is handed out it's health-checked with `system_health` and
+    reconnected if the node went away (e.g. after restart_parachain_launch).
+
+    Example:
+        substrate = get_substrate(WS_URL)
+        relay = get_substrate(RELAYCHAIN_WS_URL, type_registry_preset='rococo')
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._conns = {}
+
+    def get(self, url, **kwargs):
+        key = self._key(url, kwargs)
+        with self._lock:
+            substrate = self._conns.get(key)
+            if substrate is None:
+                substrate = self._connect(url, kwargs)
+                self._conns[key] = substrate
+                return substrate
+
+            if not self._is_alive(substrate):
+                print(f'Reconnect to {url}')
+                self._reconnect(substrate)
+            return substrate
+
+    def close(self, url):
+        with self._lock:
+            for key in [k for k in self._conns if k[0] == url]:
+                self._close_conn(self._conns.pop(key))
+
+    def close_all(self):
+        with self._lock:
+            for substrate in self._conns.values():
+                self._close_conn(substrate)
+            self._conns = {}
+
+    def connections(self):
+        with self._lock:
+            return list(self._conns.values())
+
+    @staticmethod
+    def _key(url, kwargs):
+        return (url, tuple(sorted((k, repr(v)) for k, v in kwargs.items())), threading.get_ident())
+
+    @staticmethod
+    def _connect(url, kwargs):
+        substrate = SubstrateInterface(url=url, **kwargs)
+        attach_metadata_cache(substrate)
+        substrate.init_runtime()
+        return substrate
+
+    @staticmethod
+    def _is_alive(substrate):
+        try:
+            return 'result' in substrate.rpc_request('system_health', [])
+        except (WebSocketException, ConnectionError, OSError):
+            return False
+
+    @staticmethod
+    def _reconnect(substrate):
+        try:
+            substrate.websocket.close()
+        except (WebSocketException, OSError):
+            pass
+        substrate.connect_websocket()
+        substrate.init_runtime()
+
+    @staticmethod
+    def _close_conn(substrate):
+        try:
+            substrate.close()
+        except (WebSocketException, OSError):
+            pass
+
+
+POOL = SubstrateConnectionPool()
+
+
+def get_substrate(url, **kwargs):
+    return POOL.get(url, **kwargs)
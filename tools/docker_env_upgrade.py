@@ -4,7 +4,7 @@ import os
 
 from peaq.utils import ExtrinsicBatch
 from peaq.utils import show_extrinsic
-from substrateinterface import SubstrateInterface
+from tools.connection_pool import get_substrate
 from peaq.utils import wait_for_n_blocks
 from tools.runtime_upgrade import send_upgrade_call
 from tools.runtime_upgrade import wait_relay_upgrade_block
@@ -33,7 +33,7 @@ ACA_TOKEN_ASSET_ID = 2
 
 
 def parachain_behaviour(wasm_path):
-    substrate = SubstrateInterface(url=PEAQ_WS_URL)
+    substrate = get_substrate(PEAQ_WS_URL)
 
     # Do the runtime upgrade for the docker env: peaq env
     do_runtime_upgrade(substrate, wasm_path)
@@ -86,7 +86,7 @@ def setup_slot(substrate):
 
 
 def relaychain_behavior():
-    substrate = SubstrateInterface(url=RELAY_WS_URL)
+    substrate = get_substrate(RELAY_WS_URL)
     setup_slot(substrate)
 
 
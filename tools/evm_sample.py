@@ -4,10 +4,12 @@ sys.path.append('./')
 
 from web3 import Web3
 from tools.peaq_eth_utils import deploy_contract, get_contract
-from substrateinterface import SubstrateInterface, Keypair, KeypairType
+from substrateinterface import Keypair, KeypairType
+from tools.connection_pool import get_substrate
 from tools.utils import WS_URL, ETH_URL
 from peaq.eth import calculate_evm_account
 from peaq.extrinsic import transfer
+from tools.keyring import keypair_from_uri
 
 
 BYTECODE_FILE = 'ETH/event_sample/bytecode'
@@ -18,8 +20,8 @@ ETH_PRIVATE_KEY = '0xa2899b053679427c8c446dc990c8990c75052fd3009e563c6a613d982d6
 
 
 def setup(kp_eth_src):
-    KP_SRC = Keypair.create_from_uri('//Alice')
-    substrate = SubstrateInterface(url=WS_URL)
+    KP_SRC = keypair_from_uri('//Alice')
+    substrate = get_substrate(WS_URL)
     token_num = 10000 * pow(10, 15)
     receipt = transfer(substrate, KP_SRC, calculate_evm_account(kp_eth_src.ss58_address), token_num)
     print(f'call_eth_transfer_a_lot: {receipt.is_success}')
@@ -1,6 +1,6 @@
 import sys
 sys.path.append('./')
-from substrateinterface import SubstrateInterface
+from tools.connection_pool import get_substrate
 from tools.utils import ExtrinsicBatch
 from tools.utils import KP_GLOBAL_SUDO
 
@@ -20,9 +20,7 @@ def get_collator(substrate):
 
 
 if __name__ == '__main__':
-    substrate = SubstrateInterface(
-        url=URL,
-    )
+    substrate = get_substrate(URL)
     collators = get_collator(substrate)
     collators = [collator for collator in collators if collator != COLLATOR]
 
@@ -0,0 +1,139 @@
+import threading
+from collections import deque
+
+from substrateinterface import KeypairType
+from peaq.eth import calculate_evm_account
+from tools.utils import WS_URL, KP_GLOBAL_SUDO, TOKEN_NUM_BASE_DEV
+from tools.connection_pool import get_substrate
+from tools.keypair_pool import new_keypairs
+from tools.payload import pipelined, sign_and_submit, sudo_error
+from tools.call_template import compose_call
+
+
+DEFAULT_FUND_AMOUNT = 1000 * TOKEN_NUM_BASE_DEV
+# Leave room in the block for the other extrinsics
+BATCH_WEIGHT_RATIO = 0.75
+
+
+def funded_address(kp):
+    """ECDSA keypairs are funded on their EVM mapped substrate account"""
+    if kp.crypto_type == KeypairType.ECDSA:
+        return calculate_evm_account(kp.ss58_address)
+    return kp.ss58_address
+
+
+class FundingService():
+    """
+    Funds the accounts the tests need up front.
+
+    require() declares the accounts, fund() funds everything declared with
+    as few Sudo(Utility.batch_all(force_set_balance...)) extrinsics as the
+    runtime's max extrinsic weight and length allow, all in the same blocks.
+    take() hands out a funded account and funds the declared ones first.
+
+    Example:
+        FUNDING_SERVICE.require(10)
+        FUNDING_SERVICE.require(2, KeypairType.ECDSA)
+        kp = FUNDING_SERVICE.take()
+    """
+
+    def __init__(self, url=WS_URL, sudo_keypair=KP_GLOBAL_SUDO):
+        self.url = url
+        self.sudo_keypair = sudo_keypair
+        self._lock = threading.RLock()
+        self._required = {}
+        self._ready = {}
+
+    def require(self, number, crypto_type=KeypairType.SR25519, amount=DEFAULT_FUND_AMOUNT):
+        with self._lock:
+            key = (crypto_type, amount)
+            self._required[key] = self._required.get(key, 0) + number
+
+    def _fund_call(self, substrate, addr, amount):
+        return compose_call(substrate, 'Balances', 'force_set_balance', {
+            'who': addr,
+            'new_free': amount,
+            'new_reserved': 0
+        })
+
+    def _sudo_batch(self, substrate, calls):
+        batch_call = substrate.compose_call(
+            call_module='Utility',
+            call_function='batch_all',
+            call_params={
+                'calls': calls,
+            })
+        return substrate.compose_call(
+            call_module='Sudo',
+            call_function='sudo',
+            call_params={
+                'call': batch_call,
+            })
+
+    def batch_size(self, substrate, sample_call):
+        """How many force_set_balance calls fit in one extrinsic"""
+        weights = substrate.get_constant('System', 'BlockWeights').value
+        max_ref_time = weights['per_class']['normal']['max_extrinsic']['ref_time']
+        max_length = substrate.get_constant('System', 'BlockLength').value['max']['normal']
+
+        one = substrate.get_payment_info(self._sudo_batch(substrate, [sample_call]), self.sudo_keypair)
+        two = substrate.get_payment_info(self._sudo_batch(substrate, [sample_call] * 2), self.sudo_keypair)
+        call_ref_time = two['weight']['ref_time'] - one['weight']['ref_time']
+        base_ref_time = one['weight']['ref_time'] - call_ref_time
+        call_length = len(sample_call.data)
+
+        by_weight = (max_ref_time * BATCH_WEIGHT_RATIO - base_ref_time) // max(call_ref_time, 1)
+        by_length = max_length * BATCH_WEIGHT_RATIO // call_length
+        return max(int(min(by_weight, by_length)), 1)
+
+    def fund(self):
+        with self._lock:
+            required, self._required = self._required, {}
+            if not required:
+                return
+            substrate = get_substrate(self.url)
+            accounts = []
+            for (crypto_type, amount), number in required.items():
+                for kp in new_keypairs(number, crypto_type):
+                    accounts.append((crypto_type, amount, kp))
+            calls = [self._fund_call(substrate, funded_address(kp), amount) for _, amount, kp in accounts]
+            size = self.batch_size(substrate, calls[0])
+
+            with pipelined() as pipe:
+                for i in range(0, len(calls), size):
+                    sign_and_submit(
+                        substrate, self.sudo_keypair, self._sudo_batch(substrate, calls[i:i + size]),
+                        info_type=f'fund accounts {i}-{min(i + size, len(calls))}')
+            for receipt in pipe.wait():
+                if not receipt.is_success:
+                    raise IOError(f'Cannot fund the accounts, {receipt.error_message}')
+                error = sudo_error(receipt)
+                if error is not None:
+                    raise IOError(f'Cannot fund the accounts, the sudo call failed: {error}')
+
+            for crypto_type, amount, kp in accounts:
+                self._ready.setdefault((crypto_type, amount), deque()).append(kp)
+            print(f'Funded {len(accounts)} accounts with {len(pipe.handles)} extrinsics')
+
+    def take_many(self, number, crypto_type=KeypairType.SR25519, amount=DEFAULT_FUND_AMOUNT):
+        with self._lock:
+            ready = self._ready.setdefault((crypto_type, amount), deque())
+            if len(ready) < number:
+                self.require(number - len(ready), crypto_type, amount)
+            if self._required:
+                self.fund()
+            return [ready.popleft() for _ in range(number)]
+
+    def take(self, crypto_type=KeypairType.SR25519, amount=DEFAULT_FUND_AMOUNT):
+        return self.take_many(1, crypto_type, amount)[0]
+
+    def invalidate(self):
+        """The chain was reset, the funded accounts which weren't handed out are funded again"""
+        with self._lock:
+            for (crypto_type, amount), ready in self._ready.items():
+                if ready:
+                    self.require(len(ready), crypto_type, amount)
+            self._ready = {}
+
+
+FUNDING_SERVICE = FundingService()
@@ -0,0 +1,135 @@
+import os
+import re
+import json
+import time
+import threading
+from collections import Counter
+from functools import wraps
+
+import peaq.utils
+from substrateinterface import SubstrateInterface
+from web3 import HTTPProvider
+
+
+class Profiler():
+    """
+    Splits the wall time of the running test by phase and counts the RPC
+    calls by method.
+
+    Only the outermost phase of the test thread is timed, e.g. the
+    rpc_request calls made inside wait_for_n_blocks are counted but their
+    time is part of the wait_for_n_blocks phase. The time outside any phase
+    is reported as `other`. RPC calls from the other threads (the block
+    subscriptions, the thread pools) are counted too.
+
+    Example:
+        PROFILER.start('tests/fund_test.py::TestFund::test_fund')
+        ...
+        report = PROFILER.stop()
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._test = None
+        self._thread = None
+
+    def start(self, test):
+        with self._lock:
+            self._test = test
+            self._thread = threading.get_ident()
+            self._start = time.time()
+            self._phases = Counter()
+            self._phase_calls = Counter()
+            self._rpc_calls = Counter()
+
+    def stop(self):
+        with self._lock:
+            if self._test is None:
+                return None
+            duration = time.time() - self._start
+            phases = dict(self._phases)
+            phases['other'] = max(duration - sum(phases.values()), 0)
+            report = {
+                'test': self._test,
+                'duration': duration,
+                'phases': phases,
+                'phase_calls': dict(self._phase_calls),
+                'rpc_calls': dict(self._rpc_calls),
+                'rpc_total': sum(self._rpc_calls.values()),
+            }
+            self._test = None
+            return report
+
+    def count_rpc(self, method):
+        with self._lock:
+            if self._test is not None:
+                self._rpc_calls[method] += 1
+
+    def run_phase(self, name, func, *args, **kwargs):
+        if self._test is None or threading.get_ident() != self._thread or getattr(self._local, 'phase', None):
+            return func(*args, **kwargs)
+        self._local.phase = name
+        start = time.time()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self._local.phase = None
+            with self._lock:
+                if self._test is not None:
+                    self._phases[name] += time.time() - start
+                    self._phase_calls[name] += 1
+
+
+PROFILER = Profiler()
+
+
+def timed_phase(name):
+    """Decorator, the time spent in the function is reported as the `name` phase"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            return PROFILER.run_phase(name, func, *args, **kwargs)
+        wrapper.__wrapped_phase__ = name
+        return wrapper
+    return decorator
+
+
+def _instrument_rpc_request(rpc_request):
+    @wraps(rpc_request)
+    def wrapper(self, method, params, result_handler=None):
+        PROFILER.count_rpc(method)
+        return PROFILER.run_phase('rpc_request', rpc_request, self, method, params, result_handler)
+    return wrapper
+
+
+def _instrument_make_request(make_request):
+    @wraps(make_request)
+    def wrapper(self, method, params):
+        PROFILER.count_rpc(method)
+        return PROFILER.run_phase('web3_request', make_request, self, method, params)
+    return wrapper
+
+
+def install_instrumentation():
+    """
+    Wraps the library functions, has to run before the test modules import
+    them by name. Calling it again doesn't wrap them twice.
+    """
+    if getattr(SubstrateInterface.rpc_request, '__wrapped_phase__', None):
+        return
+    SubstrateInterface.rpc_request = _instrument_rpc_request(SubstrateInterface.rpc_request)
+    SubstrateInterface.rpc_request.__wrapped_phase__ = 'rpc_request'
+    SubstrateInterface.submit_extrinsic = timed_phase('submit_extrinsic')(SubstrateInterface.submit_extrinsic)
+    SubstrateInterface.init_runtime = timed_phase('init_runtime')(SubstrateInterface.init_runtime)
+    HTTPProvider.make_request = _instrument_make_request(HTTPProvider.make_request)
+    peaq.utils.wait_for_n_blocks = timed_phase('wait_for_n_blocks')(peaq.utils.wait_for_n_blocks)
+    # The hard-coded sleeps of the tests, the ones inside a phase count for that phase
+    time.sleep = timed_phase('sleep')(time.sleep)
+
+
+def write_report(report, report_dir):
+    os.makedirs(report_dir, exist_ok=True)
+    name = re.sub(r'[^A-Za-z0-9_.-]+', '_', report['test'])
+    with open(os.path.join(report_dir, f'{name}.json'), 'w') as f:
+        json.dump(report, f, indent=4)
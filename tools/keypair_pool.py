@@ -0,0 +1,142 @@
+import os
+import json
+import atexit
+import threading
+
+import sr25519
+from concurrent.futures import ProcessPoolExecutor
+from substrateinterface import Keypair, KeypairType
+from substrateinterface.key import extract_derive_path
+from substrateinterface.utils.hasher import blake2_256
+
+
+# A fixed seed (hex) gives the same accounts on every run, together with the
+# cache file the next run continues with the accounts not handed out yet
+KEYPAIR_POOL_SEED = os.environ.get('KEYPAIR_POOL_SEED')
+KEYPAIR_POOL_CACHE = os.environ.get('KEYPAIR_POOL_CACHE')
+# Below this many keys the process pool costs more than it saves
+PARALLEL_DERIVE_MIN = 1000
+DERIVE_BATCH = 256
+# SCALE encoded "Secp256k1HDKD", see sp_core::ecdsa::derive_hard_junction
+ECDSA_HDKD = b'\x34Secp256k1HDKD'
+
+
+def _chain_code(index):
+    return extract_derive_path(f'//{index}')[0].chain_code
+
+
+def derive_keys(seed, crypto_type, indexes):
+    """
+    Hard derives seed//index for every index and returns the (public key,
+    private key) hex pairs. Runs in the worker processes.
+    """
+    keys = []
+    if crypto_type == KeypairType.ECDSA:
+        for index in indexes:
+            private_key = blake2_256(ECDSA_HDKD + seed + _chain_code(index))
+            keys.append((None, private_key.hex()))
+        return keys
+
+    base = sr25519.pair_from_seed(seed)
+    for index in indexes:
+        _, public_key, private_key = sr25519.hard_derive_keypair((_chain_code(index), base[0], base[1]), b'')
+        keys.append((public_key.hex(), private_key.hex()))
+    return keys
+
+
+class KeypairPool():
+    """
+    Hands out fresh accounts, hard derived from one seed as seed//0, seed//1,
+    ... instead of a mnemonic each (PBKDF2 is slow on purpose). The keys are
+    derived ahead in batches, in a process pool for big batches, so take() is
+    O(1) during a run.
+
+    Example:
+        kp = SR25519_POOL.take()
+        kp_eth = ECDSA_POOL.take()
+    """
+
+    def __init__(self, crypto_type=KeypairType.SR25519, seed_hex=KEYPAIR_POOL_SEED, cache_path=KEYPAIR_POOL_CACHE):
+        self.crypto_type = crypto_type
+        self.seed = bytes.fromhex(seed_hex.replace('0x', '')) if seed_hex else os.urandom(32)
+        self.cache_path = cache_path if seed_hex else None
+        self._lock = threading.Lock()
+        self._keys = []
+        self._next = 0
+        self._load()
+
+    def _cache_key(self):
+        return f'{self.crypto_type}:{blake2_256(self.seed).hex()}'
+
+    def _load(self):
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return
+        with open(self.cache_path) as f:
+            entry = json.load(f).get(self._cache_key())
+        if entry:
+            self._keys = [tuple(k) for k in entry['keys']]
+            self._next = entry['next']
+
+    def save(self):
+        if not self.cache_path:
+            return
+        with self._lock:
+            entry = {'next': self._next, 'keys': self._keys}
+        data = {}
+        if os.path.exists(self.cache_path):
+            with open(self.cache_path) as f:
+                data = json.load(f)
+        data[self._cache_key()] = entry
+        os.makedirs(os.path.dirname(os.path.abspath(self.cache_path)), exist_ok=True)
+        tmp_path = f'{self.cache_path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.cache_path)
+
+    def derive(self, number):
+        """Derives `number` more keys ahead"""
+        start = len(self._keys)
+        indexes = list(range(start, start + number))
+        if number < PARALLEL_DERIVE_MIN:
+            keys = derive_keys(self.seed, self.crypto_type, indexes)
+        else:
+            chunks = [indexes[i:i + DERIVE_BATCH] for i in range(0, number, DERIVE_BATCH)]
+            with ProcessPoolExecutor() as executor:
+                results = executor.map(derive_keys, [self.seed] * len(chunks), [self.crypto_type] * len(chunks), chunks)
+                keys = [key for result in results for key in result]
+        self._keys.extend(keys)
+
+    def _to_keypair(self, key):
+        public_key, private_key = key
+        if self.crypto_type == KeypairType.ECDSA:
+            return Keypair.create_from_private_key(private_key, crypto_type=KeypairType.ECDSA)
+        return Keypair.create_from_private_key(private_key, public_key, ss58_format=42, crypto_type=self.crypto_type)
+
+    def take_many(self, number):
+        with self._lock:
+            if self._next + number > len(self._keys):
+                self.derive(max(self._next + number - len(self._keys), DERIVE_BATCH))
+            keys = self._keys[self._next:self._next + number]
+            self._next += number
+        return [self._to_keypair(key) for key in keys]
+
+    def take(self):
+        return self.take_many(1)[0]
+
+
+SR25519_POOL = KeypairPool(KeypairType.SR25519)
+ECDSA_POOL = KeypairPool(KeypairType.ECDSA)
+atexit.register(SR25519_POOL.save)
+atexit.register(ECDSA_POOL.save)
+
+
+def new_keypair(crypto_type=KeypairType.SR25519):
+    if crypto_type == KeypairType.ECDSA:
+        return ECDSA_POOL.take()
+    return SR25519_POOL.take()
+
+
+def new_keypairs(number, crypto_type=KeypairType.SR25519):
+    if crypto_type == KeypairType.ECDSA:
+        return ECDSA_POOL.take_many(number)
+    return SR25519_POOL.take_many(number)
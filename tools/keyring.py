@@ -0,0 +1,78 @@
+import threading
+
+from substrateinterface import Keypair, KeypairType
+from tools.keypair_pool import new_keypair
+
+
+class LazyKeypair(Keypair):
+    """
+    A Keypair derived on first use: from `uri`, or a fresh pool account when
+    there is no uri. It's a real Keypair subclass, so the isinstance checks
+    (e.g. in create_signed_extrinsic) pass; after the first attribute access
+    it's a plain Keypair instance without any overhead.
+    """
+
+    _lazy_lock = threading.Lock()
+
+    def __init__(self, uri=None, crypto_type=KeypairType.SR25519):
+        self._lazy_uri = uri
+        self._lazy_crypto_type = crypto_type
+
+    def _lazy_resolve(self):
+        with self._lazy_lock:
+            if 'public_key' in self.__dict__:
+                return
+            if self._lazy_uri is None:
+                keypair = new_keypair(self._lazy_crypto_type)
+            else:
+                keypair = Keypair.create_from_uri(self._lazy_uri, crypto_type=self._lazy_crypto_type)
+            self.__dict__.update(vars(keypair))
+
+    def __getattr__(self, name):
+        # Only called for the attributes a Keypair sets in its __init__
+        if name.startswith('_'):
+            raise AttributeError(name)
+        self._lazy_resolve()
+        try:
+            return self.__dict__[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __repr__(self):
+        if 'public_key' not in self.__dict__:
+            return f'<LazyKeypair {self._lazy_uri or "(new)"}>'
+        return super().__repr__()
+
+
+class Keyring():
+    """
+    Process-wide memo of the keypairs of the `//Alice`-style URIs. Every uri
+    is derived once, on first use, and the same object is shared by every
+    module.
+
+    Example:
+        KP_BOB = keypair_from_uri('//Bob')
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._keypairs = {}
+
+    def get(self, uri, crypto_type=KeypairType.SR25519):
+        key = (uri, crypto_type)
+        with self._lock:
+            if key not in self._keypairs:
+                self._keypairs[key] = LazyKeypair(uri, crypto_type)
+            return self._keypairs[key]
+
+
+KEYRING = Keyring()
+
+
+def keypair_from_uri(uri, crypto_type=KeypairType.SR25519):
+    return KEYRING.get(uri, crypto_type)
+
+
+def lazy_new_keypair(crypto_type=KeypairType.SR25519):
+    """A fresh account, taken from the keypair pool on first use"""
+    return LazyKeypair(None, crypto_type)
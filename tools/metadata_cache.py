@@ -0,0 +1,79 @@
+import os
+import glob
+import threading
+
+from scalecodec.base import ScaleBytes
+
+
+METADATA_CACHE_DIR = os.environ.get(
+    'METADATA_CACHE_DIR',
+    os.path.join(os.path.expanduser('~'), '.cache', 'peaq-bc-test', 'metadata'))
+
+# Decoded metadata shared by every interface in this process
+_decoded = {}
+_lock = threading.Lock()
+
+
+class MetadataDiskCache():
+    """
+    On-disk runtime metadata store for one SubstrateInterface.
+
+    It implements the small part of the dogpile cache-region API that
+    SubstrateInterface.init_runtime uses (get/set), so it can be set as the
+    interface's `cache_region`. Entries are the raw SCALE bytes, keyed by the
+    chain's genesis hash plus the spec_version and transaction_version of the
+    runtime, therefore a fresh process doesn't call state_getMetadata at all
+    for a runtime it has seen before.
+    """
+
+    def __init__(self, substrate, cache_dir=METADATA_CACHE_DIR):
+        self._substrate = substrate
+        self._cache_dir = cache_dir
+        self._genesis_hash = None
+
+    def get(self, key):
+        path = self._path()
+        with _lock:
+            if path in _decoded:
+                return _decoded[path]
+            if not os.path.exists(path):
+                return None
+            with open(path, 'rb') as f:
+                raw = f.read()
+            metadata = self._substrate.runtime_config.create_scale_object(
+                'MetadataVersioned', data=ScaleBytes(raw))
+            metadata.decode()
+            _decoded[path] = metadata
+            return metadata
+
+    def set(self, key, metadata):
+        path = self._path()
+        os.makedirs(self._cache_dir, exist_ok=True)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(bytes(metadata.data.data))
+        os.replace(tmp_path, path)
+        with _lock:
+            _decoded[path] = metadata
+
+    def _path(self):
+        if self._genesis_hash is None:
+            self._genesis_hash = self._substrate.get_block_hash(0)
+        return os.path.join(
+            self._cache_dir,
+            f'{self._genesis_hash}-{self._substrate.runtime_version}-{self._substrate.transaction_version}.scale')
+
+
+def attach_metadata_cache(substrate, cache_dir=METADATA_CACHE_DIR):
+    substrate.cache_region = MetadataDiskCache(substrate, cache_dir)
+    return substrate
+
+
+def invalidate_metadata_cache(genesis_hash=None, cache_dir=METADATA_CACHE_DIR):
+    pattern = f'{genesis_hash}-*.scale' if genesis_hash else '*.scale'
+    paths = glob.glob(os.path.join(cache_dir, pattern))
+    with _lock:
+        for path in paths:
+            _decoded.pop(path, None)
+            os.remove(path)
+    return len(paths)
@@ -1,13 +1,53 @@
+import struct
+
 from scalecodec.base import ScaleBytes
-from scalecodec.types import U8, U16, U32, U64, U128, U256
+from scalecodec.types import FixedLengthArray, U8, U16, U32, U64, U128, U256
+
+
+# The library's implementation, before tools/utils.py patches it
+ORIGINAL_PROCESS_ENCODE = FixedLengthArray.process_encode
+
+# Byte width of the fixed-width integer types which are packed in one go
+INT_WIDTHS = {U16: 2, U32: 4, U64: 8, U128: 16, U256: 32}
+STRUCT_FORMATS = {2: 'H', 4: 'I', 8: 'Q'}
+
+
+def element_class(self):
+    """
+    The decoder class of the elements, resolved once per array class. The
+    array classes are created per runtime, so an upgrade resolves them again.
+    """
+    cls = type(self)
+    cached = cls.__dict__.get('_element_class')
+    if cached is not None and cached[0] == self.sub_type:
+        return cached[1]
+    decoder_class = self.runtime_config.get_decoder_class(self.sub_type)
+    cls._element_class = (self.sub_type, decoder_class)
+    return decoder_class
+
+
+def encode_int_array(value, width):
+    """
+    Little endian packing of a whole list of unsigned integers. Raises
+    TypeError for elements int() doesn't take, e.g. encoded scale objects.
+    """
+    ints = [int(v) for v in value]
+    try:
+        if width in STRUCT_FORMATS:
+            return struct.pack(f'<{len(ints)}{STRUCT_FORMATS[width]}', *ints)
+        return b''.join(v.to_bytes(width, 'little') for v in ints)
+    except (struct.error, OverflowError):
+        bad = next(v for v in ints if not 0 <= v < 1 << (width * 8))
+        raise ValueError(f'{bad} out of range for u{width * 8}')
 
 
 def process_encode(self, value):  # noqa: C901
     data = ScaleBytes(bytearray())
 
     value = value or []
+    decoder_class = element_class(self)
 
-    if self.runtime_config.get_decoder_class(self.sub_type) is U8:
+    if decoder_class is U8:
         # u8 arrays are represented as bytes or hex-bytes (e.g. [u8; 3] as 0x123456)
         if type(value) is str and value[0:2] == '0x':
             value = bytes.fromhex(value[2:])
@@ -16,7 +56,7 @@ def process_encode(self, value):  # noqa: C901
             value = bytes(value)
 
         if type(value) is not bytes:
-            print(self.runtime_config.get_decoder_class(self.sub_type))
+            print(decoder_class)
             print(value)
             raise ValueError('Value should a hex-string (0x..) or bytes')
 
@@ -25,31 +65,29 @@ def process_encode(self, value):  # noqa: C901
 
         return ScaleBytes(value)
 
-    else:
-        if type(value) is str:
-            if value[0:2] != '0x':
-                raise ValueError('Give the value is not from 0x')
-            elif self.runtime_config.get_decoder_class(self.sub_type) is U16 and len(value[2:]) != self.element_count * 4:
-                raise ValueError('Value should be {} bytes long'.format(self.element_count))
-            elif self.runtime_config.get_decoder_class(self.sub_type) is U32 and len(value[2:]) != self.element_count * 8:
-                raise ValueError('Value should be {} bytes long'.format(self.element_count))
-            elif self.runtime_config.get_decoder_class(self.sub_type) is U64 and len(value[2:]) != self.element_count * 16:
-                raise ValueError('Value should be {} bytes long'.format(self.element_count))
-            elif self.runtime_config.get_decoder_class(self.sub_type) is U128 and len(value[2:]) != self.element_count * 32:
-                raise ValueError('Value should be {} bytes long'.format(self.element_count))
-            elif self.runtime_config.get_decoder_class(self.sub_type) is U256 and len(value[2:]) != self.element_count * 64:
-                raise ValueError('Value should be {} bytes long'.format(self.element_count))
-            else:
-                return ScaleBytes(value)
-
-        if not type(value) is list:
-            print(value)
-            raise ValueError('Given value is not a list')
+    width = INT_WIDTHS.get(decoder_class)
+    if type(value) is str:
+        if value[0:2] != '0x':
+            raise ValueError('Give the value is not from 0x')
+        elif width and len(value[2:]) != self.element_count * width * 2:
+            raise ValueError('Value should be {} bytes long'.format(self.element_count))
+        else:
+            return ScaleBytes(value)
+
+    if not type(value) is list:
+        print(value)
+        raise ValueError('Given value is not a list')
+
+    if width:
+        try:
+            return ScaleBytes(bytearray(encode_int_array(value, width)))
+        except TypeError:
+            pass
 
-        for element_value in value:
-            element_obj = self.runtime_config.create_scale_object(
-                type_string=self.sub_type, metadata=self.metadata
-            )
-            data += element_obj.encode(element_value)
+    for element_value in value:
+        element_obj = self.runtime_config.create_scale_object(
+            type_string=self.sub_type, metadata=self.metadata
+        )
+        data += element_obj.encode(element_value)
 
-        return data
+    return data
@@ -0,0 +1,60 @@
+import threading
+
+
+NONCE_ERROR_MESSAGES = [
+    'Transaction is outdated',
+    'Transaction will be valid in the future',
+    'Priority is too low',
+    'Stale',
+    'Future',
+    # Another extrinsic with the same nonce got in, see tools/payload.py
+    'is usurped',
+]
+
+
+class NonceFutureError(Exception):
+    pass
+
+
+def is_nonce_error(e):
+    return isinstance(e, NonceFutureError) or any(msg in str(e) for msg in NONCE_ERROR_MESSAGES)
+
+
+class NonceManager():
+    """
+    Hands out account nonces locally.
+
+    The nonce of an address is read from the chain once, afterwards every
+    call of next_nonce() returns the following one without an RPC, so many
+    extrinsics of one signer can be in the pool at the same time. When the
+    node answers with a stale/future nonce error the caller should resync().
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._nonces = {}
+
+    def next_nonce(self, substrate, addr):
+        key = (substrate.url, addr)
+        with self._lock:
+            if key not in self._nonces:
+                self._nonces[key] = substrate.get_account_nonce(addr)
+            nonce = self._nonces[key]
+            self._nonces[key] = nonce + 1
+            return nonce
+
+    def resync(self, substrate, addr):
+        key = (substrate.url, addr)
+        with self._lock:
+            self._nonces[key] = substrate.get_account_nonce(addr)
+            return self._nonces[key]
+
+    def reset(self, url=None):
+        with self._lock:
+            if url is None:
+                self._nonces = {}
+            else:
+                self._nonces = {k: v for k, v in self._nonces.items() if k[0] != url}
+
+
+NONCE_MANAGER = NonceManager()
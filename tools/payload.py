@@ -1,4 +1,23 @@
+import time
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
 from functools import wraps
+from substrateinterface.base import ExtrinsicReceipt
+from substrateinterface.exceptions import SubstrateRequestException
+from websocket import WebSocketTimeoutException
+from tools.nonce_manager import NONCE_MANAGER, NonceFutureError, is_nonce_error
+from tools.block_subscription import subscription_for
+from tools.connection_pool import get_substrate
+from tools.instrumentation import timed_phase
+
+
+# Extrinsics which aren't in a block after this many blocks are given up
+PIPELINE_MAX_BLOCKS = 64
+# Seconds a watched extrinsic may take to get into a block
+WATCH_TIMEOUT = 300
+
+_local = threading.local()
 
 
 def _show_extrinsic(receipt, info_type):
@@ -8,6 +27,380 @@ def _show_extrinsic(receipt, info_type):
         print(f'⚠️  {info_type}, Extrinsic Failed: {receipt.error_message} {receipt.get_extrinsic_identifier()}')
 
 
+def sudo_error(receipt):
+    """
+    The dispatch error of the call inside a Sudo.sudo extrinsic, None if it
+    succeeded. The extrinsic itself succeeds either way, the inner result is
+    only in the Sudid event.
+    """
+    for event in receipt.triggered_events:
+        event = event.value['event']
+        if event['module_id'] != 'Sudo' or event['event_id'] != 'Sudid':
+            continue
+        attributes = event['attributes']
+        result = attributes['sudo_result'] if type(attributes) is dict else attributes[0]
+        if type(result) is dict and 'Err' in result:
+            return result['Err']
+    return None
+
+
+class ExtrinsicHandle(Future):
+    """
+    Returned by the payload decorators inside `pipelined()`, right after the
+    node accepted the extrinsic into its pool. result() gives the
+    ExtrinsicReceipt once the extrinsic is in a block.
+    """
+
+    def __init__(self, substrate, extrinsic_hash, info_type=''):
+        super().__init__()
+        self.substrate = substrate
+        self.extrinsic_hash = extrinsic_hash
+        self.info_type = info_type
+        self.submit_block = None
+
+
+class ExtrinsicTracker():
+    """
+    Resolves the ExtrinsicHandles of one chain from its block subscription.
+    Only the hashes of the raw extrinsics are compared, nothing is decoded.
+    """
+
+    def __init__(self, subscription):
+        self._subscription = subscription
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._listening = False
+
+    def add(self, handle):
+        with self._lock:
+            self._pending[handle.extrinsic_hash] = handle
+            if self._listening:
+                return
+            self._listening = True
+        self._subscription.add_listener(self._on_block)
+
+    def discard(self, handle):
+        with self._lock:
+            self._pending.pop(handle.extrinsic_hash, None)
+
+    def _on_block(self, block):
+        with self._lock:
+            pending = dict(self._pending)
+        for extrinsic_hash in set(block.extrinsic_hashes) & set(pending):
+            handle = pending[extrinsic_hash]
+            self.discard(handle)
+            handle.set_result(ExtrinsicReceipt(
+                substrate=handle.substrate,
+                extrinsic_hash=extrinsic_hash,
+                block_hash=block.hash,
+                finalized=False
+            ))
+        for handle in pending.values():
+            if handle.submit_block is None:
+                handle.submit_block = block.number
+            elif block.number - handle.submit_block > PIPELINE_MAX_BLOCKS and not handle.done():
+                self.discard(handle)
+                handle.set_exception(TimeoutError(
+                    f'Extrinsic {handle.extrinsic_hash} not included after {PIPELINE_MAX_BLOCKS} blocks'))
+        with self._lock:
+            if self._pending:
+                return False
+            self._listening = False
+            return True
+
+
+_trackers = {}
+_trackers_lock = threading.Lock()
+
+
+def _get_tracker(substrate):
+    subscription = subscription_for(substrate)
+    with _trackers_lock:
+        if subscription not in _trackers:
+            _trackers[subscription] = ExtrinsicTracker(subscription)
+        return _trackers[subscription]
+
+
+class Pipeline():
+    def __init__(self):
+        self.handles = []
+
+    def wait(self, timeout=None):
+        """Waits for all the submitted extrinsics and returns their receipts"""
+        receipts = []
+        for handle in self.handles:
+            receipt = handle.result(timeout)
+            _show_extrinsic(receipt, handle.info_type)
+            receipts.append(receipt)
+        return receipts
+
+
+@contextmanager
+def pipelined():
+    """
+    Inside this context the payload decorators don't wait for the inclusion,
+    they return an ExtrinsicHandle as soon as the node accepted the extrinsic.
+
+    Example:
+        with pipelined() as pipe:
+            add_delegator(substrate, kp_delegator_1, collator, stake)
+            add_delegator(substrate, kp_delegator_2, collator, stake)
+        receipts = pipe.wait()
+    """
+    prev = getattr(_local, 'pipeline', None)
+    _local.pipeline = Pipeline()
+    try:
+        yield _local.pipeline
+    finally:
+        _local.pipeline = prev
+
+
+# The inclusion is waited for inside rpc_request, so it gets its own phase
+@timed_phase('submit_and_watch')
+def _submit_and_watch(substrate, extrinsic, wait_for_inclusion=True, timeout=WATCH_TIMEOUT):
+    extrinsic_hash = f'0x{extrinsic.extrinsic_hash.hex()}'
+    deadline = time.time() + timeout
+
+    def result_handler(message, update_nr, subscription_id):
+        if 'params' not in message:
+            return None
+        result = message['params']['result']
+        status = None
+        if type(result) is dict:
+            message_result = {k.lower(): v for k, v in result.items()}
+            if 'inblock' in message_result:
+                substrate.rpc_request('author_unwatchExtrinsic', [subscription_id])
+                return {'block_hash': message_result['inblock']}
+            # Replaced by another extrinsic with the same nonce, or never finalized
+            status = next((k for k in ['usurped', 'finalitytimeout'] if k in message_result), None)
+        elif result in ['future', 'dropped', 'invalid'] or (result == 'ready' and not wait_for_inclusion):
+            status = result
+        if status is None and time.time() > deadline:
+            status = 'timeout'
+        if status is None:
+            substrate.websocket.settimeout(max(deadline - time.time(), 0.1))
+            return None
+        substrate.rpc_request('author_unwatchExtrinsic', [subscription_id])
+        return {'status': status}
+
+    prev_timeout = substrate.websocket.gettimeout()
+    substrate.websocket.settimeout(timeout)
+    try:
+        response = substrate.rpc_request(
+            'author_submitAndWatchExtrinsic', [str(extrinsic.data)], result_handler=result_handler)
+    except WebSocketTimeoutException:
+        # The status updates of the dropped subscription can't be told apart any more
+        substrate.connect_websocket()
+        response = {'status': 'timeout'}
+    finally:
+        substrate.websocket.settimeout(prev_timeout)
+    return _watch_response_to_receipt(substrate, extrinsic_hash, response, timeout)
+
+
+def _watch_response_to_receipt(substrate, extrinsic_hash, response, timeout=WATCH_TIMEOUT):
+    if response.get('status') == 'timeout':
+        raise TimeoutError(f'Extrinsic {extrinsic_hash} not in a block after {timeout}s')
+    if response.get('status') == 'future':
+        try:
+            substrate.rpc_request('author_removeExtrinsic', [[{'hash': extrinsic_hash}]])
+        except SubstrateRequestException:
+            pass
+        raise NonceFutureError(f'Extrinsic {extrinsic_hash} is in the future queue')
+    if response.get('status') == 'ready':
+        return None
+    if 'status' in response:
+        raise SubstrateRequestException(f'Extrinsic {extrinsic_hash} is {response["status"]}')
+
+    return ExtrinsicReceipt(
+        substrate=substrate,
+        extrinsic_hash=extrinsic_hash,
+        block_hash=response['block_hash'],
+        finalized=False
+    )
+
+
+def track_extrinsic(substrate, extrinsic_hash, info_type=''):
+    """
+    Returns an ExtrinsicHandle which is resolved when the extrinsic is in a
+    block. Call it before submitting so the including block can't be missed.
+    """
+    handle = ExtrinsicHandle(substrate, extrinsic_hash, info_type)
+    _get_tracker(substrate).add(handle)
+    return handle
+
+
+def untrack_extrinsic(handle):
+    _get_tracker(handle.substrate).discard(handle)
+
+
+def submit_many(url, extrinsics, connections=4, **kwargs):
+    """
+    Submits signed extrinsics with author_submitExtrinsic over several pooled
+    connections without waiting for them. Returns an ExtrinsicHandle per
+    extrinsic, a rejected one has the node's error as its exception.
+    """
+    def submit_part(index):
+        substrate = get_substrate(url, **kwargs)
+        handles = []
+        for extrinsic in extrinsics[index::connections]:
+            handle = track_extrinsic(substrate, f'0x{extrinsic.extrinsic_hash.hex()}')
+            try:
+                substrate.rpc_request('author_submitExtrinsic', [str(extrinsic.data)])
+            except SubstrateRequestException as e:
+                untrack_extrinsic(handle)
+                handle.set_exception(e)
+            handles.append(handle)
+        return handles
+
+    with ThreadPoolExecutor(max_workers=connections) as executor:
+        return [h for handles in executor.map(submit_part, range(connections)) for h in handles]
+
+
+def _submit_async(substrate, extrinsic, info_type):
+    handle = track_extrinsic(substrate, f'0x{extrinsic.extrinsic_hash.hex()}', info_type)
+    try:
+        _submit_and_watch(substrate, extrinsic, wait_for_inclusion=False)
+    except Exception:
+        untrack_extrinsic(handle)
+        raise
+    return handle
+
+
+def sign_and_submit(substrate, keypair, call, era=None, info_type=''):
+    """
+    Signs the call with a nonce from the local nonce manager and waits for the
+    inclusion. On a stale/future nonce the nonce is resynced and the extrinsic
+    is sent once more. Inside `pipelined()` an ExtrinsicHandle is returned
+    without waiting for the inclusion.
+    """
+    pipeline = getattr(_local, 'pipeline', None)
+    for retry in range(2):
+        nonce = NONCE_MANAGER.next_nonce(substrate, keypair.ss58_address)
+        extrinsic = substrate.create_signed_extrinsic(
+            call=call,
+            keypair=keypair,
+            era=era,
+            nonce=nonce
+        )
+        try:
+            if pipeline is None:
+                return _submit_and_watch(substrate, extrinsic)
+            handle = _submit_async(substrate, extrinsic, info_type)
+            pipeline.handles.append(handle)
+            return handle
+        except (SubstrateRequestException, NonceFutureError) as e:
+            NONCE_MANAGER.resync(substrate, keypair.ss58_address)
+            if retry or not is_nonce_error(e):
+                raise
+
+
+class SudoBatch():
+    """
+    Collects the sudo calls of the decorated helpers and sends them as one
+    Sudo.sudo(Utility.batch_all(...)) extrinsic.
+    """
+
+    def __init__(self, substrate):
+        self.substrate = substrate
+        self.sudo_keypair = None
+        self.calls = []
+        self.names = []
+        self.futures = []
+        self.receipt = None
+
+    def add(self, sudo_keypair, call, info_type):
+        if self.sudo_keypair is None:
+            self.sudo_keypair = sudo_keypair
+        elif self.sudo_keypair.ss58_address != sudo_keypair.ss58_address:
+            raise ValueError(f'{info_type} uses another sudo key than the batched calls {self.names}')
+        self.calls.append(call.value['call_args']['call'])
+        self.names.append(info_type)
+        future = Future()
+        self.futures.append(future)
+        return future
+
+    def flush(self):
+        if not self.calls:
+            return None
+        batch_call = self.substrate.compose_call(
+            call_module='Utility',
+            call_function='batch_all',
+            call_params={
+                'calls': self.calls,
+            })
+        sudo_call = self.substrate.compose_call(
+            call_module='Sudo',
+            call_function='sudo',
+            call_params={
+                'call': batch_call.value,
+            })
+        info_type = f'batched[{", ".join(self.names)}]'
+        try:
+            self.receipt = sign_and_submit(self.substrate, self.sudo_keypair, sudo_call, info_type=info_type)
+        except Exception as e:
+            self.fail(e)
+            raise
+        _show_receipt(self.receipt, info_type)
+        if isinstance(self.receipt, ExtrinsicReceipt) and self.receipt.is_success and sudo_error(self.receipt):
+            print(f'⚠️  {info_type}, Sudo call failed: {sudo_error(self.receipt)}')
+        for future in self.futures:
+            future.set_result(self.receipt)
+        self.calls, self.names, self.futures = [], [], []
+        return self.receipt
+
+    def fail(self, error):
+        """Drops the collected calls, their futures raise `error`"""
+        for future in self.futures:
+            future.set_exception(error)
+        self.calls, self.names, self.futures = [], [], []
+
+
+def _active_batch(substrate):
+    return getattr(_local, 'batches', {}).get(id(substrate))
+
+
+def _is_sudo_call(call):
+    return call.value['call_module'] == 'Sudo' and call.value['call_function'] == 'sudo'
+
+
+@contextmanager
+def batched(substrate):
+    """
+    Inside this context the helpers decorated with sudo_extrinsic_send don't
+    send anything, their sudo calls are collected and flushed as a single
+    extrinsic when the context exits. The helpers return a Future which gives
+    the receipt of that extrinsic.
+
+    Example:
+        with batched(substrate) as batch:
+            set_max_currency_supply(substrate, supply)
+            setup_block_reward(substrate, reward)
+        assert batch.receipt.is_success
+    """
+    if not hasattr(_local, 'batches'):
+        _local.batches = {}
+    if id(substrate) in _local.batches:
+        yield _local.batches[id(substrate)]
+        return
+
+    batch = SudoBatch(substrate)
+    _local.batches[id(substrate)] = batch
+    try:
+        yield batch
+    except BaseException as e:
+        batch.fail(e)
+        raise
+    finally:
+        del _local.batches[id(substrate)]
+    batch.flush()
+
+
+def _show_receipt(receipt, info_type):
+    # Pipelined receipts are shown when the pipeline is waited for
+    if isinstance(receipt, ExtrinsicReceipt):
+        _show_extrinsic(receipt, info_type)
+
+
 def sudo_call_compose(sudo_keypair):
     def decorator(func):
         @wraps(func)
@@ -31,12 +424,11 @@ def sudo_extrinsic_send(sudo_keypair):
         def wrapper(*args, **kwargs):
             substrate = args[0]
             call = func(*args, **kwargs)
-            extrinsic = substrate.create_signed_extrinsic(
-                call=call,
-                keypair=sudo_keypair,
-            )
-            receipt = substrate.submit_extrinsic(extrinsic, wait_for_inclusion=True)
-            _show_extrinsic(receipt, func.__name__)
+            batch = _active_batch(substrate)
+            if batch is not None and _is_sudo_call(call):
+                return batch.add(sudo_keypair, call, func.__name__)
+            receipt = sign_and_submit(substrate, sudo_keypair, call, info_type=func.__name__)
+            _show_receipt(receipt, func.__name__)
             return receipt
         return wrapper
     return decorator
@@ -47,17 +439,10 @@ def user_extrinsic_send(func):
     def wrapper(*args, **kwargs):
         substrate = args[0]
         kp_src = args[1]
-        nonce = substrate.get_account_nonce(kp_src.ss58_address)
 
         call = func(*args, **kwargs)
 
-        extrinsic = substrate.create_signed_extrinsic(
-            call=call,
-            keypair=kp_src,
-            era={'period': 64},
-            nonce=nonce
-        )
-        receipt = substrate.submit_extrinsic(extrinsic, wait_for_inclusion=True)
-        _show_extrinsic(receipt, func.__name__)
+        receipt = sign_and_submit(substrate, kp_src, call, era={'period': 64}, info_type=func.__name__)
+        _show_receipt(receipt, func.__name__)
         return receipt
     return wrapper
@@ -2,7 +2,8 @@ import json
 import binascii
 import os
 from peaq.utils import ExtrinsicBatch
-from substrateinterface import Keypair, KeypairType
+from substrateinterface import KeypairType
+from tools.keypair_pool import new_keypair
 from substrateinterface.utils import hasher
 from peaq.eth import calculate_evm_account
 from web3 import Web3
@@ -93,8 +94,7 @@ def get_eth_chain_id(substrate):
 
 
 def get_eth_info():
-    mnemonic = Keypair.generate_mnemonic()
-    kp = Keypair.create_from_mnemonic(mnemonic, crypto_type=KeypairType.ECDSA)
+    kp = new_keypair(KeypairType.ECDSA)
     return {
         'kp': kp,
         'substrate': calculate_evm_account(kp.ss58_address),
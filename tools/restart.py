@@ -5,40 +5,178 @@ warnings.filterwarnings("ignore", "Valid config keys have changed in V2")
 import sys
 sys.path.append('.')
 
+import os
 import time
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from python_on_whales import docker, DockerClient
 from substrateinterface import SubstrateInterface
 from tools.utils import WS_URL
+from tools.nonce_manager import NONCE_MANAGER
+from tools.funding_service import FUNDING_SERVICE
+from tools.instrumentation import timed_phase
 from websocket import WebSocketConnectionClosedException
 
 
-def restart_parachain_launch():
+# Set PARACHAIN_SNAPSHOT=0 to always rebuild the chain from genesis
+SNAPSHOT_ENABLED = os.environ.get('PARACHAIN_SNAPSHOT', '1') != '0'
+# GNU cp is needed for --reflink, it falls back to a plain copy when the
+# docker volume directory isn't on a reflink capable filesystem (btrfs, xfs)
+SNAPSHOT_COPY_IMAGE = os.environ.get('PARACHAIN_SNAPSHOT_COPY_IMAGE', 'debian:bookworm-slim')
+SNAPSHOT_LABEL = 'peaq-bc-test.snapshot'
+# Selects one of several running stacks, e.g. a shard of tools/shard_runner.py
+PARACHAIN_LAUNCH_PROJECT = os.environ.get('PARACHAIN_LAUNCH_PROJECT')
+
+
+def _get_parachain_launch_compose():
     projects = docker.compose.ls()
-    project = [p for p in projects if 'parachain-launch' in str(p.config_files[0])]
+    if PARACHAIN_LAUNCH_PROJECT:
+        project = [p for p in projects if p.name == PARACHAIN_LAUNCH_PROJECT]
+    else:
+        project = [p for p in projects if 'parachain-launch' in str(p.config_files[0])]
     if len(project) == 0 or len(project) > 1:
         raise IOError(f'Found {len(project)} parachain-launch projects, {project}')
+    return project[0]
 
-    compose_file = str(project[0].config_files[0])
-    my_docker = DockerClient(compose_files=[compose_file])
 
-    my_docker.compose.down(volumes=True)
-    my_docker.compose.up(detach=True, build=True)
+def _get_compose_client(project):
+    return DockerClient(compose_files=[str(project.config_files[0])], compose_project_name=project.name)
+
+
+def wait_for_parachain(url=WS_URL, wait_time=60):
     count_down = 0
-    wait_time = 60
     while count_down < wait_time:
         try:
             SubstrateInterface(
-                url=WS_URL,
+                url=url,
             )
             return
-        except (ConnectionResetError, WebSocketConnectionClosedException) as e:
-            print(f'Cannot connect to {WS_URL}, {e}')
+        except (ConnectionResetError, ConnectionRefusedError, WebSocketConnectionClosedException) as e:
+            print(f'Cannot connect to {url}, {e}')
             count_down += 5
             time.sleep(5)
             continue
         except Exception:
-            raise IOError(f'Cannot connect to {WS_URL}')
-    raise IOError(f'Cannot connect to {WS_URL} after {wait_time} seconds')
+            raise IOError(f'Cannot connect to {url}')
+    raise IOError(f'Cannot connect to {url} after {wait_time} seconds')
+
+
+@timed_phase('docker_restart')
+def restart_parachain_launch():
+    project = _get_parachain_launch_compose()
+
+    my_docker = _get_compose_client(project)
+
+    my_docker.compose.down(volumes=True)
+    my_docker.compose.up(detach=True, build=True)
+    # The chain starts from genesis again
+    NONCE_MANAGER.reset()
+    FUNDING_SERVICE.invalidate()
+    wait_for_parachain()
+
+
+def _get_project_volumes(project):
+    return docker.volume.list(filters={'label': f'com.docker.compose.project={project.name}'})
+
+
+def _snapshot_volume_name(volume_name, tag):
+    return f'{volume_name}-snapshot-{tag}'
+
+
+def _copy_volume(src, dst):
+    docker.run(
+        SNAPSHOT_COPY_IMAGE,
+        ['sh', '-c', 'find /to -mindepth 1 -delete && cp -a --reflink=auto /from/. /to/'],
+        volumes=[(src, '/from', 'ro'), (dst, '/to')],
+        remove=True)
+
+
+def _copy_volumes(my_docker, pairs):
+    my_docker.compose.stop()
+    try:
+        with ThreadPoolExecutor(max_workers=max(len(pairs), 1)) as executor:
+            list(executor.map(lambda pair: _copy_volume(*pair), pairs))
+    finally:
+        my_docker.compose.start()
+
+
+def parachain_snapshot_tag(extra=''):
+    """
+    The snapshot is only valid for the same compose file, the same images of
+    the running containers and the same `extra` (e.g. the runtime the chain
+    was upgraded to).
+    """
+    project = _get_parachain_launch_compose()
+    with open(project.config_files[0], 'rb') as f:
+        digest = hashlib.sha256(f.read())
+    my_docker = _get_compose_client(project)
+    for image in sorted(c.image for c in my_docker.compose.ps()):
+        digest.update(image.encode())
+    digest.update(extra.encode())
+    return digest.hexdigest()[:16]
+
+
+def has_parachain_snapshot(tag):
+    project = _get_parachain_launch_compose()
+    volumes = _get_project_volumes(project)
+    return len(volumes) > 0 and all(
+        docker.volume.exists(_snapshot_volume_name(v.name, tag)) for v in volumes)
+
+
+@timed_phase('docker_restart')
+def take_parachain_snapshot(tag):
+    """
+    Copies the data volumes of the running parachain-launch stack; the nodes
+    are stopped while copying so the databases are consistent.
+    """
+    project = _get_parachain_launch_compose()
+    volumes = _get_project_volumes(project)
+    if not volumes:
+        print(f'No volumes in {project.name}, cannot take a snapshot')
+        return False
+
+    my_docker = _get_compose_client(project)
+    pairs = []
+    for volume in volumes:
+        snapshot_name = _snapshot_volume_name(volume.name, tag)
+        if not docker.volume.exists(snapshot_name):
+            docker.volume.create(snapshot_name, labels={SNAPSHOT_LABEL: tag})
+        pairs.append((volume.name, snapshot_name))
+    _copy_volumes(my_docker, pairs)
+    wait_for_parachain()
+    print(f'Take parachain snapshot {tag} of {len(pairs)} volumes')
+    return True
+
+
+@timed_phase('docker_restart')
+def restore_parachain_snapshot(tag):
+    """
+    Resets the data volumes to the snapshot and starts the same containers
+    again. Returns False if there's no snapshot for the tag.
+    """
+    if not has_parachain_snapshot(tag):
+        return False
+
+    project = _get_parachain_launch_compose()
+    my_docker = _get_compose_client(project)
+    pairs = [
+        (_snapshot_volume_name(volume.name, tag), volume.name)
+        for volume in _get_project_volumes(project)
+    ]
+    _copy_volumes(my_docker, pairs)
+    # The chain goes back to the snapshot block
+    NONCE_MANAGER.reset()
+    FUNDING_SERVICE.invalidate()
+    wait_for_parachain()
+    print(f'Restore parachain snapshot {tag}')
+    return True
+
+
+def remove_parachain_snapshots():
+    volumes = docker.volume.list(filters={'label': SNAPSHOT_LABEL})
+    if volumes:
+        docker.volume.remove(volumes)
+    return len(volumes)
 
 
 if __name__ == '__main__':
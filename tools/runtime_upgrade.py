@@ -3,8 +3,9 @@ sys.path.append('./')
 import os
 import time
 
-from substrateinterface import SubstrateInterface
 from tools.utils import WS_URL, KP_GLOBAL_SUDO, RELAYCHAIN_WS_URL
+from tools.connection_pool import get_substrate
+from tools.metadata_cache import invalidate_metadata_cache
 from peaq.sudo_extrinsic import funds
 from peaq.utils import show_extrinsic, get_block_height
 from substrateinterface.utils.hasher import blake2_256
@@ -43,7 +44,7 @@ def wait_until_block_height(substrate, block_height):
 
 
 def wait_relay_upgrade_block(url=RELAYCHAIN_WS_URL):
-    relay_substrate = SubstrateInterface(url, type_registry_preset='rococo')
+    relay_substrate = get_substrate(url, type_registry_preset='rococo')
     result = relay_substrate.query(
         'Paras',
         'UpcomingUpgrades',
@@ -57,7 +58,7 @@ def wait_relay_upgrade_block(url=RELAYCHAIN_WS_URL):
 
 
 def upgrade(runtime_path):
-    substrate = SubstrateInterface(url=WS_URL)
+    substrate = get_substrate(WS_URL)
     wait_for_n_blocks(substrate, 1)
 
     print(f'Global Sudo: {KP_GLOBAL_SUDO.ss58_address}')
@@ -68,7 +69,7 @@ def upgrade(runtime_path):
 
 def fund_account():
     print('update the info')
-    substrate = SubstrateInterface(url=WS_URL)
+    substrate = get_substrate(WS_URL)
     funds(substrate, KP_GLOBAL_SUDO, [
         '5GrwvaEF5zXb26Fz9rcQpDWS57CtERHpNehXCPcNoHGKutQY',
         '5GNJqTPyNqANBkUVMN1LPPrxXnFouWXoe2wNSmmEoLctxiZY',
@@ -123,14 +124,20 @@ def do_runtime_upgrade(wasm_path):
     if not os.path.exists(wasm_path):
         raise IOError(f'Runtime not found: {wasm_path}')
 
-    substrate = SubstrateInterface(url=WS_URL)
+    substrate = get_substrate(WS_URL)
     # Remove the asset id 1: relay chain
     remove_asset_id(substrate)
 
+    before_hash = substrate.get_chain_head()
     upgrade(wasm_path)
     wait_for_n_blocks(substrate, 10)
+    # Drop the metadata of the replaced runtime
+    invalidate_metadata_cache(substrate.get_block_hash(0))
     fund_account()
     update_xcm_default_version(substrate)
+    after_hash = substrate.get_chain_head()
+    print(f'Check the migrations with: python3 tools/state_diff.py -r {WS_URL} -a {before_hash} -b {after_hash}')
+    return before_hash, after_hash
 
 
 def main():
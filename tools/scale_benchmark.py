@@ -0,0 +1,252 @@
+import sys
+sys.path.append('./')
+
+import os
+import glob
+import json
+import time
+import tracemalloc
+from scalecodec.base import ScaleBytes
+from scalecodec.types import FixedLengthArray
+from substrateinterface import SubstrateInterface
+from tools.metadata_cache import METADATA_CACHE_DIR
+from tools.monkey_patch_scale_info import ORIGINAL_PROCESS_ENCODE, process_encode
+from tools.asset import ACA_ASSET_LOCATION, RELAY_ASSET_ID, UNITS_PER_SECOND, XCM_VER
+from tools.utils import ACA_PD_CHAIN_ID, KP_GLOBAL_SUDO
+from tools.keyring import keypair_from_uri
+from tools.call_template import compose_call
+import argparse
+
+
+ENCODERS = {
+    'patched': process_encode,
+    'original': ORIGINAL_PROCESS_ENCODE,
+}
+DEFAULT_CODE_SIZE = 2 * 1024 * 1024
+DEFAULT_BATCH_SIZE = 100
+
+
+class OfflineSubstrate(SubstrateInterface):
+    """
+    A SubstrateInterface over a metadata file of tools/metadata_cache.py,
+    which never connects: the runtime is set up once from the file and the
+    genesis hash comes from its name (<genesis>-<spec>-<tx>.scale).
+    """
+
+    def __init__(self, metadata_path):
+        genesis_hash, spec_version, transaction_version = \
+            os.path.basename(metadata_path)[:-len('.scale')].rsplit('-', 2)
+        super().__init__(url=f'offline://{genesis_hash}', auto_discover=False)
+        self._genesis_hash = genesis_hash
+        self.runtime_version = int(spec_version)
+        self.transaction_version = int(transaction_version)
+
+        with open(metadata_path, 'rb') as f:
+            metadata = self.runtime_config.create_scale_object('MetadataVersioned', data=ScaleBytes(f.read()))
+        metadata.decode()
+        self.metadata = metadata
+        self.reload_type_registry(use_remote_preset=False, auto_discover=False)
+        self.runtime_config.add_portable_registry(metadata)
+        self.runtime_config.set_active_spec_version_id(self.runtime_version)
+        self.runtime_config.update_type_registry_types({'Weight': 'sp_weights::weight_v2::Weight'})
+        self.config['is_weight_v2'] = True
+        ss58_prefix = self.get_constant('System', 'SS58Prefix')
+        if ss58_prefix:
+            self.ss58_format = ss58_prefix.value
+
+    def init_runtime(self, block_hash=None, block_id=None):
+        pass
+
+    def get_block_hash(self, block_id=None):
+        return self._genesis_hash
+
+
+def latest_cached_metadata(cache_dir=METADATA_CACHE_DIR):
+    paths = glob.glob(os.path.join(cache_dir, '*.scale'))
+    if not paths:
+        raise IOError(f'No cached metadata in {cache_dir}, run any test against a node first')
+    return max(paths, key=os.path.getmtime)
+
+
+def _sudo(substrate, call):
+    return substrate.compose_call('Sudo', 'sudo', {'call': call.value})
+
+
+def shape_transfer(substrate, args):
+    return substrate.compose_call('Balances', 'transfer', {
+        'dest': keypair_from_uri('//Bob').ss58_address,
+        'value': 10 ** 18,
+    })
+
+
+def shape_register_location(substrate, args):
+    """The nested V3 MultiLocation of tools/asset.py"""
+    call = substrate.compose_call('XcAssetConfig', 'register_asset_location', {
+        'asset_location': ACA_ASSET_LOCATION['peaq'],
+        'asset_id': '3',
+    })
+    return _sudo(substrate, call)
+
+
+def shape_set_units_per_second(substrate, args):
+    call = substrate.compose_call('XcAssetConfig', 'set_asset_units_per_second', {
+        'asset_location': ACA_ASSET_LOCATION['peaq'],
+        'units_per_second': UNITS_PER_SECOND,
+    })
+    return _sudo(substrate, call)
+
+
+def shape_xtokens_transfer(substrate, args):
+    """xcm_transfer_test.send_token_from_peaq_to_para"""
+    return substrate.compose_call('XTokens', 'transfer', {
+        'currency_id': RELAY_ASSET_ID['peaq'],
+        'amount': str(10 * 10 ** 15),
+        'dest': {XCM_VER: {
+            'parents': '1',
+            'interior': {'X2': [
+                {'Parachain': f'{ACA_PD_CHAIN_ID}'},
+                {'AccountId32': (None, keypair_from_uri('//Bob').public_key)}
+            ]}
+        }},
+        'dest_weight_limit': 'Unlimited',
+    })
+
+
+def shape_batch_all(substrate, args):
+    calls = [
+        substrate.compose_call('Balances', 'force_set_balance', {
+            'who': keypair_from_uri(f'//Bob//{i}').ss58_address,
+            'new_free': 10 ** 18,
+            'new_reserved': 0,
+        })
+        for i in range(args.batch_size)
+    ]
+    call = substrate.compose_call('Utility', 'batch_all', {'calls': [c.value for c in calls]})
+    return _sudo(substrate, call)
+
+
+def shape_batch_all_template(substrate, args):
+    """shape_batch_all through tools/call_template.py"""
+    calls = [
+        compose_call(substrate, 'Balances', 'force_set_balance', {
+            'who': keypair_from_uri(f'//Bob//{i}').ss58_address,
+            'new_free': 10 ** 18,
+            'new_reserved': 0,
+        })
+        for i in range(args.batch_size)
+    ]
+    return compose_call(substrate, 'Sudo', 'sudo', {'call': compose_call(substrate, 'Utility', 'batch_all', {'calls': calls})})
+
+
+def shape_enact_upgrade(substrate, args):
+    return _sudo(substrate, substrate.compose_call(
+        'ParachainSystem', 'enact_authorized_upgrade', {'code': args.code}))
+
+
+SHAPES = {
+    'transfer': shape_transfer,
+    'register_location': shape_register_location,
+    'set_units_per_second': shape_set_units_per_second,
+    'xtokens_transfer': shape_xtokens_transfer,
+    'batch_all': shape_batch_all,
+    'batch_all_template': shape_batch_all_template,
+    'enact_upgrade': shape_enact_upgrade,
+}
+
+
+def measure(func, min_time, min_runs):
+    """ops/sec over at least min_time seconds and min_runs runs"""
+    runs = 0
+    start = time.perf_counter()
+    while True:
+        func()
+        runs += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time and runs >= min_runs:
+            return runs / elapsed
+
+
+def measure_allocations(func):
+    """Peak bytes allocated during one run and the blocks still allocated after it"""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    retained = sum(stat.count_diff for stat in after.compare_to(before, 'filename'))
+    return peak - base, retained
+
+
+def bench_shape(substrate, name, args):
+    func = SHAPES[name]
+    call = func(substrate, args)
+    extrinsic = substrate.create_signed_extrinsic(call=call, keypair=KP_GLOBAL_SUDO, nonce=0)
+    data = ScaleBytes(bytearray(extrinsic.data.data))
+
+    def decode():
+        obj = substrate.runtime_config.create_scale_object('Extrinsic', data=ScaleBytes(data.data), metadata=substrate.metadata)
+        obj.decode()
+
+    ops = {
+        'compose_call': lambda: func(substrate, args),
+        'create_signed_extrinsic': lambda: substrate.create_signed_extrinsic(call=call, keypair=KP_GLOBAL_SUDO, nonce=0),
+        'decode_extrinsic': decode,
+    }
+    result = {'encoded_bytes': len(data.data)}
+    for op_name, op in ops.items():
+        peak_bytes, retained_blocks = measure_allocations(op)
+        result[op_name] = {
+            'ops_per_sec': measure(op, args.min_time, args.min_runs),
+            'peak_alloc_bytes': peak_bytes,
+            'retained_blocks': retained_blocks,
+        }
+    return result
+
+
+def run(substrate, args):
+    results = {}
+    for encoder in args.encoders:
+        FixedLengthArray.process_encode = ENCODERS[encoder]
+        results[encoder] = {}
+        for name in args.shapes:
+            results[encoder][name] = bench_shape(substrate, name, args)
+            compose = results[encoder][name]['compose_call']
+            signed = results[encoder][name]['create_signed_extrinsic']
+            print(f'{encoder:8} {name:22} compose {compose["ops_per_sec"]:10.1f} ops/s '
+                  f'{compose["peak_alloc_bytes"]:>12} B peak, '
+                  f'signed {signed["ops_per_sec"]:10.1f} ops/s {signed["peak_alloc_bytes"]:>12} B peak')
+    FixedLengthArray.process_encode = process_encode
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline SCALE encode/decode benchmark of the peaq call shapes')
+    parser.add_argument('--metadata', type=str, default=None, help='Metadata file, the latest cached one by default')
+    parser.add_argument('--shapes', type=str, nargs='*', default=list(SHAPES), choices=list(SHAPES))
+    parser.add_argument('--encoders', type=str, nargs='*', default=['patched', 'original'], choices=list(ENCODERS),
+                        help='FixedLengthArray.process_encode implementations to compare')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='Calls in the batch_all shape')
+    parser.add_argument('--code-size', type=int, default=DEFAULT_CODE_SIZE, help='Code bytes in the enact_upgrade shape')
+    parser.add_argument('--min-time', type=float, default=1.0, help='Seconds per measurement')
+    parser.add_argument('--min-runs', type=int, default=3, help='Runs per measurement')
+    parser.add_argument('--out', type=str, default=None, help='Write the results as JSON')
+
+    args = parser.parse_args()
+    args.code = os.urandom(args.code_size)
+    metadata_path = args.metadata or latest_cached_metadata()
+    print(f'Metadata: {metadata_path}')
+
+    substrate = OfflineSubstrate(metadata_path)
+    results = run(substrate, args)
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump({'metadata': os.path.basename(metadata_path), 'results': results}, f, indent=4)
+
+
+if __name__ == '__main__':
+    main()
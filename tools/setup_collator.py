@@ -2,7 +2,9 @@ import sys
 sys.path.append('./')
 
 
-from substrateinterface import SubstrateInterface, Keypair
+from substrateinterface import SubstrateInterface
+from tools.keypair_pool import new_keypair
+from tools.connection_pool import get_substrate
 from peaq.utils import ExtrinsicBatch
 from peaq.sudo_extrinsic import funds
 from tools.utils import PARACHAIN_WS_URL, KP_GLOBAL_SUDO
@@ -49,9 +51,7 @@ def setup_collator(ws_port, rpc_port, kp):
 
 
 def fund_addrs(kps):
-    substrate = SubstrateInterface(
-        url=PARACHAIN_WS_URL,
-    )
+    substrate = get_substrate(PARACHAIN_WS_URL)
     receipt = funds(substrate, KP_GLOBAL_SUDO, [kp.ss58_address for kp in kps], 60000 * 10 ** 18, 0)
     print(f'funds receipt: {receipt}')
 
@@ -59,15 +59,13 @@ def fund_addrs(kps):
 if __name__ == '__main__':
     entries = [(WS_PORT_START + i,
                 RPC_PORT_START + i,
-                Keypair.create_from_mnemonic(Keypair.generate_mnemonic())) for i in range(0, NUMBER)]
+                new_keypair()) for i in range(0, NUMBER)]
     fund_addrs([entry[2] for entry in entries])
     for ws_port, rpc_port, kp in entries:
         setup_collator(ws_port, rpc_port, kp)
 
     print('setup actions')
-    substrate = SubstrateInterface(
-        url=PARACHAIN_WS_URL,
-    )
+    substrate = get_substrate(PARACHAIN_WS_URL)
     batch = ExtrinsicBatch(substrate, KP_GLOBAL_SUDO)
     batch.compose_sudo_call(
         'ParachainStaking',
@@ -1,14 +1,22 @@
 import sys
 sys.path.append('./')
-import time
 
+from concurrent.futures import ProcessPoolExecutor, wait
 from substrateinterface import SubstrateInterface, Keypair
+from tools.keypair_pool import new_keypairs
+from tools.connection_pool import get_substrate
+from tools.block_cache import BLOCK_CACHE
+from tools.block_wait import wait_for_blocks
+from tools.payload import submit_many
 from peaq.sudo_extrinsic import funds
 from tools.utils import KP_GLOBAL_SUDO, get_collators
 import argparse
+from tools.keyring import keypair_from_uri
 
+SIGN_CHUNK_SIZE = 100
 
-KP_COLLATOR = Keypair.create_from_uri('//Dave')
+
+KP_COLLATOR = keypair_from_uri('//Dave')
 
 
 def fund_delegators(substrate: SubstrateInterface, delegators: list, amount: int, batch_num: int = 250):
@@ -18,7 +26,7 @@ def fund_delegators(substrate: SubstrateInterface, delegators: list, amount: int
 
 
 def generate_delegators(number: int):
-    return [Keypair.create_from_mnemonic(Keypair.generate_mnemonic()) for _ in range(number)]
+    return new_keypairs(number)
 
 
 def get_default_collators_info(substrate: SubstrateInterface):
@@ -27,35 +35,107 @@ def get_default_collators_info(substrate: SubstrateInterface):
 
 
 def delegate_delegators(substrate: SubstrateInterface, delegators: list, collator_addr: str, collator_stake: int):
+    # Every delegator sends the same call
+    call = substrate.compose_call(
+        call_module='ParachainStaking',
+        call_function='join_delegators',
+        call_params={
+            'collator': collator_addr,
+            'amount': collator_stake
+        }
+    )
+    print(call)
     for i, kp in enumerate(delegators):
         print(f'run: {i}/{len(delegators)}')
-        call = substrate.compose_call(
-            call_module='ParachainStaking',
-            call_function='join_delegators',
-            call_params={
-                'collator': collator_addr,
-                'amount': collator_stake
-            }
-        )
-        print(call)
         extrinsic = substrate.create_signed_extrinsic(call, keypair=kp)
         receipt = substrate.submit_extrinsic(extrinsic, wait_for_inclusion=False)
         print(f'run: {i}/{len(delegators)}: {receipt.extrinsic_hash}')
 
 
+def _sign_chunk(payload, keys):
+    # Runs in a worker process, the keypairs are sent as raw key material
+    return [
+        Keypair(public_key=public_key, private_key=private_key, ss58_format=42, crypto_type=crypto_type).sign(payload)
+        for public_key, private_key, crypto_type in keys
+    ]
+
+
+def sign_in_parallel(substrate, call, keypairs, nonce=0, workers=None):
+    """
+    The signature payload is the same for every signer with the same nonce,
+    so it's generated once and only the signing runs in the process pool
+    """
+    payload = substrate.generate_signature_payload(call=call, nonce=nonce).data
+    keys = [(kp.public_key, kp.private_key, kp.crypto_type) for kp in keypairs]
+    chunks = [keys[i:i + SIGN_CHUNK_SIZE] for i in range(0, len(keys), SIGN_CHUNK_SIZE)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        signatures = [
+            sig for sigs in executor.map(_sign_chunk, [payload] * len(chunks), chunks) for sig in sigs
+        ]
+    return [
+        substrate.create_signed_extrinsic(call=call, keypair=kp, nonce=nonce, signature=signature)
+        for kp, signature in zip(keypairs, signatures)
+    ]
+
+
+def count_landed_delegators(substrate, handles, delegators):
+    """Counts the delegators with a ParachainStaking.Delegation event in the including blocks"""
+    addrs = {kp.ss58_address for kp in delegators}
+    block_hashes = {h.result().block_hash for h in handles if not h.exception()}
+    landed = set()
+    for block_hash in block_hashes:
+        for event in BLOCK_CACHE.get_events(substrate, block_hash):
+            if event['module_id'] != 'ParachainStaking' or event['event_id'] != 'Delegation':
+                continue
+            landed |= addrs & {str(attr) for attr in event['attributes']}
+    return len(landed)
+
+
+def delegate_delegators_parallel(substrate: SubstrateInterface, delegators: list, collator_addr: str, collator_stake: int,
+                                 connections: int = 4):
+    """
+    Composes the join_delegators call once, signs it for every (fresh) delegator
+    in a process pool and submits over several connections. Returns the number
+    of delegators which landed.
+    """
+    call = substrate.compose_call(
+        call_module='ParachainStaking',
+        call_function='join_delegators',
+        call_params={
+            'collator': collator_addr,
+            'amount': collator_stake
+        }
+    )
+    extrinsics = sign_in_parallel(substrate, call, delegators)
+    print(f'Signed {len(extrinsics)} join_delegators')
+    handles = submit_many(substrate.url, extrinsics, connections)
+    wait(handles)
+    rejected = [h for h in handles if h.exception()]
+    for handle in rejected[:10]:
+        print(f'⚠️  {handle.extrinsic_hash}: {handle.exception()}')
+    landed = count_landed_delegators(substrate, handles, delegators)
+    print(f'{landed}/{len(delegators)} delegators landed, {len(rejected)} extrinsics rejected or dropped')
+    return landed
+
+
 def main():
     parser = argparse.ArgumentParser(description='Setup the delegator')
     parser.add_argument('--number', type=int, required=True, help='Number of delegators you want to setup')
     parser.add_argument('--url', type=str, required=True, help='websocket URL')
+    parser.add_argument('--parallel', action='store_true', help='Sign in a process pool and submit concurrently')
+    parser.add_argument('--connections', type=int, default=4, help='Number of submitting connections')
 
     args = parser.parse_args()
-    substrate = SubstrateInterface(url=args.url)
+    substrate = get_substrate(args.url)
 
     kps = generate_delegators(args.number)
     collator_addr, collator_stake = get_default_collators_info(substrate)
     fund_delegators(substrate, kps, 1 * 10 ** 18)
-    time.sleep(12)
-    delegate_delegators(substrate, kps, collator_addr, collator_stake)
+    wait_for_blocks(substrate, 1)
+    if args.parallel:
+        delegate_delegators_parallel(substrate, kps, collator_addr, collator_stake, args.connections)
+    else:
+        delegate_delegators(substrate, kps, collator_addr, collator_stake)
 
 
 if __name__ == '__main__':
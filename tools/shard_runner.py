@@ -0,0 +1,150 @@
+import warnings
+# Ignore warnings about config keys changing in V2 from the python_on_whales
+warnings.filterwarnings("ignore", "Valid config keys have changed in V2")
+
+import sys
+sys.path.append('./')
+
+import os
+import glob
+import json
+import argparse
+import subprocess
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from python_on_whales import DockerClient
+from tools.restart import wait_for_parachain
+
+
+# The urls of one parachain-launch stack, every shard shifts the ports by
+# shard * port step
+BASE_URLS = {
+    'RELAYCHAIN_WS_URL': 'ws://127.0.0.1:9944',
+    'STANDALONE_WS_URL': 'ws://127.0.0.1:9944',
+    'PARACHAIN_WS_URL': 'ws://127.0.0.1:10044',
+    'ACA_WS_URL': 'ws://127.0.0.1:10144',
+    'RELAYCHAIN_ETH_URL': 'http://127.0.0.1:9933',
+    'PARACHAIN_ETH_URL': 'http://127.0.0.1:10044',
+    'ACA_ETH_URL': 'http://127.0.0.1:10144',
+}
+DEFAULT_PORT_STEP = 1000
+SHARD_PROJECT_PREFIX = 'parachain-launch-shard'
+
+
+def shift_url(url, offset):
+    parsed = urlparse(url)
+    return parsed._replace(netloc=f'{parsed.hostname}:{parsed.port + offset}').geturl()
+
+
+def shard_env(shard, port_step):
+    env = dict(os.environ)
+    env.update({k: shift_url(v, shard * port_step) for k, v in BASE_URLS.items()})
+    env['PARACHAIN_LAUNCH_PROJECT'] = f'{SHARD_PROJECT_PREFIX}{shard}'
+    return env
+
+
+def _shift_ports(ports, offset):
+    shifted = []
+    for port in ports:
+        port = dict(port)
+        if port.get('published'):
+            port['published'] = str(int(port['published']) + offset)
+        shifted.append(port)
+    return shifted
+
+
+def write_shard_compose(compose_file, shard, port_step):
+    """
+    Writes the resolved compose file of one shard next to the original one,
+    with the published ports shifted and without fixed names, so the volumes
+    and the network belong to the shard's compose project.
+    """
+    config = DockerClient(compose_files=[compose_file]).compose.config(return_json=True)
+    config.pop('name', None)
+    for service in config['services'].values():
+        service.pop('container_name', None)
+        if 'ports' in service:
+            service['ports'] = _shift_ports(service['ports'], shard * port_step)
+    for section in ['volumes', 'networks']:
+        for value in (config.get(section) or {}).values():
+            if isinstance(value, dict):
+                value.pop('name', None)
+
+    path = os.path.join(os.path.dirname(os.path.abspath(compose_file)), f'docker-compose.{SHARD_PROJECT_PREFIX}{shard}.json')
+    with open(path, 'w') as f:
+        json.dump(config, f, indent=2)
+    return path
+
+
+def start_shard(compose_file, shard, port_step, wait_time):
+    shard_file = write_shard_compose(compose_file, shard, port_step)
+    my_docker = DockerClient(compose_files=[shard_file], compose_project_name=f'{SHARD_PROJECT_PREFIX}{shard}')
+    my_docker.compose.down(volumes=True)
+    try:
+        my_docker.compose.up(detach=True, build=True)
+        wait_for_parachain(shard_env(shard, port_step)['PARACHAIN_WS_URL'], wait_time)
+    except Exception:
+        my_docker.compose.down(volumes=True)
+        raise
+    return my_docker
+
+
+def split_tests(test_files, shards):
+    """Round robin over the sorted files, so the same file always goes to the same shard"""
+    return [sorted(test_files)[i::shards] for i in range(shards)]
+
+
+def run_shard(shard, test_files, port_step, pytest_args, log_dir):
+    log_path = os.path.join(log_dir, f'shard{shard}.log')
+    print(f'Shard {shard}: {len(test_files)} test files, log in {log_path}')
+    with open(log_path, 'w') as log:
+        return subprocess.call(
+            [sys.executable, '-m', 'pytest'] + pytest_args + test_files,
+            env=shard_env(shard, port_step), stdout=log, stderr=subprocess.STDOUT)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the test modules on several parachain-launch stacks')
+    parser.add_argument('-c', '--compose-file', type=str, required=True, help='The parachain-launch docker-compose.yml')
+    parser.add_argument('-n', '--shards', type=int, default=os.cpu_count() // 4 or 1, help='Number of stacks')
+    parser.add_argument('--port-step', type=int, default=DEFAULT_PORT_STEP, help='Port distance between stacks')
+    parser.add_argument('--wait-time', type=int, default=300, help='Seconds to wait for a stack')
+    parser.add_argument('--log-dir', type=str, default='.', help='Where the shard logs are written')
+    parser.add_argument('--keep', action='store_true', help='Keep the stacks running afterwards')
+    parser.add_argument('tests', nargs='*', default=glob.glob('tests/*_test.py'), help='Test files')
+    parser.epilog = 'The arguments after -- are passed on to pytest'
+
+    # The pytest options can take values (-k expr), so they have to come after --
+    argv, pytest_args = sys.argv[1:], []
+    if '--' in argv:
+        argv, pytest_args = argv[:argv.index('--')], argv[argv.index('--') + 1:]
+    args = parser.parse_args(argv)
+
+    groups = [g for g in split_tests(args.tests, args.shards) if g]
+    stacks = []
+    try:
+        with ThreadPoolExecutor(max_workers=len(groups)) as executor:
+            futures = [
+                executor.submit(start_shard, args.compose_file, shard, args.port_step, args.wait_time)
+                for shard in range(len(groups))]
+            for future in as_completed(futures):
+                if future.exception() is None:
+                    stacks.append(future.result())
+            # Raises the first failed start, the stacks which came up are brought down below
+            for future in futures:
+                future.result()
+            codes = list(executor.map(
+                lambda shard: run_shard(shard, groups[shard], args.port_step, pytest_args, args.log_dir),
+                range(len(groups))))
+    finally:
+        if not args.keep:
+            for my_docker in stacks:
+                my_docker.compose.down(volumes=True)
+
+    for shard, code in enumerate(codes):
+        print(f'{"✅" if code == 0 else "⚠️ "} Shard {shard}: {groups[shard]}, exit code {code}')
+    sys.exit(max(codes))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,28 @@
+import sys
+sys.path.append('./')
+
+import os
+import json
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from substrateinterface import SubstrateInterface
+from substrateinterface.utils.hasher import xxh128
+from scalecodec.base import ScaleBytes
+from tools.connection_pool import get_substrate
+from tools.metadata_cache import attach_metadata_cache
 from peaq.utils import get_chain
 import argparse
 
 
-import pprint
-pp = pprint.PrettyPrinter(indent=4)
+# state_getKeysPaged doesn't return more than 1000 keys
+PAGE_SIZE = 1000
+DUMP_WORKERS = 8
+CONCAT_HASHER_LEN = {
+    'Blake2_128Concat': 16,
+    'Twox64Concat': 8,
+    'Identity': 0,
+}
 
 
 def query_storage(substrate, module, storage_function):
@@ -16,54 +34,201 @@ def query_storage(substrate, module, storage_function):
     return result.value
 
 
-def query_constant(substrate, module, storage_function):
+def query_constant(substrate, module, storage_function, block_hash=None):
     result = substrate.get_constant(
         module,
         storage_function,
+        block_hash=block_hash,
     )
 
     return result.value
 
 
-if __name__ == '__main__':
-    parser = argparse.ArgumentParser(description='Get storage and constants from a Substrate chain')
-    parser.add_argument('-r', '--runtime', type=str, required=True, help='Your runtime websocket endpoint')
+def storage_prefix(pallet_prefix, entry_name=None):
+    prefix = '0x' + xxh128(pallet_prefix.encode()).hex()
+    if entry_name is not None:
+        prefix += xxh128(entry_name.encode()).hex()
+    return prefix
 
-    args = parser.parse_args()
 
-    substrate = SubstrateInterface(
-        url=args.runtime,
-    )
-    metadata = substrate.get_metadata()
+def iter_storage_key_pages(substrate, prefix, block_hash, page_size=PAGE_SIZE):
+    start_key = None
+    while True:
+        keys = substrate.rpc_request('state_getKeysPaged', [prefix, page_size, start_key, block_hash])['result']
+        if keys:
+            yield keys
+        if len(keys) < page_size:
+            return
+        start_key = keys[-1]
+
+
+def query_storage_at(substrate, keys, block_hash):
+    response = substrate.rpc_request('state_queryStorageAt', [keys, block_hash])
+    return [item for group in response['result'] for item in group['changes']]
+
+
+def get_storage_entries(substrate, block_hash):
+    """
+    Returns {pallet name: (pallet storage prefix, {entry prefix: entry spec})},
+    the spec holds the type strings needed to decode keys and values.
+    """
+    substrate.init_runtime(block_hash=block_hash)
+    out = {}
+    for pallet in substrate.metadata.pallets:
+        if not pallet.storage:
+            continue
+        pallet_prefix = pallet.value['storage']['prefix']
+        entries = {}
+        for storage_function in pallet.storage:
+            name = storage_function.value['name']
+            entries[storage_prefix(pallet_prefix, name)] = {
+                'name': name,
+                'value_type': storage_function.get_value_type_string(),
+                'param_types': storage_function.get_params_type_string(),
+                'hashers': storage_function.get_param_hashers(),
+                'plain': 'Plain' in storage_function.value['type'],
+            }
+        out[pallet.name] = (pallet_prefix, entries)
+    return out
+
+
+def decode_storage_value(runtime_config, type_string, data):
+    obj = runtime_config.create_scale_object(type_string, data=ScaleBytes(data))
+    return obj.decode()
+
+
+def decode_storage_key(runtime_config, spec, key):
+    if spec['plain']:
+        return None
+    if any(hasher not in CONCAT_HASHER_LEN for hasher in spec['hashers']):
+        # The params can't be recovered from a hashed key
+        return key
+    type_strings = []
+    for hasher, param_type in zip(spec['hashers'], spec['param_types']):
+        type_strings.append(f'[u8; {CONCAT_HASHER_LEN[hasher]}]')
+        type_strings.append(param_type)
+    decoded = decode_storage_value(runtime_config, f"({', '.join(type_strings)})", '0x' + key[66:])
+    params = decoded[1::2]
+    return params[0] if len(params) == 1 else params
+
+
+class StorageDumper():
+    """
+    Streams the storage of a chain at one block into one JSONL file per
+    pallet. The keys of a pallet are paged with state_getKeysPaged, each page
+    of keys is read with one state_queryStorageAt and decoded by the worker
+    pool, with at most `workers * 2` pages in memory at any time.
+    """
+
+    def __init__(self, url, block_hash, workers=DUMP_WORKERS, decode=True, **kwargs):
+        self.url = url
+        self.block_hash = block_hash
+        self.workers = workers
+        self.decode = decode
+        self._kwargs = kwargs
+        self._local = threading.local()
+        self._conns = []
+        self._conns_lock = threading.Lock()
+
+    def _substrate(self):
+        # Every worker has its own connection with the runtime of the block
+        if not hasattr(self._local, 'substrate'):
+            substrate = SubstrateInterface(url=self.url, **self._kwargs)
+            attach_metadata_cache(substrate)
+            if self.decode:
+                substrate.init_runtime(block_hash=self.block_hash)
+            self._local.substrate = substrate
+            with self._conns_lock:
+                self._conns.append(substrate)
+        return self._local.substrate
+
+    def _fetch_page(self, entries, keys):
+        substrate = self._substrate()
+        lines = []
+        for key, value in query_storage_at(substrate, keys, self.block_hash):
+            spec = entries.get(key[:66])
+            line = {'entry': spec['name'] if spec else None, 'raw_key': key, 'raw_value': value}
+            if self.decode and spec and value is not None:
+                try:
+                    line['key'] = decode_storage_key(substrate.runtime_config, spec, key)
+                    line['value'] = decode_storage_value(substrate.runtime_config, spec['value_type'], value)
+                except Exception as e:
+                    line['error'] = str(e)
+            lines.append(json.dumps(line, default=str))
+        return lines
+
+    def dump_pallet(self, substrate, pallet_prefix, entries, out_path, executor):
+        count = 0
+        pending = deque()
+        with open(out_path, 'w') as f:
+            for keys in iter_storage_key_pages(substrate, storage_prefix(pallet_prefix), self.block_hash):
+                pending.append(executor.submit(self._fetch_page, entries, keys))
+                while len(pending) >= self.workers * 2:
+                    count += self._write(f, pending.popleft().result())
+            while pending:
+                count += self._write(f, pending.popleft().result())
+        return count
+
+    @staticmethod
+    def _write(f, lines):
+        for line in lines:
+            f.write(line + '\n')
+        return len(lines)
+
+    def dump(self, substrate, out_dir, pallets=None):
+        os.makedirs(out_dir, exist_ok=True)
+        storage_entries = get_storage_entries(substrate, self.block_hash)
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                for name, (pallet_prefix, entries) in storage_entries.items():
+                    if pallets and name not in pallets:
+                        continue
+                    count = self.dump_pallet(
+                        substrate, pallet_prefix, entries, os.path.join(out_dir, f'{name}.jsonl'), executor)
+                    print(f'{name}: {count} entries')
+        finally:
+            for conn in self._conns:
+                conn.close()
+
+
+def dump_chain_info(substrate, block_hash, out_path):
+    substrate.init_runtime(block_hash=block_hash)
     out = {
         'chain': {
             'name': get_chain(substrate),
             'version': substrate.runtime_version,
+            'block_hash': block_hash,
         },
         'constants': {},
-        'storage': {},
     }
-
-    for pallet in metadata.value[1]['V14']['pallets']:
-        if not pallet['storage']:
+    for pallet in substrate.metadata.pallets:
+        if not pallet.constants:
             continue
+        out['constants'][pallet.name] = {
+            constant.name: query_constant(substrate, pallet.name, constant.name, block_hash)
+            for constant in pallet.constants
+        }
+    with open(out_path, 'w') as f:
+        json.dump(out, f, indent=4, default=str)
+    return out
 
-        out['storage'][pallet['name']] = {}
-        # if pallet['name'] != 'ParachainStaking':
-        #     continue
-        for entry in pallet['storage']['entries']:
-            data = query_storage(substrate, pallet['name'], entry['name'])
-            out['storage'][pallet['name']][entry['name']] = data
 
-    for pallet in metadata.value[1]['V14']['pallets']:
-        if not pallet['constants']:
-            continue
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Dump the storage and constants of a Substrate chain')
+    parser.add_argument('-r', '--runtime', type=str, required=True, help='Your runtime websocket endpoint')
+    parser.add_argument('-b', '--block', type=str, default=None, help='Block hash, the finalized head by default')
+    parser.add_argument('-o', '--out', type=str, default=None, help='Output folder')
+    parser.add_argument('-p', '--pallets', type=str, nargs='*', default=None, help='Only dump these pallets')
+    parser.add_argument('-w', '--workers', type=int, default=DUMP_WORKERS, help='Number of workers')
+    parser.add_argument('--raw', action='store_true', help='Only dump the raw keys and values')
 
-        out['constants'][pallet['name']] = {}
-        # if pallet['name'] != 'ParachainStaking':
-        #     continue
-        for entry in pallet['constants']:
-            data = query_constant(substrate, pallet['name'], entry['name'])
-            out['constants'][pallet['name']][entry['name']] = data
+    args = parser.parse_args()
 
-    pp.pprint(out)
+    substrate = get_substrate(args.runtime)
+    block_hash = args.block or substrate.get_chain_finalised_head()
+    substrate.init_runtime(block_hash=block_hash)
+    out_dir = args.out or f'{get_chain(substrate)}.{substrate.runtime_version}'
+    os.makedirs(out_dir, exist_ok=True)
+    dump_chain_info(substrate, block_hash, os.path.join(out_dir, 'chain.json'))
+    StorageDumper(args.runtime, block_hash, args.workers, not args.raw).dump(substrate, out_dir, args.pallets)
+    print(f'Dump the storage at {block_hash} to {out_dir}')
@@ -0,0 +1,206 @@
+import sys
+sys.path.append('./')
+
+import json
+import heapq
+import argparse
+from collections import Counter
+from substrateinterface import SubstrateInterface
+from substrateinterface.exceptions import SubstrateRequestException
+from tools.connection_pool import get_substrate
+from tools.metadata_cache import attach_metadata_cache
+from tools.snapshot_info import PAGE_SIZE, storage_prefix, iter_storage_key_pages, query_storage_at
+from tools.snapshot_info import get_storage_entries, decode_storage_value, decode_storage_key
+
+
+def _iter_keys(substrate, prefix, block_hash):
+    for keys in iter_storage_key_pages(substrate, prefix, block_hash):
+        yield from keys
+
+
+def _iter_key_batches(substrate, prefix, before_hash, after_hash, batch_size=PAGE_SIZE):
+    """
+    Merges the sorted keys under the prefix at both blocks, yields batches of
+    (key, in before, in after)
+    """
+    before = ((k, 0) for k in _iter_keys(substrate, prefix, before_hash))
+    after = ((k, 1) for k in _iter_keys(substrate, prefix, after_hash))
+    batch = []
+    last = None
+    for key, side in heapq.merge(before, after):
+        if last is not None and last[0] == key:
+            last[2 if side else 1] = True
+            continue
+        if last is not None:
+            batch.append(tuple(last))
+        last = [key, side == 0, side == 1]
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if last is not None:
+        batch.append(tuple(last))
+    if batch:
+        yield batch
+
+
+class StateSide():
+    """The runtime (for decoding) and the values of one of the compared blocks"""
+
+    def __init__(self, url, block_hash, **kwargs):
+        self.block_hash = block_hash
+        self.substrate = SubstrateInterface(url=url, **kwargs)
+        attach_metadata_cache(self.substrate)
+        self.pallets = get_storage_entries(self.substrate, block_hash)
+        self.entries = {}
+        for _, entries in self.pallets.values():
+            self.entries.update(entries)
+
+    def values(self, keys):
+        if not keys:
+            return {}
+        return dict(query_storage_at(self.substrate, keys, self.block_hash))
+
+    def storage_hash(self, key):
+        return self.substrate.rpc_request('state_getStorageHash', [key, self.block_hash])['result']
+
+    def subtree_hash(self, prefix):
+        """
+        The merkle value of the trie node closest below the prefix (None for an
+        empty subtree), raises SubstrateRequestException on a node without
+        the archive rpc
+        """
+        response = self.substrate.rpc_request(
+            'archive_unstable_storage',
+            [self.block_hash, [{'key': prefix, 'type': 'closestDescendantMerkleValue'}], None])['result']
+        items = response['result'] if isinstance(response, dict) else response
+        for item in items:
+            if item['key'] == prefix:
+                return item.get('closestDescendantMerkleValue')
+        return None
+
+    def decode(self, key, value):
+        spec = self.entries.get(key[:66])
+        if spec is None or value is None:
+            return None, key, value
+        try:
+            return (spec['name'],
+                    decode_storage_key(self.substrate.runtime_config, spec, key),
+                    decode_storage_value(self.substrate.runtime_config, spec['value_type'], value))
+        except Exception:
+            return spec['name'], key, value
+
+    def close(self):
+        self.substrate.close()
+
+
+class StateDiff():
+    """
+    Compares the storage of two blocks pallet by pallet. A pallet whose
+    subtree merkle value is equal at both blocks is skipped without listing
+    its keys (when the node serves archive_unstable_storage). Otherwise the
+    keys of both sides are paged and merged in order, the value hash of every
+    key on both sides is compared, and the raw values are only fetched for
+    the added, removed and changed keys. Only those are decoded, each one
+    with the runtime of its own block, so a runtime upgrade can be diffed.
+    """
+
+    def __init__(self, url, before_hash, after_hash, **kwargs):
+        self.before = StateSide(url, before_hash, **kwargs)
+        self.after = StateSide(url, after_hash, **kwargs)
+        self.subtree_hashes = True
+
+    def same_subtree(self, prefix):
+        if not self.subtree_hashes:
+            return False
+        try:
+            return self.before.subtree_hash(prefix) == self.after.subtree_hash(prefix)
+        except SubstrateRequestException as e:
+            print(f'No subtree hashes ({e}), every pallet is compared key by key')
+            self.subtree_hashes = False
+            return False
+
+    def diff_batch(self, pallet, batch):
+        changed = {
+            key for key, in_before, in_after in batch
+            if not (in_before and in_after) or self.before.storage_hash(key) != self.after.storage_hash(key)
+        }
+        if not changed:
+            return
+        before_values = self.before.values([k for k, in_before, _ in batch if in_before and k in changed])
+        after_values = self.after.values([k for k, _, in_after in batch if in_after and k in changed])
+
+        for key, in_before, in_after in batch:
+            if key not in changed:
+                continue
+            before_value = before_values.get(key)
+            after_value = after_values.get(key)
+            if before_value == after_value:
+                continue
+            if before_value is None:
+                change = 'added'
+            elif after_value is None:
+                change = 'removed'
+            else:
+                change = 'changed'
+            entry, decoded_key, before_decoded = self.before.decode(key, before_value)
+            after_entry, after_key, after_decoded = self.after.decode(key, after_value)
+            yield {
+                'pallet': pallet,
+                'entry': entry or after_entry,
+                'change': change,
+                'key': decoded_key if before_value is not None else after_key,
+                'before': before_decoded if before_value is not None else None,
+                'after': after_decoded if after_value is not None else None,
+            }
+
+    def diff_pallet(self, pallet, pallet_prefix):
+        prefix = storage_prefix(pallet_prefix)
+        if self.same_subtree(prefix):
+            return
+        substrate = self.after.substrate
+        for batch in _iter_key_batches(substrate, prefix, self.before.block_hash, self.after.block_hash):
+            yield from self.diff_batch(pallet, batch)
+
+    def pallets(self):
+        # The pallets of both runtimes, so removed pallets show up too
+        pallets = {name: prefix for name, (prefix, _) in self.before.pallets.items()}
+        pallets.update({name: prefix for name, (prefix, _) in self.after.pallets.items()})
+        return pallets
+
+    def diff(self, out, pallets=None):
+        summary = {}
+        for name, pallet_prefix in self.pallets().items():
+            if pallets and name not in pallets:
+                continue
+            counter = Counter()
+            for change in self.diff_pallet(name, pallet_prefix):
+                counter[change['change']] += 1
+                out.write(json.dumps(change, default=str) + '\n')
+            if counter:
+                summary[name] = dict(counter)
+                print(f'{name}: {dict(counter)}')
+        return summary
+
+    def close(self):
+        self.before.close()
+        self.after.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Diff the storage of a Substrate chain at two blocks')
+    parser.add_argument('-r', '--runtime', type=str, required=True, help='Your runtime websocket endpoint')
+    parser.add_argument('-a', '--before', type=str, required=True, help='Block hash before')
+    parser.add_argument('-b', '--after', type=str, default=None, help='Block hash after, the finalized head by default')
+    parser.add_argument('-o', '--out', type=str, default='state_diff.jsonl', help='Output file')
+    parser.add_argument('-p', '--pallets', type=str, nargs='*', default=None, help='Only diff these pallets')
+
+    args = parser.parse_args()
+
+    after_hash = args.after or get_substrate(args.runtime).get_chain_finalised_head()
+    state_diff = StateDiff(args.runtime, args.before, after_hash)
+    try:
+        with open(args.out, 'w') as f:
+            state_diff.diff(f, args.pallets)
+    finally:
+        state_diff.close()
+    print(f'Diff between {args.before} and {after_hash} in {args.out}')
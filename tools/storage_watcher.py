@@ -0,0 +1,148 @@
+import threading
+
+from substrateinterface import SubstrateInterface
+from websocket import WebSocketException
+from tools.metadata_cache import attach_metadata_cache
+from tools.block_subscription import connection_kwargs
+
+
+class WatchedValue():
+    """The latest decoded value of one storage key of a StorageWatcher"""
+
+    def __init__(self, module, storage_function, params):
+        self.module = module
+        self.storage_function = storage_function
+        self.params = params
+        self._cond = threading.Condition()
+        self._initial = None
+        self._value = None
+        self._updates = 0
+        self._error = None
+
+    def _update(self, value, update_nr):
+        with self._cond:
+            if update_nr == 0 and self._updates == 0:
+                self._initial = value
+            self._value = value
+            self._updates += 1
+            self._cond.notify_all()
+
+    def _fail(self, error):
+        with self._cond:
+            self._error = error
+            self._cond.notify_all()
+
+    def _wait(self, predicate, timeout, what):
+        with self._cond:
+            done = self._cond.wait_for(lambda: self._error is not None or predicate(), timeout)
+            if self._error is not None:
+                raise self._error
+            if not done:
+                raise TimeoutError(f'{self.module}.{self.storage_function}{self.params}: no {what} after {timeout}s')
+
+    def initial(self, timeout=None):
+        """The value when the subscription started, raises TimeoutError if it didn't arrive"""
+        self._wait(lambda: self._updates > 0, timeout, 'initial value')
+        return self._initial
+
+    def value(self):
+        with self._cond:
+            return self._value
+
+    def wait_for(self, condition, timeout=None):
+        """
+        Returns the first value for which condition(value) is True, which can
+        be None for a removed key. Raises TimeoutError if there's none.
+        """
+        result = []
+
+        def check():
+            if self._updates and condition(self._value):
+                result.append(self._value)
+                return True
+            return False
+
+        self._wait(check, timeout, 'matching value')
+        return result[0]
+
+
+class StorageWatcher():
+    """
+    state_subscribeStorage on exact storage keys, over any number of chains.
+    Every chain gets its own connection and one subscription for all its
+    keys, so a change is seen in the block it happens instead of at the next
+    poll. The values are decoded with the runtime of the watched chain.
+
+    Example:
+        with StorageWatcher() as watcher:
+            dst = watcher.watch(si_peaq, 'Assets', 'Account', [asset_id, addr])
+            src = watcher.watch(si_relay, 'System', 'Account', [addr])
+            watcher.start()
+            ...
+            dst.wait_for(lambda v: v is not None, timeout=60)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._chains = {}
+        self._conns = []
+        self._stopped = False
+
+    def watch(self, substrate, module, storage_function, params):
+        """Keys added after start() are subscribed at the next start()"""
+        value = WatchedValue(module, storage_function, params)
+        key = (substrate.url, tuple(sorted((k, repr(v)) for k, v in connection_kwargs(substrate).items())))
+        with self._lock:
+            chain = self._chains.setdefault(key, {'url': substrate.url, 'kwargs': connection_kwargs(substrate), 'pending': []})
+            chain['pending'].append(value)
+        return value
+
+    def start(self):
+        with self._lock:
+            for chain in self._chains.values():
+                if not chain['pending']:
+                    continue
+                values, chain['pending'] = chain['pending'], []
+                threading.Thread(target=self._run, args=(chain['url'], chain['kwargs'], values), daemon=True).start()
+        return self
+
+    def stop(self):
+        self._stopped = True
+        with self._lock:
+            conns = list(self._conns)
+        # Closing the websocket ends the subscriptions which don't get any change
+        for substrate in conns:
+            try:
+                substrate.close()
+            except (WebSocketException, OSError):
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def _run(self, url, kwargs, values):
+        try:
+            substrate = SubstrateInterface(url=url, **kwargs)
+            attach_metadata_cache(substrate)
+            with self._lock:
+                self._conns.append(substrate)
+            if self._stopped:
+                substrate.close()
+                return
+            storage_keys = [substrate.create_storage_key(v.module, v.storage_function, v.params) for v in values]
+            by_key = {storage_key.to_hex(): value for storage_key, value in zip(storage_keys, values)}
+
+            def handler(storage_key, obj, update_nr, subscription_id):
+                by_key[storage_key.to_hex()]._update(obj.value, update_nr)
+                return True if self._stopped else None
+
+            substrate.subscribe_storage(storage_keys, handler)
+        except Exception as e:
+            if self._stopped:
+                return
+            print(f'Storage subscription on {url} failed, {e}')
+            for value in values:
+                value._fail(e)
@@ -0,0 +1,181 @@
+import sys
+sys.path.append('./')
+
+import json
+import time
+import threading
+import numpy as np
+from collections import Counter
+from substrateinterface.exceptions import SubstrateRequestException
+from concurrent.futures import ThreadPoolExecutor, wait
+from tools.connection_pool import get_substrate
+from tools.block_cache import BLOCK_CACHE
+from tools.payload import track_extrinsic, untrack_extrinsic
+from tools.setup_delegator import generate_delegators, fund_delegators
+from tools.utils import KP_GLOBAL_SUDO
+from peaq.utils import wait_for_n_blocks
+import argparse
+
+
+TRANSFER_VALUE = 10 ** 9
+SENDER_FUND = 10 ** 18
+
+
+def presign_transfers(substrate, senders, txs_per_sender, dest):
+    """
+    Signs everything up front, immortal and with explicit nonces, so no RPC
+    is needed while signing and the flood isn't slowed down by it
+    """
+    call = substrate.compose_call(
+        call_module='Balances',
+        call_function='transfer',
+        call_params={
+            'dest': dest,
+            'value': TRANSFER_VALUE,
+        })
+    return [
+        substrate.create_signed_extrinsic(call=call, keypair=kp, nonce=nonce)
+        for nonce in range(txs_per_sender)
+        for kp in senders
+    ]
+
+
+class Flood():
+    """
+    Submits the extrinsics with author_submitExtrinsic at `rate` per second,
+    spread over `submitters` connections. Every extrinsic is tracked from the
+    new heads, the submit and the inclusion time are kept for the latency.
+    """
+
+    def __init__(self, url, extrinsics, rate, submitters):
+        self.url = url
+        self.extrinsics = extrinsics
+        self.rate = rate
+        self.submitters = submitters
+        self.submit_times = {}
+        self.include_times = {}
+        self.rejected = Counter()
+        self._lock = threading.Lock()
+
+    def _on_included(self, handle):
+        # Also called for the rejected and the timed out handles
+        if handle.cancelled() or handle.exception() is not None:
+            return
+        with self._lock:
+            self.include_times[handle.extrinsic_hash] = time.time()
+
+    def _submit_loop(self, index, start):
+        substrate = get_substrate(self.url)
+        handles = []
+        for i in range(index, len(self.extrinsics), self.submitters):
+            delay = start + i / self.rate - time.time()
+            if delay > 0:
+                time.sleep(delay)
+            extrinsic = self.extrinsics[i]
+            handle = track_extrinsic(substrate, f'0x{extrinsic.extrinsic_hash.hex()}')
+            handle.add_done_callback(self._on_included)
+            with self._lock:
+                self.submit_times[handle.extrinsic_hash] = time.time()
+            try:
+                substrate.rpc_request('author_submitExtrinsic', [str(extrinsic.data)])
+            except SubstrateRequestException as e:
+                untrack_extrinsic(handle)
+                handle.cancel()
+                with self._lock:
+                    self.rejected[str(e)] += 1
+                continue
+            handles.append(handle)
+        return handles
+
+    def run(self):
+        start = time.time()
+        with ThreadPoolExecutor(max_workers=self.submitters) as executor:
+            results = executor.map(lambda i: self._submit_loop(i, start), range(self.submitters))
+            handles = [h for result in results for h in result]
+        print(f'Submitted {len(handles)} extrinsics in {time.time() - start:.2f}s')
+        wait(handles)
+        return handles
+
+
+def block_weight_usage(substrate, block_hash, max_ref_time):
+    weight = substrate.query('System', 'BlockWeight', block_hash=block_hash).value
+    return sum(weight[dispatch_class]['ref_time'] for dispatch_class in weight) / max_ref_time
+
+
+def report(substrate, flood, handles):
+    included = {}
+    for handle in handles:
+        if handle.cancelled() or handle.exception():
+            continue
+        block_hash = handle.result().block_hash
+        included.setdefault(block_hash, []).append(handle.extrinsic_hash)
+
+    max_ref_time = substrate.get_constant('System', 'BlockWeights').value['max_block']['ref_time']
+    blocks = []
+    for block_hash, hashes in included.items():
+        blocks.append({
+            'number': int(BLOCK_CACHE.get_header(substrate, block_hash)['number'], 16),
+            'hash': block_hash,
+            'included': len(hashes),
+            'weight_usage': block_weight_usage(substrate, block_hash, max_ref_time),
+        })
+    blocks.sort(key=lambda b: b['number'])
+
+    out = {
+        'spec_version': substrate.runtime_version,
+        'submitted': len(flood.submit_times),
+        'rejected': dict(flood.rejected),
+        'included': sum(b['included'] for b in blocks),
+        'blocks': blocks,
+    }
+    if blocks:
+        first_parent = substrate.get_block_hash(blocks[0]['number'] - 1)
+        duration = (BLOCK_CACHE.get_timestamp(substrate, blocks[-1]['hash']) -
+                    BLOCK_CACHE.get_timestamp(substrate, first_parent)) / 1000.
+        latencies = np.array([
+            flood.include_times[h] - flood.submit_times[h]
+            for h in flood.include_times if h in flood.submit_times])
+        out.update({
+            'tps': out['included'] / duration,
+            'max_included_per_block': max(b['included'] for b in blocks),
+            'latency': {
+                'p50': float(np.percentile(latencies, 50)),
+                'p95': float(np.percentile(latencies, 95)),
+                'p99': float(np.percentile(latencies, 99)),
+                'max': float(np.max(latencies)),
+            },
+        })
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure the balance transfer throughput')
+    parser.add_argument('--url', type=str, required=True, help='websocket URL')
+    parser.add_argument('--senders', type=int, default=100, help='Number of senders')
+    parser.add_argument('--txs', type=int, default=10, help='Transfers per sender')
+    parser.add_argument('--rate', type=float, default=200, help='Submitted extrinsics per second')
+    parser.add_argument('--submitters', type=int, default=4, help='Number of submitting connections')
+    parser.add_argument('--out', type=str, default=None, help='Write the report as JSON')
+
+    args = parser.parse_args()
+    substrate = get_substrate(args.url)
+
+    senders = generate_delegators(args.senders)
+    fund_delegators(substrate, senders, SENDER_FUND)
+    wait_for_n_blocks(substrate, 1)
+
+    extrinsics = presign_transfers(substrate, senders, args.txs, KP_GLOBAL_SUDO.ss58_address)
+    flood = Flood(args.url, extrinsics, args.rate, args.submitters)
+    handles = flood.run()
+
+    result = report(substrate, flood, handles)
+    for block in result['blocks']:
+        print(f'Block {block["number"]}: {block["included"]} transfers, {block["weight_usage"] * 100:.1f}% weight')
+    print(json.dumps({k: v for k, v in result.items() if k != 'blocks'}, indent=4))
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(result, f, indent=4)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,12 +1,10 @@
 import os
 import sys
-import time
 sys.path.append('.')
 
 from peaq import utils as PeaqUtils
 PeaqUtils.DEBUG = True
 
-from substrateinterface import SubstrateInterface
 from substrateinterface import Keypair
 from peaq.utils import get_account_balance, show_extrinsic
 from peaq.sudo_extrinsic import fund
@@ -16,19 +14,25 @@ from peaq.utils import calculate_multi_sig
 # Monkey patch
 from scalecodec.types import FixedLengthArray
 from tools.monkey_patch_scale_info import process_encode as new_process_encode
-from tools.payload import sudo_call_compose, sudo_extrinsic_send, user_extrinsic_send
+from tools.payload import sudo_call_compose, sudo_extrinsic_send, user_extrinsic_send, sign_and_submit
+from tools.connection_pool import get_substrate
+from tools.block_subscription import EventWaiter, subscription_for
+from tools.instrumentation import timed_phase
+from tools.keyring import keypair_from_uri
+from tools.call_template import batch_compose_sudo_call
 FixedLengthArray.process_encode = new_process_encode
 
 TOKEN_NUM_BASE = pow(10, 3)
 TOKEN_NUM_BASE_DEV = pow(10, 18)
-RELAYCHAIN_WS_URL = 'ws://127.0.0.1:9944'
-STANDALONE_WS_URL = 'ws://127.0.0.1:9944'
-
-PARACHAIN_WS_URL = 'ws://127.0.0.1:10044'
-ACA_WS_URL = 'ws://127.0.0.1:10144'
-RELAYCHAIN_ETH_URL = 'http://127.0.0.1:9933'
-PARACHAIN_ETH_URL = 'http://127.0.0.1:10044'
-ACA_ETH_URL = 'http://127.0.0.1:10144'
+# The urls can be overridden per test process, e.g. by tools/shard_runner.py
+RELAYCHAIN_WS_URL = os.environ.get('RELAYCHAIN_WS_URL', 'ws://127.0.0.1:9944')
+STANDALONE_WS_URL = os.environ.get('STANDALONE_WS_URL', 'ws://127.0.0.1:9944')
+
+PARACHAIN_WS_URL = os.environ.get('PARACHAIN_WS_URL', 'ws://127.0.0.1:10044')
+ACA_WS_URL = os.environ.get('ACA_WS_URL', 'ws://127.0.0.1:10144')
+RELAYCHAIN_ETH_URL = os.environ.get('RELAYCHAIN_ETH_URL', 'http://127.0.0.1:9933')
+PARACHAIN_ETH_URL = os.environ.get('PARACHAIN_ETH_URL', 'http://127.0.0.1:10044')
+ACA_ETH_URL = os.environ.get('ACA_ETH_URL', 'http://127.0.0.1:10144')
 # PARACHAIN_WS_URL = 'wss://wsspc1.agung.peaq.network'
 # PARACHAIN_ETH_URL = 'https://rpcpc1.agung.peaq.network'
 # WS_URL = 'ws://127.0.0.1:9944'
@@ -47,8 +51,8 @@ ETH_URL = PARACHAIN_ETH_URL
 # WS_URL = 'wss://wss.test.peaq.network'
 # ETH_URL = 'https://erpc.test.peaq.network:443'
 URI_GLOBAL_SUDO = '//Alice'
-KP_GLOBAL_SUDO = Keypair.create_from_uri(URI_GLOBAL_SUDO)
-KP_COLLATOR = Keypair.create_from_uri('//Ferdie')
+KP_GLOBAL_SUDO = keypair_from_uri(URI_GLOBAL_SUDO)
+KP_COLLATOR = keypair_from_uri('//Ferdie')
 ACA_PD_CHAIN_ID = 3000
 
 
@@ -75,7 +79,7 @@ def show_test(name, success, line=0):
 
 
 def get_peaq_chain_id():
-    return get_parachain_id(SubstrateInterface(url=PARACHAIN_WS_URL))
+    return get_parachain_id(get_substrate(PARACHAIN_WS_URL))
 
 
 def show_title(name):
@@ -124,8 +128,6 @@ def send_spent_token_from_multisig_wallet(substrate, kp_consumer, kp_provider, t
             'value': token_num * TOKEN_NUM_BASE
         })
 
-    nonce = substrate.get_account_nonce(kp_provider.ss58_address)
-
     as_multi_call = substrate.compose_call(
         call_module='Multisig',
         call_function='as_multi',
@@ -138,14 +140,7 @@ def send_spent_token_from_multisig_wallet(substrate, kp_consumer, kp_provider, t
             'max_weight': {'ref_time': 1000000000},
         })
 
-    extrinsic = substrate.create_signed_extrinsic(
-        call=as_multi_call,
-        keypair=kp_provider,
-        era={'period': 64},
-        nonce=nonce
-    )
-
-    receipt = substrate.submit_extrinsic(extrinsic, wait_for_inclusion=True)
+    receipt = sign_and_submit(substrate, kp_provider, as_multi_call, era={'period': 64})
     show_extrinsic(receipt, 'as_multi')
     info = receipt.get_extrinsic_identifier().split('-')
     return {
@@ -166,8 +161,6 @@ def send_refund_token_from_multisig_wallet(substrate, kp_consumer, kp_provider,
             'value': token_num * TOKEN_NUM_BASE
         })
 
-    nonce = substrate.get_account_nonce(kp_provider.ss58_address)
-
     as_multi_call = substrate.compose_call(
         call_module='Multisig',
         call_function='as_multi',
@@ -180,14 +173,7 @@ def send_refund_token_from_multisig_wallet(substrate, kp_consumer, kp_provider,
             'max_weight': {'ref_time': 1000000000},
         })
 
-    extrinsic = substrate.create_signed_extrinsic(
-        call=as_multi_call,
-        keypair=kp_provider,
-        era={'period': 64},
-        nonce=nonce
-    )
-
-    receipt = substrate.submit_extrinsic(extrinsic, wait_for_inclusion=True)
+    receipt = sign_and_submit(substrate, kp_provider, as_multi_call, era={'period': 64})
     show_extrinsic(receipt, 'as_multi')
     info = receipt.get_extrinsic_identifier().split('-')
     return {
@@ -202,7 +188,6 @@ def send_spent_token_service_delievered(
         substrate, kp_consumer, kp_provider, token_num, tx_hash, timepoint, call_hash):
 
     print('----- Provider send the spent service delivered')
-    nonce = substrate.get_account_nonce(kp_provider.ss58_address)
     call = substrate.compose_call(
         call_module='PeaqTransaction',
         call_function='service_delivered',
@@ -214,14 +199,7 @@ def send_spent_token_service_delievered(
             'call_hash': call_hash,
         })
 
-    extrinsic = substrate.create_signed_extrinsic(
-        call=call,
-        keypair=kp_provider,
-        era={'period': 64},
-        nonce=nonce
-    )
-
-    receipt = substrate.submit_extrinsic(extrinsic, wait_for_inclusion=True)
+    receipt = sign_and_submit(substrate, kp_provider, call, era={'period': 64})
     show_extrinsic(receipt, 'service_delivered')
 
 
@@ -230,7 +208,6 @@ def send_refund_token_service_delievered(
         substrate, kp_consumer, kp_provider, token_num, tx_hash, timepoint, call_hash):
 
     print('----- Provider send the refund service delivered')
-    nonce = substrate.get_account_nonce(kp_provider.ss58_address)
     call = substrate.compose_call(
         call_module='PeaqTransaction',
         call_function='service_delivered',
@@ -242,14 +219,7 @@ def send_refund_token_service_delievered(
             'call_hash': call_hash,
         })
 
-    extrinsic = substrate.create_signed_extrinsic(
-        call=call,
-        keypair=kp_provider,
-        era={'period': 64},
-        nonce=nonce
-    )
-
-    receipt = substrate.submit_extrinsic(extrinsic, wait_for_inclusion=True)
+    receipt = sign_and_submit(substrate, kp_provider, call, era={'period': 64})
     show_extrinsic(receipt, 'service_delivered')
 
 
@@ -299,7 +269,7 @@ def show_account(substrate, addr, out_str):
     return result
 
 
-# [TODO] Use the batch
+# Can be coalesced into one extrinsic with tools.payload.batched
 @sudo_extrinsic_send(sudo_keypair=KP_GLOBAL_SUDO)
 @sudo_call_compose(sudo_keypair=KP_GLOBAL_SUDO)
 def set_max_currency_supply(substrate, max_currency_supply):
@@ -385,32 +355,28 @@ def get_collators(substrate, key):
 
 
 def exist_pallet(substrate, pallet_name):
-    return substrate.get_block_metadata(decode=True).get_metadata_pallet(pallet_name)
+    return substrate.get_metadata().get_metadata_pallet(pallet_name)
 
 
+@timed_phase('wait_for_event')
 def wait_for_event(substrate, module, event, attributes={}, timeout=30):
     """
     Waits for an certain event and returns it if found, and None if not.
     Method stops after given timeout and returns also None.
+    The new heads come from a shared subscription, so each block's events are
+    decoded once no matter how many waiters are active.
     Parameters:
     - module:       name of the module to filter
     - event:        name of the event to filter
     - attributes:   dict with attributes and expected values to filter
     """
-    stime = time.time()
-    cur_bl = None
-    nxt_bl = substrate.get_block_hash()
-    while not (time.time() - stime) > timeout:
-        if nxt_bl != cur_bl:
-            cur_bl = nxt_bl
-            events = substrate.get_events(cur_bl)
-            for e in events:
-                if _is_it_this_event(e, module, event, attributes):
-                    time.sleep(1)  # To make sure everything has been processed
-                    return e.value['event']
-        time.sleep(1)
-        nxt_bl = substrate.get_block_hash()
-    return None
+    waiter = EventWaiter(
+        subscription_for(substrate),
+        lambda e: _is_it_this_event(e, module, event, attributes))
+    e = waiter.register(substrate).wait(timeout)
+    if e is None:
+        return None
+    return e.value['event']
 
 
 def _is_it_this_event(e_obj, module, event, attributes) -> bool:
@@ -436,7 +402,7 @@ def batch_fund(batch, kp_or_addr, amount):
     addr = kp_or_addr
     if isinstance(kp_or_addr, Keypair):
         addr = kp_or_addr.ss58_address
-    batch.compose_sudo_call('Balances', 'force_set_balance', {
+    batch_compose_sudo_call(batch, 'Balances', 'force_set_balance', {
         'who': addr,
         'new_free': amount,
         'new_reserved': 0
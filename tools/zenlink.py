@@ -1,7 +1,5 @@
-from tools.utils import get_peaq_chain_id
-
-
-PEAQ_PD_CHAIN_ID = get_peaq_chain_id()
+from tools.chain_params import PEAQ_PARAMS
+from tools.call_template import batch_compose_call
 
 
 def calc_deadline(substrate):
@@ -10,12 +8,12 @@ def calc_deadline(substrate):
 
 def compose_zdex_lppair_params(tok_idx, w_str=True):
     if w_str:
-        chain_id = str(PEAQ_PD_CHAIN_ID)
+        chain_id = str(PEAQ_PARAMS.para_id)
         zero = '0'
         two = '2'
         asset_idx = str(tok_idx)
     else:
-        chain_id = PEAQ_PD_CHAIN_ID
+        chain_id = PEAQ_PARAMS.para_id
         zero = 0
         two = 2
         asset_idx = tok_idx
@@ -53,4 +51,4 @@ def compose_zdex_add_liquidity(batch, tok_idx, liquidity0, liquidity1):
         'amount_1_min': '0',
         'deadline': str(deadline),
     }
-    batch.compose_call('ZenlinkProtocol', 'add_liquidity', params)
+    batch_compose_call(batch, 'ZenlinkProtocol', 'add_liquidity', params)